@@ -0,0 +1,117 @@
+"""
+Corpus analytics benchmark: per-debate Python loops over JSON states versus
+the columnar export with NumPy aggregates (backend.analytics).
+
+Both compute mean message length per persona and phase, the share of
+reflections that change position, and exchange rounds before arbitration.
+
+Usage (from repo root; needs NumPy):
+    python benchmarks/corpus_analytics.py
+    python benchmarks/corpus_analytics.py --debates 20000 --json bench_analytics.json
+"""
+
+from pathlib import Path
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from backend.analytics import load, summarize  # noqa: E402
+from backend.columnar import CONCESSION_PATTERN, Corpus, write_corpus  # noqa: E402
+
+DEBATERS = ["napoleon", "gandhi", "alexander"]
+
+
+def make_state(rng: random.Random) -> dict:
+    rounds = rng.randint(1, 4)
+    messages = []
+
+    def say(author, phase, round_index, text):
+        messages.append({"author_id": author, "author_name": author.title(), "content": text,
+                         "round_index": round_index, "phase": phase})
+
+    for phase in ("opening", "defence"):
+        for p in DEBATERS:
+            say(p, phase, 0, "An argument for order and unity. " * rng.randint(3, 12))
+    for r in range(1, rounds + 1):
+        for p in DEBATERS:
+            say(p, "exchange", r, "A reply on power and consent. " * rng.randint(2, 10))
+    for p in DEBATERS:
+        say(p, "reflection", 0, "I now concede the point on consent." if rng.random() < 0.3 else "I hold my ground.")
+    say("arbitrator", "arbitration", 0, "A consensus. " * 20)
+    return {"messages": messages, "exchange_rounds": rounds, "max_exchange_rounds": 4,
+            "arbitration": "A consensus.", "budget_exhausted": False}
+
+
+def python_loops(states: list[dict]) -> dict:
+    """The row-by-row version analysts wrote against the JSON states."""
+    totals, counts, reflections, changes, rounds = {}, {}, {}, {}, []
+    for state in states:
+        highest = 0
+        for m in state["messages"]:
+            key = (m["author_id"], m["phase"])
+            totals[key] = totals.get(key, 0) + len(m["content"])
+            counts[key] = counts.get(key, 0) + 1
+            if m["phase"] == "reflection":
+                reflections[m["author_id"]] = reflections.get(m["author_id"], 0) + 1
+                if CONCESSION_PATTERN.search(m["content"]):
+                    changes[m["author_id"]] = changes.get(m["author_id"], 0) + 1
+            if m["phase"] == "exchange":
+                highest = max(highest, m["round_index"])
+        if state["arbitration"]:
+            rounds.append(highest)
+    return {"mean": {k: totals[k] / counts[k] for k in totals}, "changes": changes, "rounds": sum(rounds) / len(rounds)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--debates", type=int, default=10_000)
+    parser.add_argument("--json", type=Path, default=None, help="Write results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    states = [make_state(rng) for _ in range(args.debates)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "corpus.simcol"
+        started = time.perf_counter()
+        corpus = Corpus()
+        for i, state in enumerate(states):
+            corpus.add_debate(str(i), state)
+        write_corpus(corpus, path)
+        export_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        python_loops(states)
+        loops_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        summarize(load(path))
+        vectorized_s = time.perf_counter() - started
+        size = path.stat().st_size
+
+    json_size = sum(len(json.dumps(s)) for s in states)
+    results = {
+        "debates": args.debates,
+        "messages": len(corpus),
+        "export_s": round(export_s, 3),
+        "python_loops_s": round(loops_s, 3),
+        "vectorized_s": round(vectorized_s, 3),
+        "json_bytes": json_size,
+        "columnar_bytes": size,
+    }
+    print(
+        f"{args.debates} debates, {len(corpus)} messages: export {export_s:.2f}s (once) | "
+        f"python loops {loops_s:.3f}s | numpy {vectorized_s:.3f}s | "
+        f"JSON {json_size / 1e6:.1f} MB vs columnar {size / 1e6:.1f} MB"
+    )
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
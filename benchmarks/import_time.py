@@ -0,0 +1,105 @@
+"""
+Import-time benchmark for the backend's cold start.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+reports the total and the slowest imports. Fails (exit 1) when the import
+exceeds --max-ms or loads a module that must stay lazy (google.adk,
+google.genai), so startup cost cannot silently regress.
+
+Usage (from repo root):
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --max-ms 800 --json bench_import.json
+"""
+
+from pathlib import Path
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_MODULE = "backend.app.main"
+# Imported on the first debate (or by the lifespan warm-up), never at import time
+LAZY_MODULES = ("google.adk", "google.genai")
+
+
+def measure(module: str) -> dict[str, int]:
+    """
+    Import `module` in a fresh interpreter.
+
+    Returns:
+        Cumulative import time in microseconds per imported module.
+    """
+    env = {**os.environ, "PYTHONPATH": str(REPO_ROOT / "src")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=REPO_ROOT,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    cumulative: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time: <self us> | <cumulative us> | <indented module name>"
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default=DEFAULT_MODULE)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs; the fastest is reported")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail above this import time")
+    parser.add_argument("--json", type=Path, default=None, help="Write results to this file")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(max(args.repeat, 1))]
+    best = min(runs, key=lambda run: run.get(args.module, 0))
+    total_ms = best.get(args.module, 0) / 1000
+    lazy_loaded = sorted(
+        name for name in best if any(name == m or name.startswith(m + ".") for m in LAZY_MODULES)
+    )
+    slowest = sorted(
+        ((name, us) for name, us in best.items() if name != args.module),
+        key=lambda item: item[1],
+        reverse=True,
+    )[: args.top]
+
+    print(f"import {args.module}: {total_ms:.1f} ms (best of {len(runs)})")
+    for name, us in slowest:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if lazy_loaded:
+        failures.append(f"lazy modules imported at startup: {', '.join(lazy_loaded[:5])}")
+    if args.max_ms is not None and total_ms > args.max_ms:
+        failures.append(f"{total_ms:.1f} ms exceeds --max-ms {args.max_ms:.1f}")
+
+    if args.json is not None:
+        args.json.write_text(
+            json.dumps(
+                {
+                    "module": args.module,
+                    "total_ms": round(total_ms, 1),
+                    "runs": len(runs),
+                    "slowest": [{"module": n, "ms": round(us / 1000, 1)} for n, us in slowest],
+                    "lazy_loaded": lazy_loaded,
+                },
+                indent=2,
+            )
+        )
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
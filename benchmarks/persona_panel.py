@@ -0,0 +1,88 @@
+"""
+Persona panel benchmark: turns, prompt-build and state cost per debate as the panel grows.
+
+Runs full debates with 3 to 13 debaters through DebateCoordinator against an
+instant fake model (no pacing delays), and reports from the state's
+`timings` section: LLM turns, time building prompts and recording turns,
+per debate and per turn. Prompts carry the transcript, so their cost grows
+with both the panel and the debate's length.
+
+Usage (from repo root):
+    python benchmarks/persona_panel.py
+    python benchmarks/persona_panel.py --sizes 3,5,10,13 --rounds 4 --json bench_panel.json
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from backend.agent import coordinator as coordinator_module  # noqa: E402
+from backend.agent.coordinator import DebateCoordinator, expected_turns, personas  # noqa: E402
+from backend.agent.limiter import AdaptiveLimiter  # noqa: E402
+
+REPLY = "A measured reply that restates my position and answers the others in character. " * 3
+
+
+async def instant_model(model: str, prompt: str, on_delta) -> tuple[str, dict[str, int]]:
+    words = len(prompt.split())
+    return REPLY, {"prompt_tokens": words, "completion_tokens": 40, "total_tokens": words + 40}
+
+
+async def run_debate(debaters: list[str], rounds: int) -> tuple[dict, float]:
+    coordinator = DebateCoordinator(
+        max_exchange_rounds=rounds, transport=instant_model, limiter=AdaptiveLimiter(), debaters=debaters
+    )
+    started = time.perf_counter()
+    state = await coordinator.run_debate()
+    return state, time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="3,5,10,13")
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--json", type=Path, default=None, help="Write results to this file")
+    args = parser.parse_args()
+    coordinator_module.TURN_DELAY = coordinator_module.PHASE_DELAY = 0
+
+    available = personas()["debaters"]
+    results = []
+    for n in (int(s) for s in args.sizes.split(",")):
+        if n > len(available):
+            print(f"{n} debaters: only {len(available)} registered, skipped")
+            continue
+        state, wall_s = asyncio.run(run_debate(available[:n], args.rounds))
+        turns = len(state["routes"])
+        prompt_ms = sum(t["prompt_ms"] for t in state["timings"].values())
+        state_ms = sum(t["state_ms"] for t in state["timings"].values())
+        result = {
+            "debaters": n,
+            "turns": turns,
+            "expected_turns": expected_turns(args.rounds, n),
+            "messages": len(state["messages"]),
+            "prompt_ms": round(prompt_ms, 2),
+            "prompt_ms_per_turn": round(prompt_ms / turns, 3),
+            "state_ms": round(state_ms, 2),
+            "state_ms_per_turn": round(state_ms / turns, 3),
+            "prompt_tokens": state["token_total"]["prompt_tokens"],
+            "wall_ms": round(wall_s * 1000, 1),
+        }
+        results.append(result)
+        print(
+            f"{n:>2} debaters  {turns:>3} turns  prompts {result['prompt_ms']:8.2f} ms "
+            f"({result['prompt_ms_per_turn']:.3f}/turn)  state {result['state_ms']:8.2f} ms "
+            f"({result['state_ms_per_turn']:.3f}/turn)  {result['prompt_tokens']} prompt tokens"
+        )
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Response encoding benchmark: time to encode a debate state and bytes on the wire.
+
+Encoders, for the same state at several transcript sizes:
+  fastapi      what FastAPI does for `-> dict[str, Any]` endpoints (validate the
+               state dict, then serialize it to JSON)
+  orjson       dumps() of the state dict, as FastJSONResponse does
+  model->json  _state_to_dict(state) then stdlib json.dumps
+The API holds states as dicts, so the first two start from a built dict.
+Wire sizes are reported for the JSON body as is, gzip and (if available) zstd,
+with the time each compression takes.
+
+Usage (from repo root):
+    python benchmarks/response_encoding.py
+    python benchmarks/response_encoding.py --sizes 10,100,1000,10000 --json bench_encoding.json
+"""
+
+from pathlib import Path
+from typing import Any
+import argparse
+import json
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from backend.app.encoding import available_encodings, compress, dumps, orjson  # noqa: E402
+from backend.core import DebateState, PersonaId, RoundPhase, TokenUsage  # noqa: E402
+from backend.tools.debate_tools import _state_to_dict  # noqa: E402
+
+AUTHORS = [(PersonaId.NAPOLEON, "Napoleon"), (PersonaId.GANDHI, "Gandhi"), (PersonaId.ALEXANDER, "Alexander")]
+_DICT_ADAPTER = TypeAdapter(dict[str, Any])
+
+
+def make_state(n: int) -> DebateState:
+    state = DebateState(max_exchange_rounds=4)
+    for i in range(n):
+        persona_id, name = AUTHORS[i % 3]
+        content = f"Message {i}: " + "a reasoned argument about unity and power, " * 12
+        state.add_message(persona_id, name, content, RoundPhase.EXCHANGE, round_index=1 + (i // 3) % 4)
+    state.token_usage["exchange"] = TokenUsage(prompt_tokens=n * 900, completion_tokens=n * 250, total_tokens=n * 1150)
+    return state
+
+
+def best_of(fn, repeat: int = 5) -> tuple[float, Any]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000,10000")
+    parser.add_argument("--json", type=Path, default=None, help="Write results to this file")
+    args = parser.parse_args()
+
+    encoders = {
+        "fastapi": lambda s, d: _DICT_ADAPTER.dump_json(_DICT_ADAPTER.validate_python(d)),
+        "orjson": lambda s, d: dumps(d),
+        "model->json": lambda s, d: json.dumps(_state_to_dict(s), separators=(",", ":")).encode(),
+    }
+    if orjson is None:
+        print("orjson is not installed: the orjson row uses stdlib json")
+    results = []
+    for n in (int(s) for s in args.sizes.split(",")):
+        state = make_state(n)
+        state_dict = _state_to_dict(state)
+        result: dict[str, Any] = {"messages": n, "encode_ms": {}, "wire": {}}
+        body = b""
+        for name, encode in encoders.items():
+            seconds, body = best_of(lambda: encode(state, state_dict))
+            result["encode_ms"][name] = round(seconds * 1000, 3)
+        result["wire"]["identity"] = {"bytes": len(body), "ms": 0.0}
+        for encoding in available_encodings():
+            seconds, compressed = best_of(lambda: compress(body, encoding))
+            result["wire"][encoding] = {"bytes": len(compressed), "ms": round(seconds * 1000, 3)}
+        results.append(result)
+
+        print(f"{n} messages")
+        print("  encode  " + "  ".join(f"{k} {v:.3f}ms" for k, v in result["encode_ms"].items()))
+        print(
+            "  wire    "
+            + "  ".join(f"{k} {v['bytes']} B ({v['ms']:.3f}ms)" for k, v in result["wire"].items())
+        )
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
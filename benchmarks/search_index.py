@@ -0,0 +1,102 @@
+"""
+Search index benchmark: indexing throughput and query latency at up to 1M messages.
+
+Builds a SearchIndex of synthetic debates (100 messages each, drawn from a
+fixed vocabulary with a few rare words), then times typical queries: a rare
+word, a common word, a phrase, a persona + phase filter and a date range.
+Latency is the median of repeated runs of each query.
+
+Usage (from repo root):
+    python benchmarks/search_index.py                      # 1M messages, in a temp file
+    python benchmarks/search_index.py --messages 100000 --json bench_search.json
+"""
+
+from pathlib import Path
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from backend.app.search import SearchIndex  # noqa: E402
+
+PER_DEBATE = 100
+PERSONAS = ["napoleon", "gandhi", "alexander"]
+PHASES = ["opening", "defence", "exchange", "reflection"]
+COMMON = (
+    "the empire people unity power peace order law nation freedom war justice strength "
+    "truth duty glory land rule army trade faith reason history future must shall will"
+).split()
+RARE = ["concede", "tariff", "aqueduct", "satyagraha", "phalanx"]
+
+
+def make_debate(rng: random.Random) -> list[dict]:
+    messages = []
+    for i in range(PER_DEBATE):
+        words = rng.choices(COMMON, k=40)
+        if rng.random() < 0.01:
+            words[rng.randrange(40)] = rng.choice(RARE)
+        messages.append(
+            {
+                "author_id": PERSONAS[i % 3],
+                "author_name": PERSONAS[i % 3].title(),
+                "content": " ".join(words).capitalize() + ".",
+                "round_index": i // 25,
+                "phase": PHASES[i // 25],
+            }
+        )
+    return messages
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", type=Path, default=None, help="Write results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SearchIndex(Path(tmp) / "search.db")
+        debates = max(1, args.messages // PER_DEBATE)
+        started = time.perf_counter()
+        now = time.time()
+        for d in range(debates):
+            # Spread debates over 30 days so date filters have something to cut
+            index.add(f"debate-{d}", make_debate(rng), created_at=now - (debates - d) * 30 * 86400 / debates)
+        build_s = time.perf_counter() - started
+        total = index.count()
+        print(f"Indexed {total} messages in {build_s:.1f}s ({total / build_s:.0f} messages/s)")
+
+        queries = {
+            "rare word": {"query": "concede"},
+            "common word": {"query": "empire"},
+            "phrase": {"query": '"peace order"'},
+            "two words": {"query": "tariff OR phalanx"},
+            "persona+phase": {"query": "satyagraha", "persona": "gandhi", "phase": "exchange"},
+            "last 7 days": {"query": "aqueduct", "since": now - 7 * 86400},
+            "page 5": {"query": "concede", "offset": 80},
+        }
+        results = {"messages": total, "build_s": round(build_s, 2), "query_ms": {}}
+        for name, kwargs in queries.items():
+            times = []
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                hits = index.search(**kwargs)["results"]
+                times.append(time.perf_counter() - t)
+            median_ms = statistics.median(times) * 1000
+            results["query_ms"][name] = round(median_ms, 3)
+            print(f"  {name:<14} {median_ms:8.2f} ms  ({len(hits)} results on the page)")
+        index.close()
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Memory and CPU benchmark for transcript representations at 10k-100k messages.
+
+Compares, for the same state-dict messages:
+  model       ModelMessage(...)                    (the message as a pydantic model, before it was slotted)
+  validated   DebateMessage(...)                   (validation per message)
+  adapter     TypeAdapter(list[DebateMessage])     (one validation pass; what validate_state uses)
+  constructed DebateMessage.model_construct(...)   (no validation; what _state_from_dict uses)
+and times a state round trip through the tools (_state_from_dict/_state_to_dict)
+and through validate_state.
+
+Memory is the tracemalloc growth while building, so the content strings
+(shared with the source dicts) are not counted: it is the per-message overhead.
+
+Usage (from repo root):
+    python benchmarks/transcript_memory.py
+    python benchmarks/transcript_memory.py --sizes 10000,100000 --json bench_transcript.json
+"""
+
+from pathlib import Path
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pydantic import BaseModel, Field, TypeAdapter  # noqa: E402
+
+from backend.core import DebateMessage, PersonaId, RoundPhase  # noqa: E402
+from backend.tools.debate_tools import _state_from_dict, _state_to_dict, create_initial_state, validate_state  # noqa: E402
+
+NAMES = {"napoleon": "Napoleon", "gandhi": "Gandhi", "alexander": "Alexander"}
+
+
+def make_rows(n: int) -> list[dict]:
+    authors = list(NAMES)
+    return [
+        {
+            "author_id": authors[i % 3],
+            "author_name": NAMES[authors[i % 3]],
+            "content": f"Message {i}: " + "a reasoned argument " * 8,
+            "round_index": 1 + (i // 3) % 4,
+            "phase": "exchange",
+        }
+        for i in range(n)
+    ]
+
+
+class ModelMessage(BaseModel):
+    author_id: PersonaId
+    author_name: str
+    content: str
+    round_index: int = Field(default=0, ge=0)
+    phase: RoundPhase
+
+
+def build_model(rows):
+    return [ModelMessage(**r) for r in rows]
+
+
+def build_validated(rows):
+    return [
+        DebateMessage(
+            author_id=PersonaId(r["author_id"]),
+            author_name=r["author_name"],
+            content=r["content"],
+            round_index=r["round_index"],
+            phase=RoundPhase(r["phase"]),
+        )
+        for r in rows
+    ]
+
+
+_MESSAGES = TypeAdapter(list[DebateMessage])
+
+
+def build_adapter(rows):
+    return _MESSAGES.validate_python(rows)
+
+
+def build_constructed(rows):
+    return [DebateMessage.model_construct(**r) for r in rows]
+
+
+def measure(build, rows) -> dict[str, float]:
+    """Time a build without tracing (best of 3), then its memory in a traced build."""
+    elapsed = float("inf")
+    for _ in range(3):
+        gc.collect()
+        started = time.perf_counter()
+        result = build(rows)
+        elapsed = min(elapsed, time.perf_counter() - started)
+        del result
+    gc.collect()
+    tracemalloc.start()
+    result = build(rows)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"seconds": round(elapsed, 4), "bytes_per_message": round(current / len(rows), 1)}
+
+
+def round_trip(rows) -> tuple[float, float]:
+    """Seconds for a trusted round trip and for validate_state."""
+    state = create_initial_state()
+    state["messages"] = rows
+    started = time.perf_counter()
+    _state_to_dict(_state_from_dict(state))
+    trusted = time.perf_counter() - started
+    started = time.perf_counter()
+    validate_state(state)
+    return round(trusted, 4), round(time.perf_counter() - started, 4)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--json", type=Path, default=None, help="Write results to this file")
+    args = parser.parse_args()
+
+    builders = {
+        "model": build_model,
+        "validated": build_validated,
+        "adapter": build_adapter,
+        "constructed": build_constructed,
+    }
+    results = []
+    for n in (int(s) for s in args.sizes.split(",")):
+        rows = make_rows(n)
+        trusted, validated = round_trip(rows)
+        result = {"messages": n, "state_round_trip_s": trusted, "validate_state_s": validated}
+        print(f"{n} messages (state round trip through tools: {trusted}s, validate_state: {validated}s)")
+        for name, build in builders.items():
+            result[name] = measure(build, rows)
+            print(
+                f"  {name:<11} {result[name]['seconds']:8.4f}s  "
+                f"{result[name]['bytes_per_message']:8.1f} B/message"
+            )
+        results.append(result)
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Spill benchmark: peak RSS and time of ever longer debates, with and without a segment.
+
+Runs full debates (default panel, 50 to 200 exchange rounds) through
+DebateCoordinator against an instant fake model, each in its own
+subprocess so its peak resident set size (getrusage ru_maxrss) is its own.
+RSS includes the interpreter and imports (~35 MB), so the peak of the
+Python heap during the debate (tracemalloc) is reported as well; times
+include the tracing overhead.
+With `spill`, older messages go to a segment file in a temporary directory
+and the state keeps only the hot window (see the read_messages tool);
+without it, the whole transcript is in the state and copied on every turn.
+
+Usage (from repo root):
+    python benchmarks/transcript_spill.py
+    python benchmarks/transcript_spill.py --rounds 50,200,400,800 --json bench_spill.json
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from backend.agent import coordinator as coordinator_module  # noqa: E402
+from backend.agent.coordinator import DebateCoordinator  # noqa: E402
+from backend.agent.limiter import AdaptiveLimiter  # noqa: E402
+from backend.core import configure_spill_dir  # noqa: E402
+from backend.tools import iter_messages  # noqa: E402
+
+REPLY = "A measured reply that restates my position and answers the others in character. " * 20
+
+
+async def instant_model(model: str, prompt: str, on_delta) -> tuple[str, dict[str, int]]:
+    return REPLY, {"prompt_tokens": len(prompt) // 4, "completion_tokens": 120, "total_tokens": len(prompt) // 4 + 120}
+
+
+def child(rounds: int, spill: bool) -> dict:
+    """One debate in this process: its length, duration and this process's peak RSS."""
+    coordinator_module.TURN_DELAY = 0
+    coordinator_module.PHASE_DELAY = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_spill_dir(tmp)
+        coordinator = DebateCoordinator(
+            max_exchange_rounds=rounds, transport=instant_model, limiter=AdaptiveLimiter(), spill=spill
+        )
+        tracemalloc.start()
+        started = time.perf_counter()
+        state = asyncio.run(coordinator.run_debate())
+        seconds = time.perf_counter() - started
+        peak_heap = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        messages = sum(1 for _ in iter_messages(state))
+    return {
+        "rounds": rounds,
+        "spill": spill,
+        "messages": messages,
+        "hot_messages": len(state["messages"]),
+        "seconds": round(seconds, 3),
+        "peak_heap_mb": round(peak_heap / 2**20, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def measure(rounds: int, spill: bool) -> dict:
+    """Run `child` in a fresh interpreter."""
+    argv = [sys.executable, __file__, "--child", str(rounds)] + (["--spill"] if spill else [])
+    out = subprocess.run(argv, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", default="50,100,200")
+    parser.add_argument("--json", type=Path, default=None, help="Write results to this file")
+    parser.add_argument("--child", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--spill", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(child(args.child, args.spill)))
+        return 0
+
+    results = []
+    print(f"{'rounds':>7} {'messages':>9}  {'in state (heap, RSS, time)':>29}  {'spilled (heap, RSS, time)':>29}")
+    for rounds in (int(s) for s in args.rounds.split(",")):
+        full, spilled = measure(rounds, False), measure(rounds, True)
+        results += [full, spilled]
+        print(
+            f"{rounds:>7} {full['messages']:>9}  "
+            f"{full['peak_heap_mb']:6.2f} MB {full['peak_rss_mb']:6.1f} MB {full['seconds']:6.2f}s  "
+            f"{spilled['peak_heap_mb']:6.2f} MB {spilled['peak_rss_mb']:6.1f} MB {spilled['seconds']:6.2f}s"
+        )
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
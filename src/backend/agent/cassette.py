@@ -0,0 +1,171 @@
+"""
+Record/replay cassettes of LLM calls for deterministic benchmark runs.
+
+A transport is what the coordinator calls to get one model response:
+`await transport(model, prompt, on_delta) -> (text, usage)`. Recording wraps
+the real (ADK) transport and stores every call's prompt hash, response, usage,
+latency and error in a cassette; replaying serves them back, with the original
+or scaled timings, without ADK or quota. Orchestration changes can then be
+compared on exactly the same workload.
+
+Calls can be tagged with a scope (e.g. a batch debate id) so each debate of a
+concurrent run replays its own calls, whatever order they were recorded in.
+
+Cassettes are gzip-compressed JSONL: a header line, then one line per call.
+"""
+
+from collections import deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Protocol
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+
+CASSETTE_VERSION = 1
+
+
+class Transport(Protocol):
+    """One model call: returns (text, token usage); may stream partial text to `on_delta`."""
+
+    def __call__(
+        self, model: str, prompt: str, on_delta: Callable[[str], None] | None
+    ) -> Awaitable[tuple[str, dict[str, int]]]: ...
+
+
+class CassetteMiss(LookupError):
+    """Replay found no recorded call for a prompt."""
+
+
+class ReplayedError(RuntimeError):
+    """An error recorded from the live model, raised again on replay (same message)."""
+
+
+def prompt_key(prompt: str) -> str:
+    """Short stable hash of a prompt; cassettes store this instead of the prompt text."""
+    return hashlib.sha256(prompt.encode()).hexdigest()[:16]
+
+
+class Cassette:
+    """Recorded calls in order, each {model, key, text, usage, latency, error, scope}."""
+
+    def __init__(self, entries: list[dict[str, Any]] | None = None):
+        self.entries: list[dict[str, Any]] = list(entries or [])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Cassette":
+        with gzip.open(path, "rt") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version {header.get('version')} in {path}")
+            return cls([json.loads(line) for line in f if line.strip()])
+
+    def save(self, path: str | Path) -> None:
+        """Write atomically (gzip JSONL)."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp, "wt") as f:
+            f.write(json.dumps({"version": CASSETTE_VERSION, "calls": len(self.entries)}) + "\n")
+            for entry in self.entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        tmp.replace(path)
+
+
+class RecordingTransport:
+    """Wraps a live transport and appends every call (and error) to a cassette."""
+
+    def __init__(
+        self,
+        inner: Transport,
+        cassette: Cassette,
+        scope: str | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.inner = inner
+        self.cassette = cassette
+        self.scope = scope
+        self._clock = clock
+
+    async def __call__(
+        self, model: str, prompt: str, on_delta: Callable[[str], None] | None = None
+    ) -> tuple[str, dict[str, int]]:
+        entry: dict[str, Any] = {"model": model, "key": prompt_key(prompt)}
+        if self.scope is not None:
+            entry["scope"] = self.scope
+        started = self._clock()
+        try:
+            text, usage = await self.inner(model, prompt, on_delta)
+        except Exception as e:  # a cancelled call (e.g. a losing hedge) is not recorded
+            entry.update(latency=round(self._clock() - started, 4), error=str(e) or repr(e))
+            self.cassette.entries.append(entry)
+            raise
+        entry.update(latency=round(self._clock() - started, 4), text=text, usage=usage)
+        self.cassette.entries.append(entry)
+        return text, usage
+
+
+class ReplayTransport:
+    """
+    Serves recorded calls back. Identical prompts are served in recorded
+    order; timings are the recorded latencies multiplied by `time_scale`.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        time_scale: float = 1.0,
+        strict: bool = True,
+        scope: str | None = None,
+    ):
+        """
+        Args:
+            cassette: Recorded calls.
+            time_scale: Multiplier on recorded latencies (1 = original, 0 = instant).
+            strict: Raise CassetteMiss for an unrecorded prompt. When False, the
+                oldest unserved call of the same model is used instead (for
+                comparing runs whose prompt wording changed).
+            scope: Only serve calls recorded under this scope.
+        """
+        self.time_scale = time_scale
+        self.strict = strict
+        self._by_prompt: dict[tuple[str, str], deque[dict[str, Any]]] = {}
+        self._by_model: dict[str, deque[dict[str, Any]]] = {}
+        for entry in cassette.entries:
+            if scope is not None and entry.get("scope") != scope:
+                continue
+            self._by_prompt.setdefault((entry["model"], entry["key"]), deque()).append(entry)
+            self._by_model.setdefault(entry["model"], deque()).append(entry)
+        self._served: set[int] = set()
+        self.stats = {"served": 0, "misses": 0, "errors": 0}
+
+    def _next(self, queue: deque[dict[str, Any]] | None) -> dict[str, Any] | None:
+        while queue:
+            entry = queue.popleft()
+            if id(entry) not in self._served:
+                self._served.add(id(entry))
+                return entry
+        return None
+
+    async def __call__(
+        self, model: str, prompt: str, on_delta: Callable[[str], None] | None = None
+    ) -> tuple[str, dict[str, int]]:
+        entry = self._next(self._by_prompt.get((model, prompt_key(prompt))))
+        if entry is None:
+            self.stats["misses"] += 1
+            if not self.strict:
+                entry = self._next(self._by_model.get(model))
+            if entry is None:
+                raise CassetteMiss(f"No recorded call for {model} prompt {prompt_key(prompt)}")
+        if self.time_scale > 0:
+            await asyncio.sleep(entry["latency"] * self.time_scale)
+        self.stats["served"] += 1
+        if "error" in entry:
+            self.stats["errors"] += 1
+            raise ReplayedError(entry["error"])
+        if on_delta is not None and entry["text"]:
+            on_delta(entry["text"])
+        return entry["text"], entry["usage"]
@@ -0,0 +1,137 @@
+"""
+Context caches: explicit handles for the shared prompt prefixes of a debate.
+
+Turn prompts are a shared prefix plus a per-turn suffix (see the
+build_prompt_parts tool): every debater's turn in a phase or exchange round
+starts with the same transcript bytes. Before a model call the coordinator
+asks its context cache for a handle to the prompt's prefix. A cache that
+already holds the prefix for that model returns its handle (a hit);
+otherwise it creates one. The handle travels with the prompt
+(`CachedPrompt.cache`), so a transport backed by a provider-side cache can
+send only `prompt.suffix` with the handle's name, while other transports
+just see the full prompt text.
+
+LocalContextCache is the in-process stand-in: handles by model and prefix
+hash, with a TTL and an LRU bound. Nothing is sent anywhere; it makes
+prefix reuse measurable and testable without a provider.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Protocol
+import hashlib
+import time
+
+DEFAULT_TTL = 300.0  # seconds a handle stays valid after its last use
+DEFAULT_MAX_ENTRIES = 256
+
+
+@dataclass
+class CacheHandle:
+    """A cached prefix for one model: `name` is what a provider call would reference."""
+
+    name: str
+    model: str
+    chars: int
+    expires_at: float
+    hits: int = 0
+
+
+class CachedPrompt(str):
+    """
+    The full prompt text, plus where its shared prefix ends and the cache
+    handle for that prefix (None if not cached).
+    """
+
+    prefix_chars: int
+    cache: CacheHandle | None
+
+    def __new__(cls, prefix: str, suffix: str, cache: CacheHandle | None = None) -> "CachedPrompt":
+        prompt = super().__new__(cls, prefix + suffix)
+        prompt.prefix_chars = len(prefix)
+        prompt.cache = cache
+        return prompt
+
+    @property
+    def suffix(self) -> str:
+        """The part not covered by the cache handle."""
+        return self[self.prefix_chars:]
+
+
+class ContextCache(Protocol):
+    """Hands out cache handles for prompt prefixes."""
+
+    async def acquire(self, model: str, prefix: str) -> tuple[CacheHandle | None, bool]:
+        """The handle for `prefix` on `model` and whether it was already cached; (None, False) if not cacheable."""
+        ...
+
+
+def prefix_key(prefix: str) -> str:
+    """Stable hash of a prefix (the handle's name is derived from it)."""
+    return hashlib.sha256(prefix.encode()).hexdigest()[:24]
+
+
+class LocalContextCache:
+    """In-process context cache: handles by (model, prefix hash), expiring after `ttl` idle seconds."""
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        min_chars: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            ttl: Seconds a handle lives after it was last used.
+            max_entries: Handles kept; the least recently used is dropped beyond this.
+            min_chars: Shorter prefixes are not cached (providers have a minimum size).
+            clock: Time source for expiry.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.min_chars = min_chars
+        self._clock = clock
+        self._handles: OrderedDict[tuple[str, str], CacheHandle] = OrderedDict()
+        self.lookups = 0
+        self.hits = 0
+        self.created = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    async def acquire(self, model: str, prefix: str) -> tuple[CacheHandle | None, bool]:
+        if len(prefix) < self.min_chars:
+            return None, False
+        now = self._clock()
+        self.lookups += 1
+        key = (model, prefix_key(prefix))
+        handle = self._handles.get(key)
+        if handle is not None and handle.expires_at > now:
+            self.hits += 1
+            handle.hits += 1
+            handle.expires_at = now + self.ttl
+            self._handles.move_to_end(key)
+            return handle, True
+        if handle is not None:
+            self.evicted += 1
+        handle = CacheHandle(name=f"cachedContents/{key[1]}", model=model, chars=len(prefix), expires_at=now + self.ttl)
+        self._handles[key] = handle
+        self._handles.move_to_end(key)
+        self.created += 1
+        while len(self._handles) > self.max_entries:
+            self._handles.popitem(last=False)
+            self.evicted += 1
+        return handle, False
+
+    def snapshot(self) -> dict[str, Any]:
+        """Handles held and lookup counters, with the hit ratio."""
+        return {
+            "entries": len(self._handles),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_ratio": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            "created": self.created,
+            "evicted": self.evicted,
+        }
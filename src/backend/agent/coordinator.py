@@ -3,51 +3,152 @@ ADK coordinator: orchestrates the debate using tools only.
 Does NOT import core logic directly - only uses the tools module.
 """
 
-from typing import Any
+from collections import deque
+from typing import Any, AsyncIterator, Callable
 import asyncio
 import logging
+import re
+import threading
 import time
 
+from backend.agent.cassette import Cassette, RecordingTransport, Transport
+from backend.agent.context_cache import CachedPrompt, ContextCache
+from backend.agent.limiter import AdaptiveLimiter, CircuitOpenError, get_shared_limiter
+from backend.agent.scheduler import INTERACTIVE
+from backend.agent.shared_turns import SharedTurns
+from backend.agent.timings import PhaseTimer
+
 # Tools only - no core import
 from backend.tools.debate_tools import (
     create_initial_state,
-    build_opening_prompt,
+    iter_messages,
+    spill_transcript,
+    check_panel,
+    list_personas,
+    build_prompt_parts,
+    parse_verdict,
     record_opening,
-    build_defence_prompt,
     record_defence,
-    build_exchange_prompt,
     record_exchange_message,
-    build_reflection_prompt,
     record_reflection,
-    build_arbitration_prompt,
     record_arbitration,
     advance_phase,
     advance_exchange_round,
+    record_token_usage,
+    mark_budget_exhausted,
+    record_route,
+    record_timings,
 )
 
-# ADK for LLM invocation
-try:
-    from google.adk.agents import Agent
-    from google.adk.runners import Runner
-    from google.adk.sessions import InMemorySessionService
-    from google.genai import types
-    _ADK_AVAILABLE = True
-except ImportError:
-    _ADK_AVAILABLE = False
-    Agent = None
-    Runner = None
-    InMemorySessionService = None
-    types = None
-
-DEBATER_IDS = ["napoleon", "gandhi", "alexander"]
+# ADK for LLM invocation, imported on first use (see load_adk): google.adk and
+# google.genai take seconds to import, and /health must not wait for them
+_ADK_AVAILABLE: bool | None = None  # None until the import has been attempted
+_ADK_LOCK = threading.Lock()
+Agent = None
+RunConfig = None
+StreamingMode = None
+Runner = None
+InMemorySessionService = None
+types = None
+
+
+def load_adk() -> bool:
+    """
+    Import ADK and genai once, on the first debate or an explicit warm-up.
+
+    Returns:
+        Whether ADK is installed. Safe to call from a worker thread.
+    """
+    global _ADK_AVAILABLE, Agent, RunConfig, StreamingMode, Runner, InMemorySessionService, types
+    if _ADK_AVAILABLE is not None:
+        return _ADK_AVAILABLE
+    with _ADK_LOCK:
+        if _ADK_AVAILABLE is not None:
+            return _ADK_AVAILABLE
+        try:
+            from google.adk.agents import Agent
+            from google.adk.agents.run_config import RunConfig, StreamingMode
+            from google.adk.runners import Runner
+            from google.adk.sessions import InMemorySessionService
+            from google.genai import types
+        except ImportError:
+            _ADK_AVAILABLE = False
+        else:
+            _ADK_AVAILABLE = True
+    return _ADK_AVAILABLE
+
+
+# Default panel from the persona registry; a debate may seat any debaters (see `debaters`)
+DEBATER_IDS = check_panel()
+PHASE_ORDER = ["opening", "defence", "exchange", "reflection", "arbitration", "done"]
 DEFAULT_MODEL = "gemini-2.0-flash"
+# Short persona turns; only arbitration needs the strongest model
+BULK_PHASES = ("opening", "defence", "exchange", "reflection")
 APP_NAME = "simulacra_debate"
 MAX_RETRIES = 3
 INITIAL_RETRY_DELAY = 3.0  # seconds
+TURN_DELAY = 1.0  # seconds between personas in the same phase
+PHASE_DELAY = 2.0  # seconds between phases and exchange rounds
+HEDGE_MIN_SAMPLES = 5  # turns observed before hedging starts
+HEDGE_WINDOW = 50  # recent turn latencies used to learn the hedge delay
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Receives debate events: {"type": "phase" | "delta" | "reset" | "message" | "done", ...}
+EventCallback = Callable[[dict[str, Any]], None]
+
+
+def _now() -> float:
+    """Event-loop clock (virtual under the simulator, monotonic otherwise)."""
+    return asyncio.get_running_loop().time()
+
+
+def _is_rate_limit_error(error_str: str) -> bool:
+    """Whether an error message is a 429 RESOURCE_EXHAUSTED from the model API."""
+    return "429" in error_str or "RESOURCE_EXHAUSTED" in error_str
+
+
+def _retry_delay(error_str: str, attempt: int) -> float:
+    """Exponential backoff, or the provider's suggested "retry in Ns" if longer."""
+    retry_delay = INITIAL_RETRY_DELAY * (2 ** attempt)
+    match = re.search(r"retry in (\d+\.?\d*)s", error_str.lower())
+    if match:
+        retry_delay = max(retry_delay, float(match.group(1)))
+    return retry_delay
+
+
+def _percentile(values, q: float) -> float:
+    """Nearest-rank percentile of `values` (q in 0..1)."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def expected_turns(max_exchange_rounds: int, debaters: int = len(DEBATER_IDS)) -> int:
+    """LLM calls in a full debate: opening, defence, exchange rounds, reflection, arbitration."""
+    return debaters * (3 + max_exchange_rounds) + 1
+
+
+def debate_panel(debaters: list[str] | None = None) -> list[str]:
+    """
+    The debaters a debate seats: `debaters` checked against the persona registry, or DEBATER_IDS.
+
+    Raises:
+        ValueError: Unknown or repeated debaters, or fewer than two.
+    """
+    return check_panel(debaters)
+
+
+def personas() -> dict[str, Any]:
+    """Every registered persona and the default panel (see the list_personas tool)."""
+    return list_personas()
+
+
+def bulk_routes(bulk_model: str) -> dict[str, str]:
+    """Routing policy that sends every short persona turn to `bulk_model`."""
+    return {phase: bulk_model for phase in BULK_PHASES}
+
 
 def _extract_final_text(events) -> str:
     """Consume async events from runner and return final response text."""
@@ -63,15 +164,63 @@ def _extract_final_text(events) -> str:
     return final_text or ""
 
 
-async def _run_agent_for_prompt(runner: "Runner", user_id: str, session_id: str, prompt: str) -> str:
-    """Send prompt to the agent and return the final response text."""
+def _extract_usage(events) -> dict[str, int]:
+    """Sum prompt/completion/total token counts over the non-partial events."""
+    prompt_tokens = completion_tokens = total_tokens = 0
+    for event in events:
+        if getattr(event, "partial", False):
+            continue
+        meta = getattr(event, "usage_metadata", None)
+        if meta is None:
+            continue
+        prompt = getattr(meta, "prompt_token_count", None) or 0
+        completion = getattr(meta, "candidates_token_count", None) or 0
+        prompt_tokens += prompt
+        completion_tokens += completion
+        total_tokens += getattr(meta, "total_token_count", None) or (prompt + completion)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": total_tokens,
+    }
+
+
+def _partial_text(event) -> str:
+    """Text chunk carried by a partial (streamed) event, or empty string."""
+    if not getattr(event, "partial", False):
+        return ""
+    content = getattr(event, "content", None)
+    parts = getattr(content, "parts", None) or []
+    return "".join(getattr(part, "text", None) or "" for part in parts)
+
+
+async def _run_agent_for_prompt(
+    runner: "Runner",
+    user_id: str,
+    session_id: str,
+    prompt: str,
+    on_delta: Callable[[str], None] | None = None,
+) -> tuple[str, dict[str, int]]:
+    """
+    Send prompt to the agent and return the final response text and token usage.
+
+    When `on_delta` is given the runner streams (SSE mode) and each partial
+    text chunk is passed to `on_delta` as soon as it arrives.
+    """
     content = types.Content(role="user", parts=[types.Part(text=prompt)])
+    kwargs: dict[str, Any] = {}
+    if on_delta is not None:
+        kwargs["run_config"] = RunConfig(streaming_mode=StreamingMode.SSE)
     events = []
     async for event in runner.run_async(
-        user_id=user_id, session_id=session_id, new_message=content
+        user_id=user_id, session_id=session_id, new_message=content, **kwargs
     ):
+        if on_delta is not None:
+            delta = _partial_text(event)
+            if delta:
+                on_delta(delta)
         events.append(event)
-    return _extract_final_text(events)
+    return _extract_final_text(events), _extract_usage(events)
 
 
 class DebateCoordinator:
@@ -80,166 +229,664 @@ class DebateCoordinator:
     Does not import core; uses tools only.
     """
 
-    def __init__(self, model: str = DEFAULT_MODEL, max_exchange_rounds: int = 4):
-        if not _ADK_AVAILABLE:
+    def __init__(
+        self,
+        model: str = DEFAULT_MODEL,
+        max_exchange_rounds: int = 4,
+        token_budget: int | None = None,
+        limiter: AdaptiveLimiter | None = None,
+        routes: dict[str, str] | None = None,
+        fallback_model: str | None = None,
+        hedge_percentile: float | None = None,
+        hedge_budget: float = 0.1,
+        priority: str = INTERACTIVE,
+        transport: Transport | None = None,
+        record_to: Cassette | None = None,
+        record_scope: str | None = None,
+        debaters: list[str] | None = None,
+        context_cache: ContextCache | None = None,
+        shared_turns: SharedTurns | None = None,
+        spill: bool = False,
+    ):
+        """
+        Args:
+            model: Primary model, used for any phase not listed in `routes`.
+            max_exchange_rounds: Number of exchange rounds.
+            token_budget: Optional ceiling on total tokens for the debate.
+            limiter: Limiter for every model; defaults to the shared per-model limiters.
+            routes: Phase -> model routing policy (see `bulk_routes`).
+            fallback_model: Model to switch to when the routed model is quota-exhausted.
+            hedge_percentile: Enables hedging: a call still running after this
+                percentile (e.g. 0.9) of recent turn latencies gets a duplicate.
+            hedge_budget: Max fraction of turns that may be hedged.
+            priority: Scheduling class of this debate's turns ('interactive' or 'batch').
+            transport: Replaces the ADK model call, e.g. a ReplayTransport
+                serving a cassette (ADK is then not needed).
+            record_to: Cassette that records every model call made.
+            record_scope: Tag for the recorded calls (e.g. a batch debate id).
+            debaters: Panel of debater ids in speaking order (default DEBATER_IDS);
+                a resumed state keeps its own panel.
+            context_cache: Cache asked for a handle to each prompt's shared
+                prefix (see backend.agent.context_cache); None: no handles.
+            shared_turns: Serves prompts already sent by other debates sharing
+                it from their replies (see backend.agent.shared_turns).
+            spill: Move a new debate's older messages to a segment in the spill
+                directory after each turn, so its state keeps only the recent
+                ones (see the spill_transcript and read_messages tools).
+
+        Raises:
+            ValueError: If `debaters` is not a valid panel (see `debate_panel`).
+        """
+        if transport is None and not load_adk():
             raise RuntimeError("Google ADK is not installed. Install with: uv add google-adk")
         self.model = model
         self.max_exchange_rounds = max_exchange_rounds
-        # Single agent used for all persona generations (we pass persona via prompt)
-        self._agent = Agent(
-            model=self.model,
-            name="debate_speaker",
-        )
-        self._session_service = InMemorySessionService()
-        self._runner = Runner(
-            agent=self._agent,
-            app_name=APP_NAME,
-            session_service=self._session_service,
-        )
+        self.debaters = check_panel(debaters)
+        self.token_budget = token_budget
+        self.routes = dict(routes or {})
+        self.fallback_model = fallback_model
+        self.hedge_percentile = hedge_percentile
+        self.hedge_budget = hedge_budget
+        self.priority = priority
+        self._context_cache = context_cache
+        self.spill = spill
+        self._latencies: deque[float] = deque(maxlen=HEDGE_WINDOW)
+        # Shared across coordinators so concurrent debates back off together
+        self._limiter = limiter
         self._user_id = "debate_user"
+        self._runners: dict[str, Runner] = {}
+        if transport is None:
+            self._session_service = InMemorySessionService()
+            # One agent per model, used for all persona generations (we pass persona via prompt)
+            self._runner = self._runner_for(self.model)
+            transport = self._adk_call
+        if record_to is not None:
+            transport = RecordingTransport(transport, record_to, scope=record_scope, clock=_now)
+        self._transport = transport
+        self._shared_turns = shared_turns
         self._session_counter = 0
+        self._max_turn_tokens = 0
+        self._on_event: EventCallback | None = None
+        # Where the running debate's time goes, per phase (see backend.agent.timings)
+        self.timings = PhaseTimer()
+        # Latest state of the running debate (for checkpoints and live views)
+        self.state: dict[str, Any] | None = None
+        self.metrics: dict[str, Any] = {
+            "turns": 0,
+            "token_usage": {},
+            "token_total": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            "token_budget": token_budget,
+            "budget_exhausted": False,
+            "routes": {},
+            "fallbacks": 0,
+            "hedging": {"calls": 0, "hedged": 0, "hedge_wins": 0, "hedge_rate": 0.0, "saved_s": 0.0},
+            "context_cache": {
+                "lookups": 0, "hits": 0, "hit_ratio": 0.0,
+                "prompt_chars": 0, "cached_chars": 0, "cached_fraction": 0.0,
+            },
+        }
+
+    def _runner_for(self, model: str) -> "Runner":
+        """Runner bound to an agent for `model`, created on first use."""
+        if model not in self._runners:
+            agent = Agent(model=model, name="debate_speaker")
+            self._runners[model] = Runner(
+                agent=agent,
+                app_name=APP_NAME,
+                session_service=self._session_service,
+            )
+        return self._runners[model]
+
+    def _limiter_for(self, model: str) -> AdaptiveLimiter:
+        """Each model has its own quota, so each gets its own shared limiter."""
+        return self._limiter or get_shared_limiter(model)
+
+    def route(self, phase: str) -> str:
+        """Model the routing policy picks for a phase."""
+        return self.routes.get(phase, self.model)
 
     def _next_session_id(self) -> str:
         self._session_counter += 1
         return f"debate_session_{self._session_counter}"
 
-    async def _run_turn(self, prompt: str, max_retries: int = MAX_RETRIES) -> str:
+    async def _adk_call(
+        self, model: str, prompt: str, on_delta: Callable[[str], None] | None
+    ) -> tuple[str, dict[str, int]]:
+        """The default transport: one ADK call on a fresh session."""
+        session_id = self._next_session_id()
+        try:
+            await self._session_service.create_session(
+                app_name=APP_NAME,
+                user_id=self._user_id,
+                session_id=session_id,
+            )
+        except Exception:
+            pass
+        return await _run_agent_for_prompt(
+            self._runner_for(model), self._user_id, session_id, prompt, on_delta
+        )
+
+    async def _call_once(
+        self,
+        model: str,
+        prompt: str,
+        on_delta: Callable[[str], None] | None,
+        attempt: int,
+        phase: str | None = None,
+    ) -> tuple[str, dict[str, int]]:
+        """
+        One model call under the model's limiter; outcomes feed the limiter.
+        Time spent waiting for the slot and for the model is added to `phase`
+        (None: not timed, e.g. a hedged duplicate).
+        """
+        limiter = self._limiter_for(model)
+        queued = _now()
+        # The shared limiter waits out any retry-after seen by other callers
+        # and raises CircuitOpenError while the quota is exhausted.
+        async with limiter.slot(self.priority):
+            started = _now()
+            if phase is not None:
+                self.timings.add(phase, "backoff", started - queued)
+            try:
+                result = await self._transport(model, prompt, on_delta)
+            except Exception as e:
+                if _is_rate_limit_error(str(e)):
+                    limiter.record_rate_limited(_retry_delay(str(e), attempt))
+                raise
+            finally:
+                if phase is not None:
+                    self.timings.add(phase, "model_wait", _now() - started)
+            latency = _now() - started
+            limiter.record_success(latency)
+            self._latencies.append(latency)
+            return result
+
+    async def _call_shared(
+        self,
+        model: str,
+        prompt: str,
+        on_delta: Callable[[str], None] | None,
+        attempt: int,
+        phase: str | None = None,
+    ) -> tuple[str, dict[str, int]]:
+        """
+        `_call_hedged`, unless another debate on the same SharedTurns already
+        sent this prompt: its reply is then reused without a limiter slot, and
+        the wait counts as model wait but not as a latency sample.
+        """
+        if self._shared_turns is None:
+            return await self._call_hedged(model, prompt, on_delta, attempt, phase)
+        started = _now()
+        text, usage, shared = await self._shared_turns.call(
+            model, prompt, lambda: self._call_hedged(model, prompt, on_delta, attempt, phase), on_delta
+        )
+        if shared and phase is not None:
+            self.timings.add(phase, "model_wait", _now() - started)
+        return text, usage
+
+    def _hedge_delay(self) -> float | None:
+        """Latency after which a call gets hedged, or None if hedging is off or unlearned."""
+        if self.hedge_percentile is None or len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        return _percentile(self._latencies, self.hedge_percentile)
+
+    def _hedge_allowed(self, model: str) -> bool:
+        """Within the hedge budget and the limiter has a free slot right now."""
+        hedging = self.metrics["hedging"]
+        within_budget = hedging["hedged"] + 1 <= self.hedge_budget * max(hedging["calls"], 1)
+        return within_budget and self._limiter_for(model).has_spare_capacity()
+
+    async def _call_hedged(
+        self,
+        model: str,
+        prompt: str,
+        on_delta: Callable[[str], None] | None,
+        attempt: int,
+        phase: str | None = None,
+    ) -> tuple[str, dict[str, int]]:
+        """
+        Call the model; if hedging is on and the call outlives the learned
+        latency percentile, issue a duplicate and take whichever finishes first.
+        """
+        hedging = self.metrics["hedging"]
+        hedging["calls"] += 1
+        delay = self._hedge_delay()
+        if delay is None:
+            return await self._call_once(model, prompt, on_delta, attempt, phase)
+
+        started = _now()
+        primary = asyncio.create_task(self._call_once(model, prompt, on_delta, attempt, phase))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self._hedge_allowed(model):
+                return await primary
+
+            # The duplicate does not stream; if it wins, the primary's partial text is dropped
+            tail = [latency for latency in self._latencies if latency >= delay]
+            hedge = asyncio.create_task(self._call_once(model, prompt, None, attempt))
+            tasks.append(hedge)
+            hedging["hedged"] += 1
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in done if task.exception() is None]
+                if not winners:
+                    continue
+                winner = winners[0]
+                if winner is hedge:
+                    elapsed = _now() - started
+                    # The cancelled primary would likely have taken a tail latency
+                    expected = max(sum(tail) / len(tail), elapsed) if tail else elapsed
+                    hedging["hedge_wins"] += 1
+                    hedging["saved_s"] = round(hedging["saved_s"] + expected - elapsed, 3)
+                    if on_delta is not None:
+                        self._emit({"type": "reset"})
+                return winner.result()
+            # Both failed: surface the primary's error
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            hedging["hedge_rate"] = round(hedging["hedged"] / hedging["calls"], 3)
+
+    async def _run_turn(
+        self,
+        prompt: str,
+        max_retries: int = MAX_RETRIES,
+        on_delta: Callable[[str], None] | None = None,
+        model: str | None = None,
+        phase: str | None = None,
+        prefix: str = "",
+    ) -> tuple[str, dict[str, int], str]:
         """
         Run one LLM turn with a fresh session and retry logic for rate limiting.
         
+        When the model is quota-exhausted (429 or open circuit) and a fallback
+        model is configured, the turn switches to the fallback immediately
+        instead of sleeping. With hedging enabled, slow calls get a duplicate
+        request (see `_call_hedged`).
+
         Args:
             prompt: The prompt to send to the LLM
             max_retries: Maximum number of retry attempts
+            on_delta: Optional callback for streamed partial text
+            model: Model to use (defaults to the primary model)
+            phase: Phase whose timings the waits are added to (None: not timed)
+            prefix: The start of `prompt` shared with other turns (cached per model)
             
         Returns:
-            The LLM response text
+            The LLM response text, its token usage and the model that produced it
             
         Raises:
             Exception: If all retries are exhausted
         """
-        session_id = self._next_session_id()
-        try:
-            await self._session_service.create_session(
-                app_name=APP_NAME,
-                user_id=self._user_id,
-                session_id=session_id,
-            )
-        except Exception:
-            pass
-        
+        model = model or self.model
         last_exception = None
+        self.metrics["context_cache"]["prompt_chars"] += len(prompt)
+        cached: dict[str, CachedPrompt] = {}
         for attempt in range(max_retries):
             try:
-                return await _run_agent_for_prompt(
-                    self._runner, self._user_id, session_id, prompt
-                )
-            except Exception as e:
+                if model not in cached:
+                    cached[model] = await self._cached_prompt(model, prompt, prefix)
+                text, usage = await self._call_shared(model, cached[model], on_delta, attempt, phase)
+                return text, usage, model
+            except CircuitOpenError as e:
+                if not self._can_fall_back(model):
+                    raise
                 last_exception = e
+                retry_delay = e.retry_after
+            except Exception as e:
                 error_str = str(e)
-                
-                # Check if it's a rate limit error (429 RESOURCE_EXHAUSTED)
-                if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                    # Extract retry delay from error message if available
-                    retry_delay = INITIAL_RETRY_DELAY * (2 ** attempt)  # Exponential backoff
-                    
-                    # Try to parse the suggested retry delay from the error
-                    if "retry in" in error_str.lower():
-                        try:
-                            import re
-                            match = re.search(r'retry in (\d+\.?\d*)s', error_str.lower())
-                            if match:
-                                suggested_delay = float(match.group(1))
-                                retry_delay = max(retry_delay, suggested_delay)
-                        except Exception:
-                            pass
-                    
-                    if attempt < max_retries - 1:
-                        logger.warning(
-                            f"Rate limit hit (attempt {attempt + 1}/{max_retries}). "
-                            f"Retrying in {retry_delay:.1f}s..."
-                        )
-                        await asyncio.sleep(retry_delay)
-                        continue
-                    else:
-                        logger.error(f"Rate limit exceeded after {max_retries} attempts")
-                        raise RuntimeError(
-                            f"Rate limit exceeded. Please wait a few minutes and try again. "
-                            f"For more info: https://ai.google.dev/gemini-api/docs/rate-limits"
-                        ) from e
-                else:
+                if not _is_rate_limit_error(error_str):
                     # Non-rate-limit error, raise immediately
                     raise
-        
+                last_exception = e
+                retry_delay = _retry_delay(error_str, attempt)
+
+            if on_delta is not None:
+                # Streamed text from the failed attempt is discarded
+                self._emit({"type": "reset"})
+            if self._can_fall_back(model):
+                logger.warning(f"Model {model} quota exhausted; falling back to {self.fallback_model}")
+                model = self.fallback_model
+                continue
+            if attempt < max_retries - 1:
+                logger.warning(
+                    f"Rate limit hit (attempt {attempt + 1}/{max_retries}). "
+                    f"Retrying in {retry_delay:.1f}s..."
+                )
+                continue
+            logger.error(f"Rate limit exceeded after {max_retries} attempts")
+            raise RuntimeError(
+                f"Rate limit exceeded. Please wait a few minutes and try again. "
+                f"For more info: https://ai.google.dev/gemini-api/docs/rate-limits"
+            ) from last_exception
+
         # If we get here, all retries failed
         raise last_exception or RuntimeError("Failed to get LLM response")
 
-    async def run_debate(self) -> dict[str, Any]:
+    async def _cached_prompt(self, model: str, prompt: str, prefix: str) -> CachedPrompt:
+        """`prompt` carrying the context cache's handle for its prefix on `model` (hits are counted)."""
+        handle = None
+        if self._context_cache is not None and prefix:
+            handle, hit = await self._context_cache.acquire(model, prefix)
+            stats = self.metrics["context_cache"]
+            if handle is not None:
+                stats["lookups"] += 1
+                stats["hits"] += int(hit)
+                stats["cached_chars"] += len(prefix) if hit else 0
+                stats["hit_ratio"] = round(stats["hits"] / stats["lookups"], 3)
+                stats["cached_fraction"] = round(stats["cached_chars"] / stats["prompt_chars"], 3)
+        return CachedPrompt(prefix, prompt[len(prefix):], handle)
+
+    def _can_fall_back(self, model: str) -> bool:
+        return bool(self.fallback_model) and model != self.fallback_model
+
+    def _emit(self, event: dict[str, Any]) -> None:
+        """Pass an event to the subscriber of the current debate, if any."""
+        if self._on_event is not None:
+            self._on_event(event)
+
+    def _emit_message(self, state: dict[str, Any]) -> None:
+        """Emit the message just recorded (last in the transcript)."""
+        if self._on_event is not None and state["messages"]:
+            self._emit({"type": "message", **state["messages"][-1]})
+
+    def _delta_callback(
+        self, persona_id: str, phase: str, round_index: int
+    ) -> Callable[[str], None] | None:
+        """Build an on_delta callback that tags streamed text with its turn."""
+        if self._on_event is None:
+            return None
+        tag = {"persona_id": persona_id, "phase": phase, "round_index": round_index}
+
+        def on_delta(text: str) -> None:
+            self._emit({"type": "delta", **tag, "text": text})
+
+        return on_delta
+
+    async def _generate(
+        self,
+        state: dict[str, Any],
+        phase: str,
+        prompt: str,
+        persona_id: str,
+        round_index: int = 0,
+        prefix: str = "",
+    ) -> tuple[str, dict[str, Any]]:
+        """Run one turn and record its token usage in the state and metrics."""
+        on_delta = self._delta_callback(persona_id, phase, round_index)
+        routed = self.route(phase)
+        text, usage, model = await self._run_turn(
+            prompt, on_delta=on_delta, model=routed, phase=phase, prefix=prefix
+        )
+        fallback = model != routed
+        state = self._timed(phase, "state", record_route, phase, persona_id, round_index, model, fallback, state)
+        self.metrics["routes"][model] = self.metrics["routes"].get(model, 0) + 1
+        self.metrics["fallbacks"] += int(fallback)
+        state = self._timed(
+            phase,
+            "state",
+            record_token_usage,
+            phase,
+            usage["prompt_tokens"],
+            usage["completion_tokens"],
+            usage["total_tokens"],
+            state,
+        )
+        self._max_turn_tokens = max(self._max_turn_tokens, usage["total_tokens"])
+        self.metrics["turns"] += 1
+        self.metrics["token_usage"] = state["token_usage"]
+        self.metrics["token_total"] = state["token_total"]
+        self.state = state
+        return text, state
+
+    def _budget_allows(self, state: dict[str, Any], turns_ahead: int) -> bool:
+        """
+        Whether `turns_ahead` more turns still fit in the token budget while
+        leaving room for the arbitration turn. Projects from the average cost
+        of the turns so far; the largest turn seen is reserved for arbitration.
+        """
+        if self.token_budget is None:
+            return True
+        spent = state["token_total"]["total_tokens"]
+        turns = max(len(state["routes"]), 1)  # one route per LLM turn, also after a resume
+        average = spent / turns
+        projected = spent + average * turns_ahead + max(self._max_turn_tokens, average)
+        return projected <= self.token_budget
+
+    def _stop_for_budget(self, state: dict[str, Any], skipped: str) -> dict[str, Any]:
+        """Record that the budget cut the debate short and skip to arbitration."""
+        logger.warning(
+            f"Token budget {self.token_budget} would be exceeded "
+            f"(spent {state['token_total']['total_tokens']}); skipping {skipped}"
+        )
+        self.metrics["budget_exhausted"] = True
+        self.state = self._timed(state["phase"], "state", mark_budget_exhausted, state)
+        return self.state
+
+    def _timed(self, phase: str, kind: str, tool: Callable[..., Any], *args: Any) -> Any:
+        """Call a tool, adding its run time to the phase's `kind` time ("prompt" or "state")."""
+        started = time.perf_counter()
+        try:
+            return tool(*args)
+        finally:
+            self.timings.add(phase, kind, time.perf_counter() - started)
+
+    def _prompt(
+        self, phase: str, persona_id: str, state: dict[str, Any], round_index: int = 0
+    ) -> tuple[str, str]:
+        """A turn's prompt and its shared prefix (see build_prompt_parts), timed as prompt time."""
+        parts = self._timed(phase, "prompt", build_prompt_parts, phase, persona_id, state, round_index)
+        return parts["prefix"] + parts["suffix"], parts["prefix"]
+
+    async def _pause(self, phase: str, seconds: float) -> None:
+        """Sleep between turns or phases, counted as the phase's pacing time."""
+        started = _now()
+        await asyncio.sleep(seconds)
+        self.timings.add(phase, "pacing", _now() - started)
+
+    async def run_debate(
+        self, on_event: EventCallback | None = None, state: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
         """
         Run the full debate: opening -> defence -> exchange (3-4 rounds) -> reflection -> arbitration.
         Returns the final state dict.
         
-        Includes delays between phases to avoid rate limiting.
+        Includes delays between phases to avoid rate limiting. When a token
+        budget is set and the next round would exceed it, the remaining
+        exchange rounds (and reflection) are skipped and the debate goes
+        straight to arbitration.
+
+        If `on_event` is given, replies are streamed and it receives "phase"
+        events when a new phase starts, "delta" events (partial text tagged
+        with persona_id, phase and round_index),
+        a "reset" event when a failed attempt's partial text must be dropped,
+        a "message" event per recorded message and a final "done" event.
+
+        If `state` is given (e.g. a checkpoint saved on shutdown), the debate
+        resumes from it: turns already in its transcript are not redone.
+        """
+        self._on_event = on_event
+        try:
+            state = await self._run_phases(state)
+        finally:
+            self._on_event = None
+        # Once per debate: a limiter's quota bucket is read from the shared store
+        self.metrics["limiters"] = await asyncio.to_thread(self._limiter_snapshots)
+        if on_event is not None:
+            on_event({"type": "done", "state": state})
+        return state
+
+    def _limiter_snapshots(self) -> dict[str, dict[str, Any]]:
+        """Limiter state of every model this run called."""
+        return {model: self._limiter_for(model).snapshot() for model in self.metrics["routes"]}
+
+    async def stream_debate(
+        self, state: dict[str, Any] | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Run (or resume) the debate and yield its events as they happen (see
+        `run_debate`). An "error" event with a detail string is yielded if the
+        debate fails.
+        """
+        queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        task = asyncio.create_task(self.run_debate(on_event=queue.put_nowait, state=state))
+        task.add_done_callback(lambda _: queue.put_nowait({"type": "_finished"}))
+        try:
+            while True:
+                event = await queue.get()
+                if event["type"] == "_finished":
+                    break
+                yield event
+            if not task.cancelled() and task.exception() is not None:
+                yield {"type": "error", "detail": str(task.exception())}
+        finally:
+            if not task.done():
+                task.cancel()
+
+    async def judge(self, state: dict[str, Any]) -> dict[str, Any]:
+        """
+        Ask the model which debater of a finished debate argued best: one
+        extra turn on the arbitration route, not recorded in the state.
+
+        Returns:
+            {"winner": debater id or None for a draw, "verdict": reply text, "usage": token usage}
+        """
+        prompt, prefix = self._prompt("verdict", "arbitrator", state)
+        text, usage, _ = await self._run_turn(prompt, model=self.route("arbitration"), prefix=prefix)
+        return {"winner": parse_verdict(text, state), "verdict": text.strip(), "usage": usage}
+
+    def _recorded(self, state: dict[str, Any]) -> dict[str, Any]:
         """
-        state = create_initial_state(max_exchange_rounds=self.max_exchange_rounds)
+        Emit the message just recorded, spill older messages of a debate with a
+        segment, and keep the latest state for checkpointing.
+        """
+        self._emit_message(state)
+        if state.get("segment"):
+            state = self._timed(state["messages"][-1]["phase"], "state", spill_transcript, state)
+        self.state = state
+        return state
+
+    async def _enter_phase(self, state: dict[str, Any], phase: str) -> dict[str, Any]:
+        """Advance to `phase` unless a resumed state is already there or past it."""
+        if PHASE_ORDER.index(state["phase"]) >= PHASE_ORDER.index(phase):
+            return state
+        state = self._timed(phase, "state", advance_phase, state, phase)
+        self.state = state
+        self._emit({"type": "phase", "phase": phase})
+        await self._pause(phase, PHASE_DELAY)  # Delay before starting new phase
+        return state
+
+    async def _run_phases(self, state: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Run every phase in order (skipping turns already in `state`) and return the final state."""
+        if state is None:
+            state = create_initial_state(
+                max_exchange_rounds=self.max_exchange_rounds,
+                token_budget=self.token_budget,
+                debaters=self.debaters,
+                spill=self.spill,
+            )
+        self.state = state
+        if state["phase"] == "done":
+            return state
+        self.timings = PhaseTimer(state.get("timings"))
+        panel = state.get("debaters") or DEBATER_IDS
+        spoken = {
+            (m["phase"], m["author_id"], m.get("round_index", 0)) for m in iter_messages(state)
+        }
 
         # 1. Opening statements
         logger.info("Starting opening statements phase")
-        for persona_id in DEBATER_IDS:
-            prompt = build_opening_prompt(persona_id)
-            text = await self._run_turn(prompt)
-            state = record_opening(persona_id, text.strip() or "(No opening)", state)
-            await asyncio.sleep(1)  # Small delay between personas
+        for persona_id in panel:
+            if ("opening", persona_id, 0) in spoken:
+                continue
+            prompt, prefix = self._prompt("opening", persona_id, state)
+            text, state = await self._generate(state, "opening", prompt, persona_id, prefix=prefix)
+            state = self._recorded(
+                self._timed("opening", "state", record_opening, persona_id, text.strip() or "(No opening)", state)
+            )
+            await self._pause("opening", TURN_DELAY)  # Small delay between personas
 
         # 2. Advance to defence; collect openings and ask each to defend
         logger.info("Starting defence phase")
-        state = advance_phase(state, "defence")
-        await asyncio.sleep(2)  # Delay before starting new phase
-        
-        for persona_id in DEBATER_IDS:
-            prompt = build_defence_prompt(persona_id, state)
-            text = await self._run_turn(prompt)
-            state = record_defence(persona_id, text.strip() or "(No defence)", state)
-            await asyncio.sleep(1)  # Small delay between personas
+        state = await self._enter_phase(state, "defence")
+        for persona_id in panel:
+            if ("defence", persona_id, 0) in spoken:
+                continue
+            prompt, prefix = self._prompt("defence", persona_id, state)
+            text, state = await self._generate(state, "defence", prompt, persona_id, prefix=prefix)
+            state = self._recorded(
+                self._timed("defence", "state", record_defence, persona_id, text.strip() or "(No defence)", state)
+            )
+            await self._pause("defence", TURN_DELAY)  # Small delay between personas
 
         # 3. Exchange rounds (3-4 rounds, each debater speaks per round)
         logger.info(f"Starting exchange phase ({self.max_exchange_rounds} rounds)")
-        state = advance_phase(state, "exchange")
-        await asyncio.sleep(2)  # Delay before starting new phase
-        
+        state = await self._enter_phase(state, "exchange")
         for r in range(1, self.max_exchange_rounds + 1):
-            logger.info(f"Exchange round {r}/{self.max_exchange_rounds}")
-            for persona_id in DEBATER_IDS:
-                prompt = build_exchange_prompt(persona_id, state, r)
-                text = await self._run_turn(prompt)
-                state = record_exchange_message(
-                    persona_id, text.strip() or "(No response)", state, r
+            if state["budget_exhausted"]:
+                break
+            pending = [p for p in panel if ("exchange", p, r) not in spoken]
+            if len(pending) == len(panel) and not self._budget_allows(state, len(pending)):
+                state = self._stop_for_budget(state, f"exchange rounds {r}-{self.max_exchange_rounds}")
+                break
+            if pending:
+                logger.info(f"Exchange round {r}/{self.max_exchange_rounds}")
+            for persona_id in pending:
+                prompt, prefix = self._prompt("exchange", persona_id, state, r)
+                text, state = await self._generate(state, "exchange", prompt, persona_id, r, prefix)
+                state = self._recorded(
+                    self._timed(
+                        "exchange", "state", record_exchange_message,
+                        persona_id, text.strip() or "(No response)", state, r,
+                    )
                 )
-                await asyncio.sleep(1)  # Small delay between personas
-            if r < self.max_exchange_rounds:
-                state = advance_exchange_round(state)
-                await asyncio.sleep(2)  # Delay between rounds
+                await self._pause("exchange", TURN_DELAY)  # Small delay between personas
+            if r < self.max_exchange_rounds and state["exchange_rounds"] <= r:
+                state = self._timed("exchange", "state", advance_exchange_round, state)
+                self.state = state
+                await self._pause("exchange", PHASE_DELAY)  # Delay between rounds
 
         # 4. Reflection: would you change your position?
-        logger.info("Starting reflection phase")
-        state = advance_phase(state, "reflection")
-        await asyncio.sleep(2)  # Delay before starting new phase
-        
-        for persona_id in DEBATER_IDS:
-            prompt = build_reflection_prompt(persona_id, state)
-            text = await self._run_turn(prompt)
-            state = record_reflection(
-                persona_id, text.strip() or "(No reflection)", state
-            )
-            await asyncio.sleep(1)  # Small delay between personas
+        pending = [p for p in panel if ("reflection", p, 0) not in spoken]
+        if (
+            not state["budget_exhausted"]
+            and len(pending) == len(panel)
+            and not self._budget_allows(state, len(pending))
+        ):
+            state = self._stop_for_budget(state, "reflection")
+        if not state["budget_exhausted"]:
+            logger.info("Starting reflection phase")
+            state = await self._enter_phase(state, "reflection")
+            for persona_id in pending:
+                prompt, prefix = self._prompt("reflection", persona_id, state)
+                text, state = await self._generate(state, "reflection", prompt, persona_id, prefix=prefix)
+                state = self._recorded(
+                    self._timed(
+                        "reflection", "state", record_reflection,
+                        persona_id, text.strip() or "(No reflection)", state,
+                    )
+                )
+                await self._pause("reflection", TURN_DELAY)  # Small delay between personas
 
         # 5. Arbitration: bring all viewpoints to consensus (final phase)
         logger.info("Starting arbitration phase - bringing viewpoints to consensus")
-        state = advance_phase(state, "arbitration")
-        await asyncio.sleep(2)  # Delay before starting new phase
-        
-        prompt = build_arbitration_prompt(state)
-        arbitration_text = await self._run_turn(prompt)
-        state = record_arbitration(arbitration_text.strip() or "(No arbitration)", state)
-        
-        logger.info("Debate completed successfully")
+        state = await self._enter_phase(state, "arbitration")
+        prompt, prefix = self._prompt("arbitration", "arbitrator", state)
+        arbitration_text, state = await self._generate(state, "arbitration", prompt, "arbitrator", prefix=prefix)
+        state = self._recorded(
+            self._timed(
+                "arbitration", "state", record_arbitration,
+                arbitration_text.strip() or "(No arbitration)", state,
+            )
+        )
+        state = record_timings(self.timings.as_dict(), state)
+        self.state = state
+
+        logger.info(
+            f"Debate completed successfully ({state['token_total']['total_tokens']} tokens)"
+        )
         return state
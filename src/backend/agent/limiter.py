@@ -0,0 +1,414 @@
+"""
+Shared adaptive concurrency controller for LLM calls.
+
+Every coordinator in the process goes through one limiter so concurrent debates
+see each other's 429s: the in-flight limit follows AIMD (additive increase on
+success, multiplicative decrease on rate limits or latency spikes), a provider
+retry-after blocks all callers at once, and sustained exhaustion opens a
+circuit so callers fail fast instead of multiplying failed calls. Callers
+waiting for a slot are dispatched in weighted-fair order by priority class
+(see `backend.agent.scheduler`).
+
+With several worker processes, a QuotaBucket in the shared store
+(`backend.agent.store`) additionally paces calls against the model's
+requests-per-minute quota across all of them, and shares provider retry-afters.
+Store calls can wait up to the store's lock timeout, so on the event loop they
+run in a worker thread.
+"""
+
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+import asyncio
+import json
+import logging
+import time
+
+from backend.agent.scheduler import INTERACTIVE, WeightedFairQueue
+from backend.agent.store import MemoryStore, SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INITIAL_LIMIT = 4
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 16
+FAILURE_THRESHOLD = 5  # consecutive 429s before the circuit opens
+OPEN_SECONDS = 60.0  # how long the circuit stays open before a probe
+DECREASE_COOLDOWN = 1.0  # at most one multiplicative decrease per window
+LATENCY_TOLERANCE = 3.0  # latency above this multiple of the baseline counts as congestion
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when the circuit is open; `retry_after` is seconds until the next probe."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(
+            f"Rate limit exceeded: model quota exhausted, retry in {retry_after:.0f}s. "
+            f"For more info: https://ai.google.dev/gemini-api/docs/rate-limits"
+        )
+
+
+class QuotaBucket:
+    """
+    Token bucket for one model's requests-per-minute quota, kept in the shared
+    store so every worker process draws from the same bucket.
+    """
+
+    def __init__(
+        self,
+        store: MemoryStore | SQLiteStore,
+        key: str,
+        rpm: float,
+        burst: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            store: Shared store holding the bucket.
+            key: Store key of the bucket (one per model quota).
+            rpm: Sustained calls per minute across all workers.
+            burst: Calls that may start back to back after an idle period.
+            clock: Wall clock; must agree across processes.
+        """
+        self.store = store
+        self.key = key
+        self.rpm = rpm
+        self.burst = burst if burst is not None else max(1.0, rpm / 4)
+        self._clock = clock
+
+    def _refill(self, raw: str | None, now: float) -> dict[str, float]:
+        bucket = json.loads(raw) if raw else {"tokens": self.burst, "ts": now, "blocked_until": 0.0}
+        elapsed = max(0.0, now - bucket["ts"])
+        bucket["tokens"] = min(self.burst, bucket["tokens"] + elapsed * self.rpm / 60.0)
+        bucket["ts"] = now
+        return bucket
+
+    def try_take(self) -> float:
+        """Take a token if one is available; otherwise return the seconds to wait for one."""
+        wait = 0.0
+
+        def take(raw: str | None) -> str:
+            nonlocal wait
+            now = self._clock()
+            bucket = self._refill(raw, now)
+            if now < bucket["blocked_until"]:
+                wait = bucket["blocked_until"] - now
+            elif bucket["tokens"] >= 1.0 - 1e-9:  # tolerate float drift in the refill
+                bucket["tokens"] = max(0.0, bucket["tokens"] - 1.0)
+                wait = 0.0
+            else:
+                wait = (1.0 - bucket["tokens"]) * 60.0 / self.rpm
+            return json.dumps(bucket)
+
+        self.store.update(self.key, take)
+        return wait
+
+    async def take(self) -> None:
+        """Wait until this worker may start one call under the shared quota (store calls off the loop)."""
+        while (wait := await asyncio.to_thread(self.try_take)) > 0:
+            await asyncio.sleep(wait)
+
+    def block(self, retry_after: float) -> None:
+        """Share a provider retry-after with every worker."""
+
+        def extend(raw: str | None) -> str:
+            now = self._clock()
+            bucket = self._refill(raw, now)
+            bucket["blocked_until"] = max(bucket["blocked_until"], now + retry_after)
+            return json.dumps(bucket)
+
+        self.store.update(self.key, extend)
+
+    def snapshot(self) -> dict[str, float]:
+        bucket = self._refill(self.store.get(self.key), self._clock())
+        return {
+            "rpm": self.rpm,
+            "burst": self.burst,
+            "tokens": round(bucket["tokens"], 2),
+            "blocked_for": round(max(0.0, bucket["blocked_until"] - bucket["ts"]), 3),
+        }
+
+
+class AdaptiveLimiter:
+    """AIMD in-flight limit, shared retry-after and circuit breaker for LLM calls."""
+
+    def __init__(
+        self,
+        initial_limit: int = DEFAULT_INITIAL_LIMIT,
+        min_limit: int = DEFAULT_MIN_LIMIT,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        decrease_factor: float = 0.5,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        open_seconds: float = OPEN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        weights: dict[str, float] | None = None,
+        bucket: QuotaBucket | None = None,
+    ):
+        self.bucket = bucket  # cross-process quota pacing, if configured
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._opened_until = 0.0
+        self._state = CLOSED
+        self._probe_in_flight = False
+        self._consecutive_rate_limits = 0
+        self._last_decrease = float("-inf")
+        self._latencies: deque[float] = deque(maxlen=50)
+        self._queue = WeightedFairQueue(weights)
+        self._timer: asyncio.TimerHandle | None = None
+        self.stats = {"calls": 0, "successes": 0, "rate_limited": 0, "circuit_opens": 0, "rejected": 0}
+        self.queue_stats = {
+            cls: {"dispatched": 0, "total_wait_s": 0.0, "max_wait_s": 0.0}
+            for cls in self._queue.weights
+        }
+
+    @property
+    def limit(self) -> int:
+        """Current number of LLM calls allowed in flight."""
+        if self._state == HALF_OPEN:
+            return 1
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def state(self) -> str:
+        """Circuit state: 'closed', 'open' or 'half_open'."""
+        if self._state == OPEN and self._clock() >= self._opened_until:
+            self._state = HALF_OPEN
+        return self._state
+
+    def has_spare_capacity(self) -> bool:
+        """Whether an extra (e.g. hedged) call could start right now without queueing."""
+        return (
+            self.state == CLOSED
+            and self.retry_after() == 0
+            and not self._queue
+            and self._in_flight < self.limit
+        )
+
+    def retry_after(self) -> float:
+        """Seconds until a new call may start (shared backoff or open circuit)."""
+        now = self._clock()
+        until = max(self._blocked_until, self._opened_until if self.state == OPEN else 0.0)
+        return max(0.0, until - now)
+
+    async def acquire(self, priority: str = INTERACTIVE) -> bool:
+        """
+        Wait for a free slot and any shared retry-after to pass. Waiters are
+        granted slots in weighted-fair order of their priority class.
+
+        Returns:
+            Whether the slot is the half-open circuit's probe; pass it to `release`.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (fail fast).
+            ValueError: If `priority` is not a known class.
+        """
+        self._queue.check(priority)
+        if self.state == OPEN:
+            self.stats["rejected"] += 1
+            raise CircuitOpenError(self.retry_after())
+        waiter = asyncio.get_running_loop().create_future()
+        self._queue.push(priority, (waiter, self._clock()))
+        self._dispatch()
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                # Granted just as the caller was cancelled: hand the slot on
+                self.release(waiter.result())
+            raise
+
+    def release(self, probe: bool = False) -> None:
+        """
+        Free the slot taken by `acquire`.
+
+        Args:
+            probe: What `acquire` returned. Only the probe's own release lets
+                another half-open probe start; calls that began before the
+                circuit opened may finish while it is half open.
+        """
+        self._in_flight = max(0, self._in_flight - 1)
+        if probe:
+            self._probe_in_flight = False
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: str = INTERACTIVE) -> AsyncIterator[None]:
+        """`async with limiter.slot(priority):` around one LLM call."""
+        probe = await self.acquire(priority)
+        try:
+            if self.bucket is not None:
+                await self.bucket.take()
+            yield
+        finally:
+            self.release(probe)
+
+    def _has_free_slot(self) -> bool:
+        if self.state == HALF_OPEN and self._probe_in_flight:
+            return False
+        return self._in_flight < self.limit
+
+    def _dispatch(self) -> None:
+        """Grant slots to queued waiters while capacity allows."""
+        if not self._queue:
+            return
+        if self.state == OPEN:
+            for _, (waiter, _) in self._queue.drain():
+                if not waiter.done():
+                    self.stats["rejected"] += 1
+                    waiter.set_exception(CircuitOpenError(self.retry_after()))
+            return
+        wait = self.retry_after()
+        if wait > 0:
+            self._dispatch_later(wait)
+            return
+        while self._queue and self._has_free_slot():
+            priority, (waiter, enqueued_at) = self._queue.pop()
+            if waiter.done() or waiter.get_loop().is_closed():
+                continue  # caller gave up while queued
+            self._in_flight += 1
+            self.stats["calls"] += 1
+            probe = self.state == HALF_OPEN
+            if probe:
+                self._probe_in_flight = True
+            waited = self._clock() - enqueued_at
+            stats = self.queue_stats[priority]
+            stats["dispatched"] += 1
+            stats["total_wait_s"] += waited
+            stats["max_wait_s"] = max(stats["max_wait_s"], waited)
+            waiter.set_result(probe)
+
+    def _dispatch_later(self, delay: float) -> None:
+        """Re-run dispatch once the shared retry-after has passed."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop: the next acquire/release dispatches
+        if self._timer is not None and not self._timer.cancelled():
+            self._timer.cancel()
+        self._timer = loop.call_later(delay, self._dispatch)
+
+    def record_success(self, latency: float) -> None:
+        """Additive increase; a latency spike well above the baseline counts as congestion."""
+        self.stats["successes"] += 1
+        self._consecutive_rate_limits = 0
+        if self._state == HALF_OPEN:
+            self._state = CLOSED
+        baseline = min(self._latencies) if self._latencies else None
+        self._latencies.append(latency)
+        if baseline and latency > LATENCY_TOLERANCE * baseline:
+            self._decrease()
+        else:
+            self._limit = min(self.max_limit, self._limit + 1.0 / max(self._limit, 1.0))
+            self._dispatch()
+
+    def record_rate_limited(self, retry_after: float) -> None:
+        """Multiplicative decrease, block every caller for `retry_after`, maybe open the circuit."""
+        self.stats["rate_limited"] += 1
+        self._consecutive_rate_limits += 1
+        now = self._clock()
+        self._blocked_until = max(self._blocked_until, now + retry_after)
+        if self.bucket is not None:
+            self._share_block(retry_after)
+        self._decrease()
+        if self._state == HALF_OPEN or self._consecutive_rate_limits >= self.failure_threshold:
+            self._state = OPEN
+            self._opened_until = now + max(self.open_seconds, retry_after)
+            self.stats["circuit_opens"] += 1
+        self._dispatch()
+
+    def _share_block(self, retry_after: float) -> None:
+        """Write a retry-after to the shared bucket, in a worker thread when on the event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # no event loop (scripts, tests): write it now
+            self.bucket.block(retry_after)
+            return
+        write = loop.run_in_executor(None, self.bucket.block, retry_after)
+        write.add_done_callback(_log_store_failure)
+
+    def _decrease(self) -> None:
+        now = self._clock()
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current limit, circuit state and counters for metrics."""
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "state": self.state,
+            "retry_after": round(self.retry_after(), 3),
+            **self.stats,
+            "queues": self.queue_wait(),
+            **({"quota": self.bucket.snapshot()} if self.bucket is not None else {}),
+        }
+
+    def queue_wait(self) -> dict[str, dict[str, Any]]:
+        """Per priority class: turns waiting now, dispatched so far, mean and max queue wait."""
+        return {
+            cls: {
+                "waiting": self._queue.waiting(cls),
+                "dispatched": stats["dispatched"],
+                "avg_wait_s": round(stats["total_wait_s"] / stats["dispatched"], 3)
+                if stats["dispatched"]
+                else 0.0,
+                "max_wait_s": round(stats["max_wait_s"], 3),
+            }
+            for cls, stats in self.queue_stats.items()
+        }
+
+
+def _log_store_failure(write: asyncio.Future) -> None:
+    if not write.cancelled() and write.exception() is not None:
+        logger.error(f"Sharing a retry-after failed: {write.exception()}")
+
+
+_shared_limiters: dict[str, AdaptiveLimiter] = {}
+_shared_quota: tuple[MemoryStore | SQLiteStore, float] | None = None
+
+
+def configure_shared_quota(store: MemoryStore | SQLiteStore | None, rpm: float | None = None) -> None:
+    """
+    Pace every shared limiter against a per-model `rpm` quota held in `store`,
+    so all worker processes using that store stay under it together.
+    Pass None to turn it off. Applies to limiters created afterwards.
+    """
+    global _shared_quota
+    _shared_quota = (store, rpm) if store is not None and rpm else None
+
+
+def shared_limiters() -> dict[str, AdaptiveLimiter]:
+    """All process-wide limiters created so far, by key."""
+    return dict(_shared_limiters)
+
+
+def get_shared_limiter(key: str = "default") -> AdaptiveLimiter:
+    """
+    The process-wide limiter for one quota (usually one model name), shared
+    by every DebateCoordinator.
+    """
+    if key not in _shared_limiters:
+        bucket = None
+        if _shared_quota is not None:
+            store, rpm = _shared_quota
+            bucket = QuotaBucket(store, f"quota:{key}", rpm)
+        _shared_limiters[key] = AdaptiveLimiter(bucket=bucket)
+    return _shared_limiters[key]
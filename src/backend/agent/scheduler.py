@@ -0,0 +1,61 @@
+"""
+Weighted-fair queueing of LLM turns across priority classes.
+
+Interactive debates and batch runs share one model quota. Waiting turns are
+ordered by start-time fair queueing: each class gets a share of dispatches
+proportional to its weight, so interactive turns go first while batch work
+still progresses on the spare capacity.
+"""
+
+from collections import deque
+from typing import Any
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+# Interactive turns are dispatched ten times as often as batch turns under contention
+DEFAULT_WEIGHTS = {INTERACTIVE: 10.0, BATCH: 1.0}
+
+
+class WeightedFairQueue:
+    """FIFO per priority class; `pop` picks the class with the smallest virtual finish tag."""
+
+    def __init__(self, weights: dict[str, float] | None = None):
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self._queues: dict[str, deque[tuple[float, Any]]] = {cls: deque() for cls in self.weights}
+        self._last_finish = {cls: 0.0 for cls in self.weights}
+        self._virtual_time = 0.0
+
+    def check(self, priority: str) -> None:
+        """Raise ValueError for an unknown priority class."""
+        if priority not in self.weights:
+            raise ValueError(
+                f"Unknown priority {priority!r}; expected one of {sorted(self.weights)}"
+            )
+
+    def push(self, priority: str, item: Any) -> None:
+        """Queue `item` in its class, tagged so the class gets its weighted share."""
+        self.check(priority)
+        # An idle class restarts at the current virtual time (no saved-up credit)
+        tag = max(self._virtual_time, self._last_finish[priority]) + 1.0 / self.weights[priority]
+        self._last_finish[priority] = tag
+        self._queues[priority].append((tag, item))
+
+    def pop(self) -> tuple[str, Any]:
+        """Remove and return (priority, item) with the smallest finish tag."""
+        _, priority = min((queue[0][0], cls) for cls, queue in self._queues.items() if queue)
+        tag, item = self._queues[priority].popleft()
+        self._virtual_time = tag
+        return priority, item
+
+    def drain(self) -> list[tuple[str, Any]]:
+        """Remove and return every queued item."""
+        items = [(cls, item) for cls, queue in self._queues.items() for _, item in queue]
+        for queue in self._queues.values():
+            queue.clear()
+        return items
+
+    def waiting(self, priority: str) -> int:
+        return len(self._queues[priority])
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
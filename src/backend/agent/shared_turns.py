@@ -0,0 +1,101 @@
+"""
+Shared turns: one model call per distinct prompt across many debates.
+
+When several debates run the same persona, some of their turns have exactly
+the same prompt (an opening depends only on the persona; two matches with
+the same panel share every turn up to their first differing reply).
+SharedTurns keys calls by (model, prompt): the first call goes to the
+model, later identical calls, also ones arriving while it is still in
+flight, get its reply. Reused replies report zero token usage, since nothing
+was spent on them; the tokens they would have cost are counted in
+`saved_tokens`.
+
+The coordinator asks `call` before taking a limiter slot, so a reused reply
+takes no slot or quota and is not fed to the limiter or the hedging
+latencies as a (near zero) model latency. `wrap` applies the same sharing to
+a bare transport.
+
+A failed call is not kept, so the next identical call tries again. A caller
+being cancelled does not cancel the shared call for the others.
+"""
+
+from typing import Any, Awaitable, Callable
+import asyncio
+
+from backend.agent.cassette import Transport, prompt_key
+
+NO_USAGE = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+Reply = tuple[str, dict[str, int]]
+
+
+class SharedTurns:
+    """Deduplicates model calls by (model, prompt) across every transport it wraps."""
+
+    def __init__(self) -> None:
+        self._calls: dict[tuple[str, str], asyncio.Future[Reply]] = {}
+        self.calls = 0
+        self.generated = 0
+        self.shared = 0
+        self.saved_tokens = 0
+
+    async def call(
+        self,
+        model: str,
+        prompt: str,
+        generate: Callable[[], Awaitable[Reply]],
+        on_delta: Callable[[str], None] | None = None,
+    ) -> tuple[str, dict[str, int], bool]:
+        """
+        The reply to `prompt` on `model`: shared from an earlier or in-flight
+        identical call, else produced by `generate()` (which streams to its own
+        callback).
+
+        Args:
+            model: Model the prompt is for.
+            prompt: Full prompt text.
+            generate: Makes the model call when no identical one exists.
+            on_delta: Gets a shared reply's text in one piece.
+
+        Returns:
+            Text, token usage (zero when shared) and whether the reply was shared.
+        """
+        self.calls += 1
+        key = (model, prompt_key(prompt))
+        flight = self._calls.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(generate())
+            flight.add_done_callback(lambda done: self._forget_failed(key, done))
+            self._calls[key] = flight
+            self.generated += 1
+            text, usage = await asyncio.shield(flight)
+            return text, usage, False
+        text, usage = await asyncio.shield(flight)
+        self.shared += 1
+        self.saved_tokens += usage.get("total_tokens", 0)
+        if on_delta is not None and text:
+            on_delta(text)
+        return text, dict(NO_USAGE), True
+
+    def wrap(self, transport: Transport) -> Transport:
+        """A transport that serves repeated prompts from the shared calls and sends the rest to `transport`."""
+
+        async def call(model: str, prompt: str, on_delta: Callable[[str], None] | None = None) -> Reply:
+            text, usage, _ = await self.call(model, prompt, lambda: transport(model, prompt, on_delta), on_delta)
+            return text, usage
+
+        return call
+
+    def _forget_failed(self, key: tuple[str, str], flight: asyncio.Future) -> None:
+        if (flight.cancelled() or flight.exception() is not None) and self._calls.get(key) is flight:
+            del self._calls[key]
+
+    def snapshot(self) -> dict[str, Any]:
+        """Calls made through the wrappers, how many reached the model and how many were shared."""
+        return {
+            "calls": self.calls,
+            "generated": self.generated,
+            "shared": self.shared,
+            "shared_ratio": round(self.shared / self.calls, 3) if self.calls else 0.0,
+            "saved_tokens": self.saved_tokens,
+        }
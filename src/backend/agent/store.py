@@ -0,0 +1,221 @@
+"""
+Shared key-value store for state that must be seen by every worker process.
+
+With several uvicorn workers on one host, each process has its own limiters
+and job registry. The quota bucket and debate records are kept here instead,
+behind a small Redis-like interface (string values, optional expiry, glob
+`keys`, `incrby`) so a Redis client could stand in for the local backends:
+
+    memory://               process-local (single worker, tests)
+    sqlite:///relative.db   SQLite file shared by processes on the same host
+    sqlite:////abs/path.db
+
+`update` is the one compound operation: an atomic read-modify-write
+(BEGIN IMMEDIATE in SQLite, WATCH/MULTI in Redis). Calls block (SQLite waits
+up to SQLITE_TIMEOUT for another process's lock); async callers run them in a
+worker thread. Expired keys are hidden from reads at once and deleted by
+`purge_expired`, which the app runs periodically (Redis expires keys itself).
+"""
+
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Callable
+import sqlite3
+import threading
+import time
+
+SQLITE_TIMEOUT = 30.0  # seconds to wait for another process's write lock
+
+
+class MemoryStore:
+    """Process-local store; the default when workers do not need to share state."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._data: dict[str, tuple[str, float | None]] = {}  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> str | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and self._clock() >= expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    def _expiry(self, ex: float | None) -> float | None:
+        return None if ex is None else self._clock() + ex
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key: str, value: str, ex: float | None = None) -> None:
+        """Store `value`; with `ex`, the key expires after that many seconds."""
+        with self._lock:
+            self._data[key] = (value, self._expiry(ex))
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def keys(self, pattern: str = "*") -> list[str]:
+        with self._lock:
+            return sorted(
+                key for key in list(self._data) if fnmatchcase(key, pattern) and self._live(key) is not None
+            )
+
+    def incrby(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            value = int(self._live(key) or 0) + amount
+            expires_at = self._data[key][1] if key in self._data else None
+            self._data[key] = (str(value), expires_at)
+            return value
+
+    def update(
+        self, key: str, fn: Callable[[str | None], str | None], ex: float | None = None
+    ) -> str | None:
+        """
+        Atomically replace the value of `key` with `fn(old_value)`.
+
+        Args:
+            key: Key to update.
+            fn: Maps the current value (None if missing) to the new one; None deletes
+                the key. May be called more than once by retrying backends.
+            ex: Expiry in seconds for the new value.
+
+        Returns:
+            The new value.
+        """
+        with self._lock:
+            new = fn(self._live(key))
+            if new is None:
+                self._data.pop(key, None)
+            else:
+                self._data[key] = (new, self._expiry(ex))
+            return new
+
+    def purge_expired(self) -> int:
+        """Delete every expired key; returns how many were deleted."""
+        with self._lock:
+            return sum(self._live(key) is None for key in list(self._data))
+
+
+class SQLiteStore:
+    """Store in one SQLite file; every process on the host opening it shares the data."""
+
+    def __init__(self, path: str | Path, clock: Callable[[], float] = time.time):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Autocommit; compound operations open their own transaction
+        self._conn = sqlite3.connect(
+            self.path, timeout=SQLITE_TIMEOUT, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+
+    def _expiry(self, ex: float | None) -> float | None:
+        return None if ex is None else self._clock() + ex
+
+    def _get(self, key: str) -> str | None:
+        row = self._conn.execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, self._clock()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _put(self, key: str, value: str, expires_at: float | None) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at),
+        )
+
+    def _transaction(self, body: Callable[[], str | int | None]) -> str | int | None:
+        """Run `body` under SQLite's write lock, so no other process interleaves."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = body()
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            return self._get(key)
+
+    def set(self, key: str, value: str, ex: float | None = None) -> None:
+        """Store `value`; with `ex`, the key expires after that many seconds."""
+        with self._lock:
+            self._put(key, value, self._expiry(ex))
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(
+                self._conn.execute("DELETE FROM kv WHERE key = ?", (key,)).rowcount for key in keys
+            )
+
+    def keys(self, pattern: str = "*") -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM kv WHERE key GLOB ? AND (expires_at IS NULL OR expires_at > ?) "
+                "ORDER BY key",
+                (pattern, self._clock()),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def incrby(self, key: str, amount: int = 1) -> int:
+        def body() -> int:
+            value = int(self._get(key) or 0) + amount
+            row = self._conn.execute("SELECT expires_at FROM kv WHERE key = ?", (key,)).fetchone()
+            self._put(key, str(value), row[0] if row else None)
+            return value
+
+        return self._transaction(body)
+
+    def update(
+        self, key: str, fn: Callable[[str | None], str | None], ex: float | None = None
+    ) -> str | None:
+        """Atomically replace the value of `key` with `fn(old_value)` (see MemoryStore.update)."""
+
+        def body() -> str | None:
+            new = fn(self._get(key))
+            if new is None:
+                self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+            else:
+                self._put(key, new, self._expiry(ex))
+            return new
+
+        return self._transaction(body)
+
+    def purge_expired(self) -> int:
+        """Delete every expired key; returns how many were deleted."""
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (self._clock(),)
+            ).rowcount
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_store(url: str) -> MemoryStore | SQLiteStore:
+    """
+    Open the store named by `url` ("memory://" or "sqlite:///path/to/file.db").
+
+    Raises:
+        ValueError: For any other scheme.
+    """
+    if url in ("", "memory://"):
+        return MemoryStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported store URL {url!r}; expected memory:// or sqlite:///<path>")
@@ -0,0 +1,49 @@
+"""
+Per-phase breakdown of where a debate's wall-clock time goes.
+
+The coordinator adds to a PhaseTimer as it runs; the totals end up in the
+state's `timings` section (see record_timings) and the API's Server-Timing
+header. Kinds of time:
+
+    model_wait  waiting on model calls (hedged duplicates not counted twice)
+    backoff     waiting for a limiter slot: concurrency, pacing tokens, retry-after
+    pacing      the fixed delays between turns and phases
+    prompt      building prompts
+    state       recording turns, i.e. state (de)serialization in the tools
+"""
+
+from typing import Any
+
+KINDS = ("model_wait", "backoff", "pacing", "prompt", "state")
+
+
+class PhaseTimer:
+    """Milliseconds per phase and kind; a few dict updates per turn."""
+
+    def __init__(self, timings: dict[str, dict[str, float]] | None = None):
+        """
+        Args:
+            timings: A state's `timings` section to continue from (e.g. a resumed checkpoint).
+        """
+        self._ms: dict[str, dict[str, float]] = {
+            phase: {kind: t.get(f"{kind}_ms", 0.0) for kind in KINDS}
+            for phase, t in (timings or {}).items()
+        }
+
+    def add(self, phase: str, kind: str, seconds: float) -> None:
+        """Add `seconds` of `kind` time to `phase`."""
+        ms = self._ms.get(phase)
+        if ms is None:
+            ms = self._ms[phase] = dict.fromkeys(KINDS, 0.0)
+        ms[kind] += seconds * 1000
+
+    def total(self, kind: str) -> float:
+        """Milliseconds of `kind` time over all phases."""
+        return sum(ms[kind] for ms in self._ms.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Phase -> {model_wait_ms, backoff_ms, pacing_ms, prompt_ms, state_ms}, as in the state."""
+        return {
+            phase: {f"{kind}_ms": round(value, 3) for kind, value in ms.items()}
+            for phase, ms in self._ms.items()
+        }
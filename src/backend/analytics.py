@@ -0,0 +1,188 @@
+"""
+Vectorized analytics over a columnar debate corpus (see backend.columnar).
+
+    PYTHONPATH=src python3 -m backend.analytics corpus.simcol [--json]
+
+The corpus file is memory-mapped and its columns viewed as NumPy arrays; each
+aggregate is a few whole-corpus array operations (bincount over combined
+codes, sorts, masks) rather than a loop over debates or messages:
+
+    lengths     message count, mean and median characters per persona and phase
+    positions   share of reflections that concede or change position, per persona,
+                and the share of debates where at least one persona did
+    convergence exchange rounds before arbitration: mean, median and histogram,
+                and how many debates were cut short by their token budget
+
+Requires NumPy (`pip install numpy`); the export itself does not.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+import argparse
+import json
+import mmap
+import sys
+
+import numpy as np
+
+from backend.columnar import read_header
+
+_DTYPES = {"B": "<u1", "H": "<u2", "I": "<u4", "Q": "<u8", "bytes": "u1"}
+
+
+@dataclass
+class CorpusArrays:
+    """NumPy views of a corpus file's columns (zero-copy over the mapped file)."""
+
+    debate_ids: list[str]
+    personas: list[str]
+    phases: list[str]
+    concession_flag: int
+    columns: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.columns["debate"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+
+def load(path: str | Path) -> CorpusArrays:
+    """
+    Map a corpus file and view its columns as arrays.
+
+    Raises:
+        ValueError: Not a corpus file, or an unsupported version.
+    """
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if Path(path).stat().st_size else b""
+    header, base = read_header(data)
+    columns = {
+        name: np.frombuffer(
+            data, dtype=_DTYPES[spec["type"]], count=spec["nbytes"] // np.dtype(_DTYPES[spec["type"]]).itemsize,
+            offset=base + spec["offset"],
+        )
+        for name, spec in header["columns"].items()
+    }
+    return CorpusArrays(
+        debate_ids=header["debate_ids"],
+        personas=header["personas"],
+        phases=header["phases"],
+        concession_flag=header["flags"]["concession"],
+        columns=columns,
+    )
+
+
+def lengths(corpus: CorpusArrays) -> dict[str, dict[str, dict[str, float]]]:
+    """Messages, mean and median length (characters) per persona and phase."""
+    n_phases = len(corpus.phases)
+    group = corpus["author"].astype(np.int64) * n_phases + corpus["phase"]
+    size = len(corpus.personas) * n_phases
+    counts = np.bincount(group, minlength=size)
+    totals = np.bincount(group, weights=corpus["length"], minlength=size)
+    # Medians: sort by (group, length) once, then index the middle of each group's run
+    order = np.lexsort((corpus["length"], group))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    sorted_lengths = corpus["length"][order].astype(np.float64)
+    present = counts > 0
+    lo = starts + (counts - 1) // 2
+    hi = starts + counts // 2
+    medians = np.zeros(size)
+    medians[present] = (sorted_lengths[lo[present]] + sorted_lengths[hi[present]]) / 2
+    result: dict[str, dict[str, dict[str, float]]] = {}
+    for g in np.flatnonzero(present):
+        persona, phase = corpus.personas[g // n_phases], corpus.phases[g % n_phases]
+        result.setdefault(persona, {})[phase] = {
+            "messages": int(counts[g]),
+            "mean_chars": round(float(totals[g] / counts[g]), 1),
+            "median_chars": float(medians[g]),
+        }
+    return result
+
+
+def positions(corpus: CorpusArrays) -> dict[str, Any]:
+    """How often reflections concede or change position, per persona and per debate."""
+    reflection = corpus["phase"] == corpus.phases.index("reflection")
+    conceded = (corpus["flags"] & corpus.concession_flag) != 0
+    n_personas = len(corpus.personas)
+    reflections = np.bincount(corpus["author"][reflection], minlength=n_personas)
+    changes = np.bincount(corpus["author"][reflection & conceded], minlength=n_personas)
+    debates_with_reflections = np.unique(corpus["debate"][reflection]).size
+    debates_with_change = np.unique(corpus["debate"][reflection & conceded]).size
+    return {
+        "by_persona": {
+            corpus.personas[p]: {
+                "reflections": int(reflections[p]),
+                "changed_position": int(changes[p]),
+                "rate": round(float(changes[p] / reflections[p]), 4),
+            }
+            for p in np.flatnonzero(reflections)
+        },
+        "debates_with_reflections": debates_with_reflections,
+        "debates_with_change": debates_with_change,
+        "debate_rate": round(debates_with_change / debates_with_reflections, 4) if debates_with_reflections else None,
+    }
+
+
+def convergence(corpus: CorpusArrays) -> dict[str, Any]:
+    """Exchange rounds each debate ran before arbitration, over the debates that reached it."""
+    n_debates = len(corpus.debate_ids)
+    exchange = corpus["phase"] == corpus.phases.index("exchange")
+    # Highest exchange round per debate, from the transcript itself
+    rounds = np.zeros(n_debates, dtype=np.int64)
+    np.maximum.at(rounds, corpus["debate"][exchange], corpus["round"][exchange])
+    arbitrated = corpus["arbitrated"].astype(bool)
+    reached = rounds[arbitrated]
+    return {
+        "debates": n_debates,
+        "arbitrated": int(arbitrated.sum()),
+        "budget_exhausted": int(corpus["budget_exhausted"].sum()),
+        "mean_rounds": round(float(reached.mean()), 2) if reached.size else None,
+        "median_rounds": float(np.median(reached)) if reached.size else None,
+        "histogram": {int(r): int(c) for r, c in enumerate(np.bincount(reached)) if c} if reached.size else {},
+        "cut_short": int((reached < corpus["max_exchange_rounds"][arbitrated]).sum()),
+    }
+
+
+def summarize(corpus: CorpusArrays) -> dict[str, Any]:
+    """All aggregates for the corpus."""
+    return {
+        "messages": len(corpus),
+        "lengths": lengths(corpus),
+        "positions": positions(corpus),
+        "convergence": convergence(corpus),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Aggregate statistics over a columnar debate corpus.")
+    parser.add_argument("corpus", type=Path, help="File written by simulacra-export")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args(argv)
+    try:
+        report = summarize(load(args.corpus))
+    except (OSError, ValueError) as e:
+        print(f"Cannot read corpus: {e}", file=sys.stderr)
+        return 2
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    c = report["convergence"]
+    print(f"{report['messages']} messages in {c['debates']} debates")
+    for persona, phases in report["lengths"].items():
+        cells = ", ".join(f"{phase} {s['mean_chars']:.0f}" for phase, s in phases.items())
+        print(f"  {persona:<10} mean chars: {cells}")
+    p = report["positions"]
+    print(f"  position changes in reflections: {p['debate_rate']} of debates")
+    for persona, s in p["by_persona"].items():
+        print(f"    {persona:<10} {s['changed_position']}/{s['reflections']} ({s['rate']:.1%})")
+    print(
+        f"  rounds before arbitration: mean {c['mean_rounds']}, median {c['median_rounds']}, "
+        f"histogram {c['histogram']}; {c['cut_short']} cut short, {c['budget_exhausted']} over budget"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Admission control for the debate API.
+
+Before a new debate starts, estimate how long it would take given the debates
+already in flight, the observed time per turn and the model quota, and reject
+it up front (429/503 with Retry-After) if it cannot finish within its deadline.
+Failing fast costs nothing; a debate that dies halfway wastes every call made.
+"""
+
+from contextlib import contextmanager
+from typing import Callable, Iterator
+import itertools
+import math
+import time
+
+DEFAULT_QUOTA_RPM = 15.0  # Gemini free tier, see RATE_LIMITING.md
+DEFAULT_TURN_SECONDS = 4.0  # LLM latency plus pacing sleeps, until observed
+LATENCY_SMOOTHING = 0.3  # EWMA weight of the newest per-turn observation
+
+
+class AdmissionRejected(Exception):
+    """A new debate was refused; `status_code` is 429 or 503, `retry_after` in seconds."""
+
+    def __init__(self, status_code: int, retry_after: float, detail: str):
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+        super().__init__(detail)
+
+
+class AdmissionController:
+    """Tracks in-flight debates and predicts the completion time of a new one."""
+
+    def __init__(
+        self,
+        quota_rpm: float = DEFAULT_QUOTA_RPM,
+        turn_seconds: float = DEFAULT_TURN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.quota_rpm = quota_rpm
+        self.turn_seconds = turn_seconds  # EWMA of observed seconds per turn
+        self._clock = clock
+        self._ids = itertools.count(1)
+        self._in_flight: dict[int, tuple[int, float]] = {}  # id -> (turns, started_at)
+        self.stats = {"admitted": 0, "rejected": 0}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def _pending_turns(self) -> float:
+        """Turns the in-flight debates still have to make, projected from elapsed time."""
+        now = self._clock()
+        return sum(
+            max(0.0, turns - (now - started) / self.turn_seconds)
+            for turns, started in self._in_flight.values()
+        )
+
+    def estimate(self, turns: int) -> float:
+        """
+        Predicted seconds for a new debate of `turns` LLM calls.
+
+        A debate runs its turns one after another, so alone it takes
+        turns * turn_seconds. When the quota is the bottleneck, every pending
+        turn (in-flight debates plus this one) has to pass through
+        quota_rpm calls per minute first.
+        """
+        sequential = turns * self.turn_seconds
+        quota_bound = (self._pending_turns() + turns) * 60.0 / self.quota_rpm
+        return max(sequential, quota_bound)
+
+    def check(
+        self, turns: int, deadline_s: float, circuit_open: bool = False, retry_after: float = 0.0
+    ) -> float:
+        """
+        Return the estimated duration, or raise AdmissionRejected.
+
+        Args:
+            turns: LLM calls the new debate will make.
+            deadline_s: Seconds within which the debate must finish.
+            circuit_open: Whether the model quota is currently exhausted.
+            retry_after: Seconds before any new LLM call may start.
+        """
+        if circuit_open:
+            self.stats["rejected"] += 1
+            raise AdmissionRejected(
+                503, max(retry_after, 1.0), "Model quota exhausted; not accepting new debates"
+            )
+        estimate = retry_after + self.estimate(turns)
+        if estimate > deadline_s:
+            self.stats["rejected"] += 1
+            raise AdmissionRejected(
+                429,
+                max(estimate - deadline_s, 1.0),
+                f"Debate would take ~{estimate:.0f}s, over its {deadline_s:.0f}s deadline "
+                f"({self.in_flight} debates in flight)",
+            )
+        return estimate
+
+    @contextmanager
+    def admit(
+        self, turns: int, deadline_s: float, circuit_open: bool = False, retry_after: float = 0.0
+    ) -> Iterator[float]:
+        """
+        `with controller.admit(turns, deadline):` around one debate. Yields the
+        estimate; on success the observed time per turn updates the model.
+        """
+        estimate = self.check(turns, deadline_s, circuit_open, retry_after)
+        ticket = next(self._ids)
+        started = self._clock()
+        self._in_flight[ticket] = (turns, started)
+        self.stats["admitted"] += 1
+        try:
+            yield estimate
+            self.observe(turns, self._clock() - started)
+        finally:
+            del self._in_flight[ticket]
+
+    def observe(self, turns: int, seconds: float) -> None:
+        """Feed back a finished debate's duration into the per-turn estimate."""
+        if turns <= 0 or seconds <= 0 or not math.isfinite(seconds):
+            return
+        per_turn = seconds / turns
+        self.turn_seconds += LATENCY_SMOOTHING * (per_turn - self.turn_seconds)
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "in_flight": self.in_flight,
+            "pending_turns": round(self._pending_turns(), 1),
+            "turn_seconds": round(self.turn_seconds, 3),
+            "quota_rpm": self.quota_rpm,
+            **self.stats,
+        }
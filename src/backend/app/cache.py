@@ -0,0 +1,101 @@
+"""
+Request coalescing and result caching for debate runs.
+
+Identical in-flight requests share one running debate (single-flight), and
+completed results can be kept for a TTL so retries and simultaneous clicks do
+not each spend a full debate's worth of LLM calls.
+"""
+
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+import asyncio
+import copy
+import time
+
+DEFAULT_MAX_ENTRIES = 128
+
+HIT = "hit"
+COALESCED = "coalesced"
+MISS = "miss"
+
+
+class DebateCache:
+    """Single-flight coalescing of identical debates plus an optional LRU/TTL result cache."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._results: OrderedDict[Hashable, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.stats = {HIT: 0, COALESCED: 0, MISS: 0}
+
+    def _lookup(self, key: Hashable) -> dict[str, Any] | None:
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        expires_at, state = entry
+        if self._clock() >= expires_at:
+            del self._results[key]
+            return None
+        self._results.move_to_end(key)
+        return state
+
+    def _store(self, key: Hashable, state: dict[str, Any], ttl: float) -> None:
+        self._results[key] = (self._clock() + ttl, state)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    async def get_or_run(
+        self,
+        key: Hashable,
+        run: Callable[[], Awaitable[dict[str, Any]]],
+        ttl: float = 0.0,
+        fresh: bool = False,
+    ) -> tuple[dict[str, Any], str]:
+        """
+        Return the debate state for `key` and how it was obtained.
+
+        Args:
+            key: Identifies identical requests (same debate parameters).
+            run: Starts a new debate; only called when nothing can be shared.
+            ttl: Seconds to keep the completed result (0 = do not cache).
+            fresh: Skip cached results (an identical in-flight debate is still shared).
+
+        Returns:
+            (state, status) where status is "hit", "coalesced" or "miss".
+            The state is a private copy the caller may modify.
+        """
+        if not fresh:
+            cached = self._lookup(key)
+            if cached is not None:
+                self.stats[HIT] += 1
+                return copy.deepcopy(cached), HIT
+
+        task = self._inflight.get(key)
+        if task is not None:
+            status = COALESCED
+        else:
+            status = MISS
+            # Runs as its own task so one caller disconnecting does not cancel
+            # the debate for the others sharing it
+            task = asyncio.create_task(run())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t, ttl))
+        self.stats[status] += 1
+        state = await asyncio.shield(task)
+        return copy.deepcopy(state), status
+
+    def _finish(self, key: Hashable, task: asyncio.Task, ttl: float) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if ttl > 0 and not task.cancelled() and task.exception() is None:
+            self._store(key, task.result(), ttl)
+
+    def clear(self) -> None:
+        """Drop all cached results (in-flight debates are unaffected)."""
+        self._results.clear()
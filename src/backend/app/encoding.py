@@ -0,0 +1,162 @@
+"""
+Fast JSON responses and negotiated gzip/zstd compression.
+
+`FastJSONResponse` encodes with orjson when it is installed (stdlib json
+otherwise) and serializes pydantic models such as `DebateState` directly with
+pydantic's serializer. Endpoints returning large states return it themselves,
+which also skips FastAPI's validation of the return value.
+
+`CompressionMiddleware` compresses complete (non-streaming) responses above a
+size threshold with the best encoding the client accepts: zstd when a zstd
+module is available, else gzip. Streamed responses (SSE) pass through as is.
+"""
+
+from typing import Any
+import gzip
+import json
+
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used instead
+    orjson = None
+
+try:
+    from compression import zstd as _zstd  # Python 3.14+
+
+    def _zstd_compress(data: bytes, level: int) -> bytes:
+        return _zstd.compress(data, level=level)
+
+except ImportError:
+    try:
+        import zstandard as _zstd
+
+        def _zstd_compress(data: bytes, level: int) -> bytes:
+            return _zstd.ZstdCompressor(level=level).compress(data)
+
+    except ImportError:  # optional: gzip only
+        _zstd_compress = None
+
+DEFAULT_MINIMUM_SIZE = 1024  # bytes; smaller bodies are not worth compressing
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode a response body: models via pydantic, everything else via orjson (or json)."""
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode()
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with `dumps`."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def available_encodings() -> list[str]:
+    """Content codings this process can produce, most preferred first."""
+    return ["zstd", "gzip"] if _zstd_compress is not None else ["gzip"]
+
+
+def negotiate(accept_encoding: str, encodings: list[str] | None = None) -> str | None:
+    """
+    Pick a content coding from an Accept-Encoding header, or None for identity.
+
+    Args:
+        accept_encoding: Header value, e.g. "gzip, deflate, br, zstd" or "gzip;q=0.5, zstd;q=1".
+        encodings: Codings to choose from, most preferred first (default: available_encodings()).
+
+    Returns:
+        The accepted coding with the highest q-value; ties go to the earlier preference.
+    """
+    encodings = encodings or available_encodings()
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd" and _zstd_compress is not None:
+        return _zstd_compress(body, ZSTD_LEVEL)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported content coding {encoding!r}")
+
+
+class CompressionMiddleware:
+    """ASGI middleware: compress complete responses of at least `minimum_size` bytes."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = DEFAULT_MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message  # held until the body shows whether to compress
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)  # streaming: never buffered
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or headers.get("content-type", "").startswith("text/event-stream")
+            ):
+                await send(start)
+                start = None
+                await send(message)
+                return
+            compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            start = None
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,157 @@
+"""
+In-process pub/sub hub fanning debate events out to WebSocket subscribers.
+
+Debates publish their events (phase changes, streamed deltas, recorded
+messages, status changes) to the hub by debate id; each connection holds one
+Subscription covering any number of debate ids. Publishing never blocks or
+awaits: every subscription has a bounded buffer, consecutive deltas of the
+same turn are merged into one, and when a buffer is full its oldest delta is
+dropped (the turn's "message" event carries the full text anyway). A
+subscriber whose buffer is full of events that cannot be dropped is closed as
+a slow consumer, so no client can hold up a debate.
+"""
+
+from collections import deque
+from typing import Any
+import asyncio
+
+DEFAULT_BUFFER = 256  # events buffered per subscription
+
+# Events that may be merged or dropped under backpressure
+_LOSSY = frozenset({"delta"})
+
+
+class SubscriptionClosed(Exception):
+    """The subscription was closed (disconnect, or dropped as a slow consumer)."""
+
+
+class Subscription:
+    """One connection's subscriptions and its bounded buffer of (debate_id, event)."""
+
+    def __init__(self, maxsize: int = DEFAULT_BUFFER):
+        self.maxsize = max(maxsize, 1)
+        self.debate_ids: set[str] = set()
+        self.dropped = 0  # deltas merged or discarded under backpressure
+        self.closed_reason: str | None = None
+        self._buffer: deque[tuple[str, dict[str, Any]]] = deque()
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def closed(self) -> bool:
+        return self.closed_reason is not None
+
+    def close(self, reason: str = "closed") -> None:
+        if self.closed_reason is None:
+            self.closed_reason = reason
+        self._ready.set()
+
+    def offer(self, debate_id: str, event: dict[str, Any]) -> bool:
+        """
+        Buffer an event without blocking. Returns False if the subscription is
+        (or has just been) closed.
+        """
+        if self.closed:
+            return False
+        if event.get("type") in _LOSSY and self._buffer:
+            last_id, last = self._buffer[-1]
+            if last_id == debate_id and _same_turn(last, event):
+                self._buffer[-1] = (last_id, {**last, "text": last["text"] + event["text"]})
+                return True
+        if len(self._buffer) >= self.maxsize and not self._evict_lossy():
+            self.close("slow consumer")
+            return False
+        self._buffer.append((debate_id, event))
+        self._ready.set()
+        return True
+
+    def _evict_lossy(self) -> bool:
+        """Drop the oldest delta to make room; False if there is none."""
+        for i, (_, event) in enumerate(self._buffer):
+            if event.get("type") in _LOSSY:
+                del self._buffer[i]
+                self.dropped += 1
+                return True
+        return False
+
+    async def get(self) -> tuple[str, dict[str, Any]]:
+        """
+        Next buffered (debate_id, event), waiting for one.
+
+        Raises:
+            SubscriptionClosed: Once closed and the buffer is empty; immediately
+                when closed as a slow consumer.
+        """
+        while True:
+            if self.closed_reason == "slow consumer":
+                raise SubscriptionClosed(self.closed_reason)
+            if self._buffer:
+                return self._buffer.popleft()
+            if self.closed:
+                raise SubscriptionClosed(self.closed_reason)
+            self._ready.clear()
+            await self._ready.wait()
+
+
+def _same_turn(a: dict[str, Any], b: dict[str, Any]) -> bool:
+    return (
+        a.get("type") == b.get("type")
+        and a.get("persona_id") == b.get("persona_id")
+        and a.get("phase") == b.get("phase")
+        and a.get("round_index") == b.get("round_index")
+    )
+
+
+class Hub:
+    """Debate id -> subscriptions; `publish` fans an event out without blocking."""
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER):
+        self.buffer_size = buffer_size
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self.stats = {"published": 0, "delivered": 0, "slow_consumers": 0}
+
+    def connect(self, buffer_size: int | None = None) -> Subscription:
+        """A new subscription with no debate ids yet."""
+        return Subscription(buffer_size or self.buffer_size)
+
+    def subscribe(self, subscription: Subscription, debate_id: str) -> None:
+        subscription.debate_ids.add(debate_id)
+        self._subscribers.setdefault(debate_id, set()).add(subscription)
+
+    def unsubscribe(self, subscription: Subscription, debate_id: str) -> None:
+        subscription.debate_ids.discard(debate_id)
+        subscribers = self._subscribers.get(debate_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[debate_id]
+
+    def disconnect(self, subscription: Subscription) -> None:
+        """Remove the subscription from every debate and close it."""
+        for debate_id in list(subscription.debate_ids):
+            self.unsubscribe(subscription, debate_id)
+        subscription.close()
+
+    def publish(self, debate_id: str, event: dict[str, Any]) -> None:
+        """Offer an event to every subscriber of `debate_id`; slow consumers are dropped."""
+        subscribers = self._subscribers.get(debate_id)
+        self.stats["published"] += 1
+        if not subscribers:
+            return
+        for subscription in list(subscribers):
+            if subscription.offer(debate_id, event):
+                self.stats["delivered"] += 1
+            elif subscription.closed_reason == "slow consumer":
+                self.stats["slow_consumers"] += 1
+                self.disconnect(subscription)
+
+    def snapshot(self) -> dict[str, Any]:
+        connections = {s for subs in self._subscribers.values() for s in subs}
+        return {
+            "debates": len(self._subscribers),
+            "subscriptions": len(connections),
+            "buffered": sum(len(s) for s in connections),
+            **self.stats,
+        }
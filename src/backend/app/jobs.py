@@ -0,0 +1,419 @@
+"""
+Registry of debates run by this server, with drain and checkpoint on shutdown.
+
+Every debate started through the API is tracked here with the parameters
+needed to rebuild its coordinator. On shutdown the server stops admitting new
+debates, waits a grace period for running ones, and writes a checkpoint of
+any that remain; on the next boot those checkpoints are resumed without
+redoing the turns already in their transcripts.
+
+Job records (status and latest state) are also published to the shared store
+(`backend.agent.store`) so any worker process can answer GET /debates/{id},
+and a checkpoint is claimed by renaming it so only one worker resumes it.
+Each publish also adds the transcript's new messages to the search index.
+Publishing blocks (a store write that may wait for another process's lock,
+a JSON dump of the state, an index transaction), so it always runs in a
+worker thread; a lock orders the periodic publish of running debates with a
+debate's final record, so a late periodic publish never overwrites it.
+"""
+
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from backend.agent.store import MemoryStore, SQLiteStore
+from backend.app.hub import Hub
+from backend.app.search import SearchIndex
+from backend.core import state_messages
+
+DEFAULT_GRACE_SECONDS = 30.0
+MAX_FINISHED = 256  # finished debates kept for GET /debates/{id}
+RECORD_TTL = 24 * 3600.0  # seconds a debate record stays in the shared store
+SYNC_INTERVAL = 2.0  # seconds between publishing running debates' latest state
+PURGE_INTERVAL = 600.0  # seconds between deletions of expired keys from the shared store
+MAX_PAGE_SIZE = 500  # messages per GET /debates/{id}/messages page
+
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CHECKPOINTED = "checkpointed"
+
+logger = logging.getLogger(__name__)
+
+
+class DebateJob:
+    """One debate: its parameters, live coordinator and outcome."""
+
+    def __init__(
+        self,
+        debate_id: str,
+        params: dict[str, Any],
+        coordinator: Any,
+        hub: Hub | None = None,
+        created_at: float | None = None,
+    ):
+        self.id = debate_id
+        self.params = params
+        self.created_at = time.time() if created_at is None else created_at  # kept across resumes
+        self.coordinator = coordinator
+        self.status = RUNNING
+        self.error: str | None = None
+        self.result: dict[str, Any] | None = None
+        self.task: asyncio.Task | None = None
+        self.finished = asyncio.Event()
+        self._hub = hub
+
+    def emit(self, event: dict[str, Any]) -> None:
+        """Coordinator event callback: fan the event out to the debate's subscribers."""
+        if self._hub is None:
+            return
+        if event.get("type") == "done":
+            event = {"type": "done"}  # subscribers fetch the final state if they need it
+        self._hub.publish(self.id, event)
+
+    def fail(self, error: str) -> None:
+        """Mark the debate failed without raising (e.g. a stream that reported an error event)."""
+        self.status = FAILED
+        self.error = error
+
+    def emit_status(self) -> None:
+        self.emit({"type": "status", "status": self.status, "error": self.error})
+
+    @property
+    def state(self) -> dict[str, Any] | None:
+        """Final state once done, else the coordinator's latest state."""
+        if self.result is not None:
+            return self.result
+        return getattr(self.coordinator, "state", None)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "debate_id": self.id,
+            "status": self.status,
+            "params": self.params,
+            "created_at": self.created_at,
+            "error": self.error,
+            "state": self.state,
+        }
+
+
+def transcript_length(state: dict[str, Any] | None) -> int:
+    """Messages in a state dict's whole transcript, those spilled to its segment included."""
+    if not isinstance(state, dict):
+        return 0  # no state yet (or not a state dict): records must never fail the debate
+    segment = state.get("segment")
+    return (segment["count"] if segment else 0) + len(state.get("messages") or ())
+
+
+def transcript_page(record: dict[str, Any], since: int = 0, limit: int = MAX_PAGE_SIZE) -> dict[str, Any]:
+    """
+    Messages `since` (an index into the transcript) from a debate record, at
+    most `limit` of them, with the cursor to pass as `since` next time.
+
+    Transcripts only grow (a resumed debate keeps its earlier turns), so the
+    page's status and end index identify its content: `etag` changes exactly
+    when a poll with the same `since` and `limit` would return something new.
+
+    Args:
+        record: A record from `DebateRegistry.lookup`.
+        since: Index of the first message to return.
+        limit: Maximum messages returned (capped at MAX_PAGE_SIZE).
+
+    Returns:
+        Dict with debate_id, status, messages, cursor, total, has_more and etag.
+
+    Raises:
+        ValueError: The page reaches into a spilled segment that cannot be opened.
+    """
+    state = record.get("state") or {}
+    total = transcript_length(state)
+    start = min(max(since, 0), total)
+    end = min(start + max(min(limit, MAX_PAGE_SIZE), 0), total)
+    return {
+        "debate_id": record["debate_id"],
+        "status": record["status"],
+        "messages": list(islice(state_messages(state, start), end - start)),
+        "cursor": end,
+        "total": total,
+        "has_more": end < total,
+        "etag": f'"{record["status"]}-{end}"',
+    }
+
+
+class DebateRegistry:
+    """In-flight and recently finished debates, plus drain/checkpoint/resume."""
+
+    def __init__(
+        self,
+        checkpoint_dir: Path,
+        store: MemoryStore | SQLiteStore | None = None,
+        hub: Hub | None = None,
+        search: SearchIndex | None = None,
+    ):
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.store = store if store is not None else MemoryStore()
+        self.hub = hub
+        self.search = search
+        self.draining = False
+        self._running: dict[str, DebateJob] = {}
+        self._finished: OrderedDict[str, DebateJob] = OrderedDict()
+        self._published: dict[str, int] = {}  # debate id -> messages in the last published state
+        self._publish_lock = threading.Lock()  # periodic publishes (worker thread) vs final records
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._running)
+
+    def get(self, debate_id: str) -> DebateJob | None:
+        """A debate run by this worker."""
+        return self._running.get(debate_id) or self._finished.get(debate_id)
+
+    def lookup(self, debate_id: str) -> dict[str, Any] | None:
+        """A debate's record, whichever worker runs it (live state if it is this one)."""
+        job = self.get(debate_id)
+        if job is not None:
+            return job.to_dict()
+        raw = self.store.get(f"debate:{debate_id}")
+        return json.loads(raw) if raw else None
+
+    def publish(self, job: DebateJob) -> None:
+        """Write the job's record to the shared store (blocking: see `_publish`)."""
+        record = {**job.to_dict(), "worker": os.getpid(), "updated_at": time.time()}
+        # default=str: a record is informational and must never fail the debate
+        self.store.set(f"debate:{job.id}", json.dumps(record, default=str), ex=RECORD_TTL)
+        state = job.state or {}
+        count = transcript_length(state)
+        start = self._published.get(job.id, 0)
+        if self.search is not None and count > start:
+            try:
+                new = list(state_messages(state, start))
+                self.search.add(job.id, new, start=start, created_at=job.created_at)
+            except Exception as e:  # like the record itself, indexing must never fail the debate
+                logger.error(f"Indexing debate {job.id} failed: {e}")
+        self._published[job.id] = count
+
+    async def _publish(self, job: DebateJob, final: bool = False) -> None:
+        """Publish in a worker thread, ordered with `sync`; `final` once the job has left `_running`."""
+
+        def write() -> None:
+            with self._publish_lock:
+                self.publish(job)
+                if final:
+                    self._published.pop(job.id, None)
+
+        await asyncio.to_thread(write)
+
+    def sync(self) -> None:
+        """Publish running debates whose transcript grew since their last publish."""
+        for job in list(self._running.values()):
+            with self._publish_lock:
+                if job.id not in self._running:
+                    continue  # finished meanwhile; its final record is already written
+                if self._published.get(job.id) != transcript_length(job.state):
+                    self.publish(job)
+
+    async def sync_forever(self, interval: float = SYNC_INTERVAL) -> None:
+        """Background task: keep the shared records of running debates current (off the loop)."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.sync)
+            except Exception as e:
+                logger.error(f"Publishing debate records failed: {e}")
+
+    async def purge_forever(self, interval: float = PURGE_INTERVAL) -> None:
+        """Background task: delete expired records (and other keys) from the shared store."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                purged = await asyncio.to_thread(self.store.purge_expired)
+            except Exception as e:
+                logger.error(f"Purging expired store keys failed: {e}")
+            else:
+                if purged:
+                    logger.info(f"Purged {purged} expired store keys")
+
+    @asynccontextmanager
+    async def track(
+        self,
+        params: dict[str, Any],
+        coordinator: Any,
+        debate_id: str | None = None,
+        created_at: float | None = None,
+    ) -> AsyncIterator[DebateJob]:
+        """
+        `async with registry.track(params, coordinator) as job:` around one debate run.
+        The result is stored when the block returns the final state via `job.result`.
+        Pass `job.emit` as the coordinator's event callback to reach hub subscribers.
+        A block that handles a failure itself calls `job.fail(...)`: the job is
+        then recorded as failed and its checkpoint kept.
+        """
+        job = DebateJob(
+            debate_id or uuid.uuid4().hex, params, coordinator, hub=self.hub, created_at=created_at
+        )
+        job.task = asyncio.current_task()
+        self._running[job.id] = job
+        await self._publish(job)
+        job.emit_status()
+        try:
+            yield job
+            if job.status != FAILED:
+                job.status = DONE
+                self._remove_checkpoint(job.id)
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e) or repr(e)
+            raise
+        except BaseException:
+            # Cancelled (drain, client disconnect) or a closed stream generator
+            if job.status not in (CHECKPOINTED, FAILED):
+                job.status = FAILED
+                job.error = "cancelled"
+            raise
+        finally:
+            del self._running[job.id]
+            self._finished[job.id] = job
+            while len(self._finished) > MAX_FINISHED:
+                self._finished.popitem(last=False)
+            try:
+                await self._publish(job, final=True)
+            finally:
+                job.emit_status()
+                job.finished.set()
+
+    async def drain(self, grace_seconds: float = DEFAULT_GRACE_SECONDS) -> list[str]:
+        """
+        Stop admitting debates, wait up to `grace_seconds` for running ones,
+        then checkpoint and cancel whatever is left. Returns checkpointed ids;
+        debates without a state yet have nothing to resume and are marked failed.
+        """
+        self.draining = True
+        jobs = list(self._running.values())
+        if jobs:
+            logger.info(f"Draining {len(jobs)} running debates (grace {grace_seconds:.0f}s)")
+            waits = [asyncio.create_task(job.finished.wait()) for job in jobs]
+            _, pending = await asyncio.wait(waits, timeout=grace_seconds)
+            for wait in pending:
+                wait.cancel()
+        saved = []
+        for job in list(self._running.values()):
+            if job.state is not None:
+                await asyncio.to_thread(self.save_checkpoint, job)
+                saved.append(job.id)
+                job.status = CHECKPOINTED
+            else:
+                job.fail("shutdown before first turn")
+            await self._publish(job)
+            job.emit_status()
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+        if saved:
+            logger.warning(f"Checkpointed {len(saved)} unfinished debates to {self.checkpoint_dir}")
+        return saved
+
+    def _checkpoint_path(self, debate_id: str) -> Path:
+        return self.checkpoint_dir / f"{debate_id}.json"
+
+    def save_checkpoint(self, job: DebateJob) -> Path:
+        """Write the job's parameters and latest state so it can be resumed."""
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        path = self._checkpoint_path(job.id)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "debate_id": job.id,
+                    "params": job.params,
+                    "created_at": job.created_at,
+                    "state": job.state,
+                    "saved_at": time.time(),
+                }
+            )
+        )
+        tmp.replace(path)  # atomic: a crash never leaves a half-written checkpoint
+        return path
+
+    def _remove_checkpoint(self, debate_id: str) -> None:
+        self._checkpoint_path(debate_id).unlink(missing_ok=True)
+        self._checkpoint_path(debate_id).with_suffix(".resuming").unlink(missing_ok=True)
+
+    def load_checkpoints(self) -> list[dict[str, Any]]:
+        """All readable checkpoints; unreadable files are logged and skipped."""
+        if not self.checkpoint_dir.is_dir():
+            return []
+        checkpoints = []
+        for path in sorted(self.checkpoint_dir.glob("*.json")):
+            checkpoint = self._read_checkpoint(path)
+            if checkpoint is not None:
+                checkpoints.append(checkpoint)
+        return checkpoints
+
+    def _read_checkpoint(self, path: Path) -> dict[str, Any] | None:
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            logger.error(f"Skipping unreadable checkpoint {path}: {e}")
+            return None
+
+    def _claim(self, path: Path) -> Path | None:
+        """Rename a checkpoint so no other worker resumes it; None if one already did."""
+        claimed = path.with_suffix(".resuming")
+        try:
+            path.rename(claimed)
+        except FileNotFoundError:
+            return None
+        return claimed
+
+    def resume_all(self, make_coordinator: Callable[[dict[str, Any]], Any]) -> list[asyncio.Task]:
+        """
+        Restart every checkpointed debate in the background from its saved state.
+        `make_coordinator(params)` rebuilds the coordinator from saved parameters.
+        With several workers, each checkpoint is resumed by exactly one of them.
+        """
+        if not self.checkpoint_dir.is_dir():
+            return []
+        tasks = []
+        for path in sorted(self.checkpoint_dir.glob("*.json")):
+            claimed = self._claim(path)
+            if claimed is None:
+                continue
+            checkpoint = self._read_checkpoint(claimed)
+            if checkpoint is None:
+                claimed.rename(path)  # leave it for inspection
+                continue
+            tasks.append(asyncio.create_task(self._resume(checkpoint, claimed, make_coordinator)))
+        if tasks:
+            logger.info(f"Resuming {len(tasks)} checkpointed debates")
+        return tasks
+
+    async def _resume(
+        self,
+        checkpoint: dict[str, Any],
+        claimed: Path,
+        make_coordinator: Callable[[dict[str, Any]], Any],
+    ) -> None:
+        params = checkpoint["params"]
+        try:
+            coordinator = make_coordinator(params)
+            async with self.track(
+                params,
+                coordinator,
+                debate_id=checkpoint["debate_id"],
+                created_at=checkpoint.get("created_at"),  # absent in older checkpoints
+            ) as job:
+                job.result = await coordinator.run_debate(on_event=job.emit, state=checkpoint["state"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Resumed debate {checkpoint['debate_id']} failed: {e}")
+            if claimed.exists():
+                claimed.rename(claimed.with_suffix(".json"))  # retry on the next start
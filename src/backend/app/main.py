@@ -2,20 +2,44 @@
 FastAPI application: exposes debate run and state for the frontend.
 """
 
+import asyncio
+import json
+import math
 import os
-from contextlib import asynccontextmanager
+import uuid
+from contextlib import ExitStack, asynccontextmanager
 from pathlib import Path
 from typing import Any
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
 from backend.agent import DebateCoordinator
+from backend.agent.coordinator import bulk_routes, debate_panel, expected_turns, load_adk, personas
+from backend.agent.context_cache import LocalContextCache
+from backend.agent.limiter import (
+    CircuitOpenError,
+    configure_shared_quota,
+    get_shared_limiter,
+    shared_limiters,
+)
+from backend.agent.store import open_store
+from backend.agent.scheduler import DEFAULT_WEIGHTS, INTERACTIVE
+from backend.app.admission import AdmissionController, AdmissionRejected
+from backend.app.cache import MISS, DebateCache
+from backend.app.encoding import CompressionMiddleware, FastJSONResponse
+from backend.app.hub import Hub, SubscriptionClosed
+from backend.app.jobs import MAX_PAGE_SIZE, PURGE_INTERVAL, DebateRegistry, transcript_length, transcript_page
+from backend.app.search import MAX_RESULTS, SearchIndex, parse_time
+from backend.app.server_timing import ServerTimingMiddleware, server_timing
+from backend.profiling import profiled
 
 # Load .env from repo root (parent of src/)
-_env_path = Path(__file__).resolve().parents[3] / ".env"
+_repo_root = Path(__file__).resolve().parents[3]
+_env_path = _repo_root / ".env"
 load_dotenv(_env_path)
 
 _CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000").strip()
@@ -23,12 +47,183 @@ CORS_ORIGINS_LIST = [o.strip() for o in _CORS_ORIGINS.split(",") if o.strip()] o
 
 # Get model from environment or use default
 GOOGLE_API_MODEL = os.getenv("GOOGLE_API_MODEL", "gemini-2.0-flash-exp")
+# Optional cheaper model for opening/defence/exchange/reflection turns (arbitration keeps GOOGLE_API_MODEL)
+GOOGLE_API_MODEL_BULK = os.getenv("GOOGLE_API_MODEL_BULK", "").strip()
+# Optional model to switch to when the routed model's quota is exhausted
+GOOGLE_API_MODEL_FALLBACK = os.getenv("GOOGLE_API_MODEL_FALLBACK", "").strip() or None
+# Optional hedging of slow LLM calls: duplicate a call still running after this
+# percentile (0-1) of recent turn latencies, for at most LLM_HEDGE_BUDGET of calls
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0") or 0) or None
+LLM_HEDGE_BUDGET = float(os.getenv("LLM_HEDGE_BUDGET", "0.1") or 0.1)
+# Seconds to keep completed /debate/run results for identical requests (0 = no caching)
+DEBATE_CACHE_TTL = float(os.getenv("DEBATE_CACHE_TTL", "0") or 0)
+# Model quota (requests per minute) and default deadline used by admission control
+DEBATE_QUOTA_RPM = float(os.getenv("DEBATE_QUOTA_RPM", "15") or 15)
+DEBATE_DEADLINE_S = float(os.getenv("DEBATE_DEADLINE_S", "600") or 600)
+# On shutdown: seconds to wait for running debates, and where unfinished ones are checkpointed
+SHUTDOWN_GRACE_S = float(os.getenv("SHUTDOWN_GRACE_S", "30") or 30)
+DEBATE_CHECKPOINT_DIR = Path(
+    os.getenv("DEBATE_CHECKPOINT_DIR", "").strip() or _repo_root / ".simulacra" / "checkpoints"
+)
+# Shared state for multi-worker deployments: "memory://" (default, per process)
+# or "sqlite:///path.db" shared by every worker on the host
+SIMULACRA_STORE = os.getenv("SIMULACRA_STORE", "").strip() or "memory://"
+# Calls per minute allowed per model across all workers sharing the store (empty = no pacing)
+LLM_QUOTA_RPM = float(os.getenv("LLM_QUOTA_RPM", "").strip() or 0) or None
+# Seconds between deletions of expired keys (old debate records) from the store
+STORE_PURGE_INTERVAL_S = float(os.getenv("STORE_PURGE_INTERVAL_S", "").strip() or PURGE_INTERVAL)
+# Full-text index of debate transcripts for GET /search
+SEARCH_INDEX = os.getenv("SEARCH_INDEX", "").strip() or str(_repo_root / ".simulacra" / "search.db")
+# Events buffered per WebSocket subscriber before deltas are dropped (and then the subscriber)
+WS_BUFFER_SIZE = int(os.getenv("WS_BUFFER_SIZE", "256") or 256)
+# Responses of at least this many bytes are gzip/zstd compressed when the client accepts it (0 = off)
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024") or 0)
+# Where per-request profiles (?profile=true or X-Profile: 1) are written (empty = profiling off)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "").strip()
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5") or 5)
+# Seconds a shared prompt prefix's context-cache handle lives after last use (0 = no context cache)
+CONTEXT_CACHE_TTL_S = float(os.getenv("CONTEXT_CACHE_TTL_S", "0") or 0)
+# Import ADK in a background thread at startup instead of on the first debate
+ADK_WARMUP = os.getenv("ADK_WARMUP", "true").strip().lower() in ("1", "true", "yes")
+
+# One context cache for every debate, so concurrent debates' turns reuse each other's prefixes
+context_cache = LocalContextCache(ttl=CONTEXT_CACHE_TTL_S) if CONTEXT_CACHE_TTL_S > 0 else None
+
+# Identical in-flight /debate/run requests share one debate; results optionally cached
+debate_cache = DebateCache()
+# Rejects new debates early when they cannot finish within their deadline
+admission = AdmissionController(quota_rpm=DEBATE_QUOTA_RPM)
+# Fans debate events out to WebSocket subscribers (this worker's debates)
+hub = Hub(buffer_size=WS_BUFFER_SIZE)
+# Running and recent debates; drained and checkpointed on shutdown.
+# Its shared store and search index are opened at startup (see lifespan).
+registry = DebateRegistry(DEBATE_CHECKPOINT_DIR, hub=hub)
+
+
+def _model_routes() -> dict[str, str]:
+    """Phase -> model routing policy from the environment."""
+    return bulk_routes(GOOGLE_API_MODEL_BULK) if GOOGLE_API_MODEL_BULK else {}
+
+
+def _check_priority(priority: str) -> None:
+    if priority not in DEFAULT_WEIGHTS:
+        raise HTTPException(
+            status_code=422, detail=f"priority must be one of {sorted(DEFAULT_WEIGHTS)}"
+        )
+
+
+def _parse_debaters(debaters: str | None) -> list[str]:
+    """
+    The panel named by a comma-separated `debaters` parameter (default panel if empty).
+
+    Raises:
+        HTTPException: 422 for an invalid panel.
+    """
+    ids = [d.strip() for d in debaters.split(",") if d.strip()] if debaters else None
+    try:
+        return debate_panel(ids)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+
+
+def _make_coordinator(
+    max_exchange_rounds: int,
+    token_budget: int | None,
+    priority: str = INTERACTIVE,
+    debaters: list[str] | None = None,
+) -> DebateCoordinator:
+    """Coordinator configured from the environment (model routing, fallback, hedging)."""
+    return DebateCoordinator(
+        model=GOOGLE_API_MODEL,
+        max_exchange_rounds=max_exchange_rounds,
+        token_budget=token_budget,
+        routes=_model_routes(),
+        fallback_model=GOOGLE_API_MODEL_FALLBACK,
+        hedge_percentile=LLM_HEDGE_PERCENTILE,
+        hedge_budget=LLM_HEDGE_BUDGET,
+        priority=priority,
+        debaters=debaters,
+        context_cache=context_cache,
+    )
+
+
+def _coordinator_from_params(params: dict[str, Any]) -> DebateCoordinator:
+    """Rebuild a coordinator from the parameters saved with a checkpoint."""
+    return _make_coordinator(
+        params["max_exchange_rounds"],
+        params.get("token_budget"),
+        params.get("priority", INTERACTIVE),
+        params.get("debaters"),
+    )
+
+
+def _profile_requested(request: Request, profile: bool) -> bool:
+    """
+    Whether the request asked for a profile (query flag or `X-Profile` header).
+
+    Raises:
+        HTTPException: 400 if profiling is not configured (PROFILE_DIR).
+    """
+    requested = profile or request.headers.get("x-profile", "").strip().lower() in ("1", "true", "yes")
+    if requested and not PROFILE_DIR:
+        raise HTTPException(status_code=400, detail="Profiling is not enabled (set PROFILE_DIR)")
+    return requested
+
+
+def _admit(max_exchange_rounds: int, deadline_s: float | None, debaters: int) -> ExitStack:
+    """
+    Admit a new debate; close the returned stack when the debate ends.
+
+    Raises:
+        HTTPException: 429/503 with Retry-After when the debate cannot finish in time
+            or the server is shutting down.
+    """
+    if registry.draining:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is shutting down; not accepting new debates",
+            headers={"Retry-After": str(math.ceil(SHUTDOWN_GRACE_S))},
+        )
+    limiter = get_shared_limiter(GOOGLE_API_MODEL)
+    stack = ExitStack()
+    try:
+        stack.enter_context(
+            admission.admit(
+                expected_turns(max_exchange_rounds, debaters),
+                DEBATE_DEADLINE_S if deadline_s is None else deadline_s,
+                circuit_open=limiter.state == "open" and not GOOGLE_API_MODEL_FALLBACK,
+                retry_after=limiter.retry_after(),
+            )
+        )
+        return stack
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        ) from e
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # ADK is imported lazily; warm it up off the event loop so /health answers immediately
+    app.state.adk_warmup = asyncio.create_task(asyncio.to_thread(load_adk)) if ADK_WARMUP else None
+    # Open the shared store and the search index here, not at import
+    registry.store = open_store(SIMULACRA_STORE)
+    configure_shared_quota(registry.store, LLM_QUOTA_RPM)
+    registry.search = SearchIndex(SEARCH_INDEX)
+    # Restart debates checkpointed by the previous shutdown
+    registry.resume_all(_coordinator_from_params)
+    # Keep running debates' state visible to the other workers, and drop expired records
+    sync = asyncio.create_task(registry.sync_forever())
+    purge = asyncio.create_task(registry.purge_forever(STORE_PURGE_INTERVAL_S))
     yield
-    # Shutdown if needed
+    # Stop admitting, let running debates finish, checkpoint the rest
+    await registry.drain(SHUTDOWN_GRACE_S)
+    sync.cancel()
+    purge.cancel()
+    registry.search.close()
+    registry.search = None
 
 
 app = FastAPI(
@@ -43,6 +238,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if COMPRESS_MIN_BYTES > 0:
+    app.add_middleware(CompressionMiddleware, minimum_size=COMPRESS_MIN_BYTES)
+app.add_middleware(ServerTimingMiddleware)
 
 
 @app.exception_handler(Exception)
@@ -63,15 +261,260 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@app.post("/debate/run")
-async def run_debate(max_exchange_rounds: int = 4) -> dict[str, Any]:
+@app.get("/personas")
+def list_personas() -> dict[str, Any]:
+    """Registered personas (id, name, philosophy, icon_hint), all debater ids and the default panel."""
+    return personas()
+
+
+@app.get("/metrics/llm")
+def llm_metrics() -> dict[str, Any]:
+    """Per-model limiter state: concurrency limit, circuit, and queue wait per priority class."""
+    return {key: limiter.snapshot() for key, limiter in shared_limiters().items()}
+
+
+@app.get("/metrics/context-cache")
+def context_cache_metrics() -> dict[str, Any]:
+    """Shared context cache: handles held, lookups, hits and hit ratio (404 if CONTEXT_CACHE_TTL_S is unset)."""
+    if context_cache is None:
+        raise HTTPException(status_code=404, detail="Context cache is off (set CONTEXT_CACHE_TTL_S)")
+    return context_cache.snapshot()
+
+
+@app.get("/debates/{debate_id}", response_class=FastJSONResponse)
+def get_debate(debate_id: str) -> Response:
+    """
+    Status ("running", "done", "failed", "checkpointed") and latest state of a
+    debate, including debates run by other workers sharing the store.
+    """
+    record = registry.lookup(debate_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Unknown debate {debate_id}")
+    return FastJSONResponse(record)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for GET)."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip().removeprefix("W/") for c in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+@app.get("/debates/{debate_id}/messages", response_class=FastJSONResponse)
+def get_debate_messages(
+    debate_id: str,
+    request: Request,
+    since: int = 0,
+    limit: int = 100,
+) -> Response:
+    """
+    Messages of a debate from index `since`, at most `limit` (up to
+    MAX_PAGE_SIZE), with a `cursor` to pass as `since` on the next poll.
+
+    The response carries an ETag; a poll sending it back in If-None-Match gets
+    304 Not Modified until the debate has new messages or changes status.
+    """
+    if since < 0 or limit < 1:
+        raise HTTPException(status_code=422, detail="since must be >= 0 and limit >= 1")
+    record = registry.lookup(debate_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Unknown debate {debate_id}")
+    page = transcript_page(record, since, min(limit, MAX_PAGE_SIZE))
+    etag = page.pop("etag")
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return FastJSONResponse(page, headers={"ETag": etag})
+
+
+@app.get("/search", response_class=FastJSONResponse)
+def search_debates(
+    q: str,
+    persona: str | None = None,
+    phase: str | None = None,
+    round: int | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> Response:
+    """
+    Full-text search over debate messages, best matches first, with snippets.
+
+    `q` uses FTS5 syntax (words, "phrases", OR, NOT, NEAR, prefix*). Filters:
+    `persona` (e.g. gandhi), `phase`, `round` and `since`/`until` (when the
+    debate started; ISO 8601 date or datetime, UTC by default). Page with
+    `limit` (at most MAX_RESULTS) and `offset`; `next_offset` is null on the
+    last page. `truncated` is true when only the newest RANK_WINDOW matches
+    were ranked.
+    """
+    if registry.search is None:
+        raise HTTPException(status_code=503, detail="Search index is not open")
+    try:
+        result = registry.search.search(
+            q,
+            persona=persona,
+            phase=phase,
+            round_index=round,
+            since=parse_time(since),
+            until=parse_time(until),
+            limit=min(limit, MAX_RESULTS),
+            offset=offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    return FastJSONResponse({"query": q, **result})
+
+
+@app.websocket("/ws/debates")
+async def watch_debates(websocket: WebSocket) -> None:
+    """
+    Follow any number of this worker's debates over one WebSocket.
+
+    Client messages: `{"action": "subscribe" | "unsubscribe", "debate_ids": [...]}`.
+    Each subscribe is answered with a `status` event per debate (its status and
+    `cursor`, the message count, for fetching earlier messages from
+    GET /debates/{id}/messages). Then every event of the subscribed debates
+    arrives as `{"debate_id": ..., "type": ..., ...}`: `status`, `phase`,
+    `delta`, `reset`, `message` and `done`. Deltas may be merged or dropped
+    for a slow client; one that falls further behind is disconnected (1013).
+    """
+    await websocket.accept()
+    subscription = hub.connect()
+
+    async def send_events() -> None:
+        try:
+            while True:
+                debate_id, event = await subscription.get()
+                await websocket.send_json({"debate_id": debate_id, **event})
+        except SubscriptionClosed as e:
+            if str(e) == "slow consumer":
+                await websocket.close(code=1013, reason="slow consumer")
+
+    sender = asyncio.create_task(send_events())
+    try:
+        while not sender.done():
+            command = await websocket.receive_json()
+            action = command.get("action") if isinstance(command, dict) else None
+            debate_ids = command.get("debate_ids") if isinstance(command, dict) else None
+            if action not in ("subscribe", "unsubscribe") or not isinstance(debate_ids, list):
+                await websocket.send_json({"type": "error", "detail": f"Invalid command {command!r}"})
+                continue
+            for debate_id in map(str, debate_ids):
+                if action == "unsubscribe":
+                    hub.unsubscribe(subscription, debate_id)
+                    continue
+                hub.subscribe(subscription, debate_id)
+                record = await asyncio.to_thread(registry.lookup, debate_id)
+                status = record["status"] if record is not None else "unknown"
+                cursor = transcript_length((record or {}).get("state"))
+                subscription.offer(debate_id, {"type": "status", "status": status, "cursor": cursor})
+    except (WebSocketDisconnect, ValueError):
+        pass  # client went away, or sent something that is not JSON
+    finally:
+        hub.disconnect(subscription)
+        sender.cancel()
+
+
+@app.get("/metrics/hub")
+def hub_metrics() -> dict[str, Any]:
+    """WebSocket subscriptions, buffered events and slow consumers dropped."""
+    return hub.snapshot()
+
+
+@app.get("/metrics/admission")
+def admission_metrics() -> dict[str, Any]:
+    """Debates in flight, projected pending turns and the learned seconds per turn."""
+    return admission.snapshot()
+
+
+@app.post("/debate/run", response_class=FastJSONResponse)
+async def run_debate(
+    request: Request,
+    max_exchange_rounds: int = 4,
+    token_budget: int | None = None,
+    cache_ttl: float | None = None,
+    fresh: bool = False,
+    priority: str = INTERACTIVE,
+    deadline_s: float | None = None,
+    debaters: str | None = None,
+    profile: bool = False,
+) -> Response:
     """
     Run the full debate and return the final state (messages, openings, reflections, summary).
+
+    `token_budget` caps total tokens for the debate; when the next exchange round
+    would exceed it the coordinator skips straight to arbitration.
+
+    Identical requests already in flight share one running debate. With
+    `cache_ttl` (default DEBATE_CACHE_TTL) seconds > 0 the result is also
+    cached; `fresh=true` skips cached results. The `X-Debate-Cache` header
+    says whether the result was a cache "hit", "coalesced" or a "miss".
+
+    `priority` ("interactive" or "batch") is the scheduling class of the
+    debate's LLM turns; interactive turns are dispatched ahead of batch ones.
+
+    A new debate that cannot finish within `deadline_s` (default
+    DEBATE_DEADLINE_S) given the debates in flight and the quota is rejected
+    immediately with 429 (or 503 while the quota is exhausted) and Retry-After.
+
+    `debaters` seats a panel other than the default: comma-separated ids of
+    two or more registered debaters (see GET /personas), in speaking order.
+
+    The state's `timings` section splits each phase's time into model wait,
+    backoff, pacing, prompt building and state (de)serialization; a debate run
+    by this request also reports it in the Server-Timing header. With
+    `profile=true` (or an `X-Profile: 1` header) the debate runs uncached
+    under a sampling profiler and its profile is written to PROFILE_DIR,
+    named in the `X-Profile` response header.
     """
+    if token_budget is not None and token_budget < 1:
+        raise HTTPException(status_code=422, detail="token_budget must be a positive integer")
+    _check_priority(priority)
+    profile = _profile_requested(request, profile)
+    panel = _parse_debaters(debaters)
+    ttl = DEBATE_CACHE_TTL if cache_ttl is None else max(0.0, cache_ttl)
+
+    params = {
+        "max_exchange_rounds": max_exchange_rounds,
+        "token_budget": token_budget,
+        "priority": priority,
+        "debaters": panel,
+    }
+    debate_id = uuid.uuid4().hex
+
+    async def run() -> dict[str, Any]:
+        with _admit(max_exchange_rounds, deadline_s, len(panel)):
+            coordinator = _make_coordinator(max_exchange_rounds, token_budget, priority, panel)
+            async with registry.track(params, coordinator, debate_id=debate_id) as job:
+                job.result = await coordinator.run_debate(on_event=job.emit)
+                return job.result
+
     try:
-        coordinator = DebateCoordinator(model=GOOGLE_API_MODEL, max_exchange_rounds=max_exchange_rounds)
-        state = await coordinator.run_debate()
-        return state
+        headers = {}
+        if profile:
+            # A profile covers a debate run by this request: no cache, no coalescing
+            with profiled(
+                PROFILE_DIR, debate_id, PROFILE_INTERVAL_MS / 1000, task=asyncio.current_task()
+            ) as profiler:
+                state, status = await run(), MISS
+            headers["X-Profile"] = profiler.path.name
+        else:
+            key = ("debate/run", max_exchange_rounds, token_budget, priority, tuple(panel))
+            state, status = await debate_cache.get_or_run(key, run, ttl=ttl, fresh=fresh)
+        headers["X-Debate-Cache"] = status
+        if status == MISS:
+            # Only the request that started the debate knows its id (and its timings)
+            headers["X-Debate-Id"] = debate_id
+            if timing := server_timing(state.get("timings") or {}):
+                headers["Server-Timing"] = timing
+        return FastJSONResponse(state, headers=headers)
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, round(e.retry_after)))},
+        ) from e
     except RuntimeError as e:
         msg = str(e)
         if "not installed" in msg.lower() or "adk" in msg.lower():
@@ -81,3 +524,61 @@ async def run_debate(max_exchange_rounds: int = 4) -> dict[str, Any]:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@app.post("/debate/stream")
+async def stream_debate(
+    max_exchange_rounds: int = 4,
+    token_budget: int | None = None,
+    priority: str = INTERACTIVE,
+    deadline_s: float | None = None,
+    debaters: str | None = None,
+) -> StreamingResponse:
+    """
+    Run the full debate and stream it as Server-Sent Events (`debaters` as for /debate/run).
+
+    Events: `phase` (a new phase started),
+    `delta` (partial text tagged with persona_id, phase, round_index),
+    `reset` (drop partial text of the turn in progress), `message` (a recorded
+    message), `done` (final state) and `error` (detail string).
+    """
+    if token_budget is not None and token_budget < 1:
+        raise HTTPException(status_code=422, detail="token_budget must be a positive integer")
+    _check_priority(priority)
+    panel = _parse_debaters(debaters)
+    ticket = _admit(max_exchange_rounds, deadline_s, len(panel))
+    try:
+        coordinator = _make_coordinator(max_exchange_rounds, token_budget, priority, panel)
+    except RuntimeError as e:
+        ticket.close()
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    params = {
+        "max_exchange_rounds": max_exchange_rounds,
+        "token_budget": token_budget,
+        "priority": priority,
+        "debaters": panel,
+    }
+    debate_id = uuid.uuid4().hex
+
+    async def event_source():
+        try:
+            async with registry.track(params, coordinator, debate_id=debate_id) as job:
+                async for event in coordinator.stream_debate():
+                    job.emit(event)
+                    if event["type"] == "done":
+                        job.result = event["state"]
+                    elif event["type"] == "error":
+                        job.fail(event["detail"])
+                    payload = {k: v for k, v in event.items() if k != "type"}
+                    yield f"event: {event['type']}\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            ticket.close()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Debate-Id": debate_id},
+        # Also releases the admission ticket if the stream never started
+        background=BackgroundTask(ticket.close),
+    )
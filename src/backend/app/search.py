@@ -0,0 +1,270 @@
+"""
+Full-text search over debate transcripts (SQLite FTS5).
+
+Messages are written to a `messages` table as debate records are published
+(see DebateRegistry.publish), once each: a message is keyed by debate id and
+its index in the transcript, so republishing or resuming a debate adds only
+what is new. Triggers keep an external-content FTS5 index in step, so the
+index is maintained incrementally and never rebuilt.
+
+Persona and phase filters are part of the FTS5 match (they are indexed
+columns), round and date filters use the `messages` table, and results are
+ranked by bm25 over the message content with a highlighted snippet. Only
+the newest RANK_WINDOW matches are ranked, so a query matching most of the
+corpus costs no more than one matching ten thousand messages; such results
+are flagged `truncated` (narrow the query or the date range to reach older
+matches). A message's `created_at` is when its debate started. Queries
+use FTS5 syntax: words, "exact phrases", OR, NOT, NEAR(a b, 5), prefix*.
+Words are stemmed, so "concede" also matches "conceded".
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+import sqlite3
+import threading
+import time
+
+from backend.core import PersonaId, RoundPhase
+
+SQLITE_TIMEOUT = 30.0  # seconds to wait for another process's write lock
+MAX_RESULTS = 100  # per page
+SNIPPET_TOKENS = 16
+RANK_WINDOW = 10_000  # newest matches ranked per query; bounds the cost of very common words
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    debate_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    author_id TEXT NOT NULL,
+    author_name TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    round_index INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    content TEXT NOT NULL,
+    UNIQUE (debate_id, seq)
+);
+CREATE INDEX IF NOT EXISTS messages_created_at ON messages (created_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content, author_id, phase,
+    content='messages', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, content, author_id, phase)
+    VALUES (new.id, new.content, new.author_id, new.phase);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content, author_id, phase)
+    VALUES ('delete', old.id, old.content, old.author_id, old.phase);
+END;
+"""
+
+_PERSONAS = {p.value for p in PersonaId}
+_PHASES = {p.value for p in RoundPhase}
+
+
+def parse_time(value: str | float | None) -> float | None:
+    """
+    A date filter as a Unix timestamp: ISO 8601 date or datetime (UTC unless
+    it has an offset) or a number of seconds.
+
+    Raises:
+        ValueError: Unparseable value.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class SearchIndex:
+    """Transcript messages and their FTS5 index in one SQLite file (":memory:" for tests)."""
+
+    def __init__(self, path: str | Path):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, timeout=SQLITE_TIMEOUT, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add(
+        self,
+        debate_id: str,
+        messages: list[dict[str, Any]],
+        start: int = 0,
+        created_at: float | None = None,
+    ) -> int:
+        """
+        Index transcript messages `start` onwards; messages already indexed are skipped.
+
+        Args:
+            debate_id: Debate the messages belong to.
+            messages: Messages in state-dict form, in transcript order.
+            start: Transcript index of `messages[0]`.
+            created_at: When the debate started, recorded for the new messages (default: now).
+
+        Returns:
+            Number of messages newly indexed.
+        """
+        created_at = time.time() if created_at is None else created_at
+        rows = [
+            (
+                debate_id,
+                start + i,
+                m["author_id"],
+                m.get("author_name", ""),
+                m["phase"],
+                m.get("round_index", 0),
+                created_at,
+                m["content"],
+            )
+            for i, m in enumerate(messages)
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                added = self._conn.executemany(
+                    "INSERT OR IGNORE INTO messages "
+                    "(debate_id, seq, author_id, author_name, phase, round_index, created_at, content) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                ).rowcount  # ignored duplicates count 0
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return added
+
+    def search(
+        self,
+        query: str,
+        persona: str | None = None,
+        phase: str | None = None,
+        round_index: int | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> dict[str, Any]:
+        """
+        Ranked messages matching `query` and the filters.
+
+        Args:
+            query: FTS5 query over message content.
+            persona: Only messages by this persona id.
+            phase: Only messages of this phase.
+            round_index: Only messages of this round.
+            since: Only messages of debates started at or after this timestamp.
+            until: Only messages of debates started before this timestamp.
+            limit: Results per page (at most MAX_RESULTS).
+            offset: Results to skip (the previous page's `next_offset`).
+
+        Returns:
+            Dict with results (best first), offset, limit, next_offset
+            (None on the last page) and truncated (True when more than
+            RANK_WINDOW messages matched, so only the newest were ranked).
+
+        Raises:
+            ValueError: Unknown persona or phase, or a malformed query.
+        """
+        if not query.strip():
+            raise ValueError("Empty search query")
+        if persona is not None and persona not in _PERSONAS:
+            raise ValueError(f"Unknown persona {persona!r}")
+        if phase is not None and phase not in _PHASES:
+            raise ValueError(f"Unknown phase {phase!r}")
+        limit = max(1, min(limit, MAX_RESULTS))
+        offset = max(0, offset)
+
+        match = f"content : ({query})"
+        if persona is not None:
+            match += f' AND author_id : "{persona}"'
+        if phase is not None:
+            match += f' AND phase : "{phase}"'
+        where = ["messages_fts MATCH ?"]
+        params: list[Any] = [match]
+        if round_index is not None:
+            where.append("m.round_index = ?")
+            params.append(round_index)
+        if since is not None:
+            where.append("m.created_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("m.created_at < ?")
+            params.append(until)
+        # Rank the newest RANK_WINDOW matches (an FTS5 scan in rowid order stops
+        # there), then build snippets for the returned page only
+        matches_sql = (
+            "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+            f"WHERE {' AND '.join(where)} ORDER BY messages_fts.rowid DESC"
+        )
+        ranked_sql = (
+            "SELECT id, debate_id, seq, author_id, author_name, phase, round_index, created_at, score, "
+            "count(*) OVER () AS ranked "
+            f"FROM (SELECT m.*, bm25(messages_fts, 1.0, 0.0, 0.0) AS score {matches_sql} LIMIT ?) "
+            "ORDER BY score, id DESC LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            try:
+                rows = self._conn.execute(ranked_sql, [*params, RANK_WINDOW, limit + 1, offset]).fetchall()
+                # A full window (or a page past its end) may hide older matches: look for one more
+                truncated = (rows[0][9] >= RANK_WINDOW if rows else offset > 0) and (
+                    self._conn.execute(
+                        f"SELECT 1 {matches_sql} LIMIT 1 OFFSET ?", [*params, RANK_WINDOW]
+                    ).fetchone()
+                    is not None
+                )
+                page = rows[:limit]
+                snippets = dict(
+                    self._conn.execute(
+                        "SELECT rowid, snippet(messages_fts, 0, '<mark>', '</mark>', '…', ?) "
+                        f"FROM messages_fts WHERE messages_fts MATCH ? AND rowid IN ({','.join('?' * len(page))})",
+                        [SNIPPET_TOKENS, match, *(row[0] for row in page)],
+                    ).fetchall()
+                ) if page else {}
+            except sqlite3.OperationalError as e:
+                raise ValueError(f"Invalid search query {query!r}: {e}") from None
+        results = [
+            {
+                "debate_id": row[1],
+                "index": row[2],
+                "author_id": row[3],
+                "author_name": row[4],
+                "phase": row[5],
+                "round_index": row[6],
+                "created_at": datetime.fromtimestamp(row[7], timezone.utc).isoformat(),
+                "snippet": snippets.get(row[0], ""),
+                "score": round(-row[8], 4),  # bm25 is lower-is-better; report higher-is-better
+            }
+            for row in page
+        ]
+        return {
+            "results": results,
+            "offset": offset,
+            "limit": limit,
+            "next_offset": offset + limit if len(rows) > limit else None,
+            "truncated": truncated,
+        }
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM messages").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,60 @@
+"""
+Server-Timing headers (shown in the browser's network panel).
+
+`server_timing` formats a debate state's `timings` section: one entry per
+kind of time summed over phases ("model_wait", "backoff", "pacing", "prompt",
+"state") and one per phase and kind ("exchange.model_wait"). Zero entries
+are left out.
+
+`ServerTimingMiddleware` adds an `app` entry to every HTTP response: the
+time from receiving the request to sending the response headers (for a
+streamed response, until the stream starts).
+"""
+
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.agent.timings import KINDS
+
+
+def _entry(name: str, ms: float) -> str:
+    return f"{name};dur={ms:.1f}"
+
+
+def server_timing(timings: dict[str, dict[str, float]]) -> str:
+    """Server-Timing header value for a state's `timings` section ("" if it is empty)."""
+    entries = []
+    for kind in KINDS:
+        total = sum(t.get(f"{kind}_ms", 0.0) for t in timings.values())
+        if total:
+            entries.append(_entry(kind, total))
+    for phase, t in timings.items():
+        entries.extend(_entry(f"{phase}.{kind}", t[f"{kind}_ms"]) for kind in KINDS if t.get(f"{kind}_ms"))
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware: append `app;dur=<ms>` to each response's Server-Timing header."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+
+        async def send_timed(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                headers = MutableHeaders(scope=message)
+                app_entry = _entry("app", (time.perf_counter() - started) * 1000)
+                existing = headers.get("server-timing")
+                headers["Server-Timing"] = f"{existing}, {app_entry}" if existing else app_entry
+            await send(message)
+
+        await self.app(scope, receive, send_timed)
+
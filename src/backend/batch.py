@@ -0,0 +1,312 @@
+"""
+Batch debate runner: run many debate configurations offline and stream each
+finished state to a JSONL file.
+
+    simulacra-batch configs.jsonl -o results.jsonl --concurrency 4
+    PYTHONPATH=src python3 -m backend.batch configs.jsonl -o results.jsonl
+
+Each line of the config file (or each element of a JSON list) is one debate:
+
+    {"id": "short-1", "max_exchange_rounds": 2, "model": "gemini-2.0-flash",
+     "token_budget": 20000, "repeat": 5}
+
+`personas` seats a panel other than the default, e.g. ["socrates",
+"confucius", "machiavelli", "mandela"] (any two or more registered debaters).
+
+Debates run concurrently under a cap, through the same shared per-model
+limiters as the API, in the `batch` priority class. Each result is appended to
+the output as soon as it completes; rerunning the same command resumes the
+batch, skipping debates already recorded as done.
+
+`--record cassette.jsonl.gz` saves every model call; `--replay` runs the same
+batch again from the cassette, offline, with the recorded (or `--time-scale`d)
+latencies, to compare orchestration changes on an identical workload.
+
+`--spill-dir DIR` keeps long debates' memory flat: each debate moves its
+older messages to a segment in DIR as it goes, and its result holds the
+recent ones plus the segment's id (read the whole transcript back with the
+read_messages tool, or export it with backend.columnar, with
+SIMULACRA_SPILL_DIR=DIR).
+"""
+
+from pathlib import Path
+from typing import Any, Awaitable, Callable, TextIO
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from backend.agent import DebateCoordinator
+from backend.agent.cassette import Cassette, ReplayTransport
+from backend.agent.coordinator import DEFAULT_MODEL, debate_panel, load_adk
+from backend.agent.scheduler import BATCH
+from backend.core import configure_spill_dir
+
+DEFAULT_CONCURRENCY = 4
+CONFIG_KEYS = {"id", "max_exchange_rounds", "model", "token_budget", "personas", "repeat"}
+
+RunDebate = Callable[[dict[str, Any]], Awaitable[dict[str, Any]]]
+
+
+def load_configs(path: Path, default_model: str = DEFAULT_MODEL) -> list[dict[str, Any]]:
+    """
+    Read debate configurations from a JSONL file or a JSON list and expand `repeat`.
+
+    Every configuration gets a stable `id` (given, or derived from its content
+    and occurrence) so a resumed batch recognises the debates already done.
+
+    Raises:
+        ValueError: On unknown keys, invalid values or unsupported persona sets.
+    """
+    text = path.read_text()
+    if text.lstrip().startswith("["):
+        raw = json.loads(text)
+    else:
+        raw = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    configs: list[dict[str, Any]] = []
+    seen: dict[str, int] = {}
+    for n, entry in enumerate(raw, start=1):
+        unknown = set(entry) - CONFIG_KEYS
+        if unknown:
+            raise ValueError(f"Config {n}: unknown keys {sorted(unknown)}")
+        config = {
+            "max_exchange_rounds": int(entry.get("max_exchange_rounds", 4)),
+            "model": entry.get("model") or default_model,
+            "token_budget": entry.get("token_budget"),
+        }
+        personas = entry.get("personas")
+        if personas is not None:
+            try:
+                # Only set when given, so the ids of default-panel configs stay as they were
+                config["personas"] = debate_panel(list(personas))
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Config {n}: persona set {personas} is not supported: {e}") from None
+        if config["max_exchange_rounds"] < 1:
+            raise ValueError(f"Config {n}: max_exchange_rounds must be at least 1")
+        base = entry.get("id") or hashlib.sha1(
+            json.dumps(config, sort_keys=True).encode()
+        ).hexdigest()[:10]
+        for _ in range(int(entry.get("repeat", 1))):
+            seen[base] = seen.get(base, 0) + 1
+            debate_id = base if seen[base] == 1 else f"{base}-{seen[base]}"
+            configs.append({"id": debate_id, **config})
+    return configs
+
+
+def completed_ids(output: Path) -> set[str]:
+    """Ids recorded as done in an existing output file (a truncated last line is ignored)."""
+    if not output.exists():
+        return set()
+    done = set()
+    for line in output.read_text().splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get("status") == "done":
+            done.add(record["id"])
+    return done
+
+
+def _drop_partial_line(output: Path) -> None:
+    """Cut a last line left unfinished by a crash, so appended records start on a new line."""
+    if not output.exists():
+        return
+    data = output.read_bytes()
+    if data and not data.endswith(b"\n"):
+        output.write_bytes(data[: data.rfind(b"\n") + 1])
+
+
+def coordinator_runner(
+    record_to: Cassette | None = None,
+    replay: Cassette | None = None,
+    time_scale: float = 1.0,
+    spill: bool = False,
+) -> RunDebate:
+    """
+    Runs one debate through DebateCoordinator in the batch priority class,
+    optionally recording its model calls or replaying them from a cassette.
+    Calls are scoped by debate id, so concurrent debates replay their own.
+    With `spill`, older messages go to segments in the spill directory.
+    """
+
+    async def run(config: dict[str, Any]) -> dict[str, Any]:
+        transport = None
+        if replay is not None:
+            transport = ReplayTransport(replay, time_scale=time_scale, scope=config["id"])
+        coordinator = DebateCoordinator(
+            model=config["model"],
+            max_exchange_rounds=config["max_exchange_rounds"],
+            token_budget=config["token_budget"],
+            priority=BATCH,
+            transport=transport,
+            record_to=record_to,
+            record_scope=config["id"],
+            debaters=config.get("personas"),
+            spill=spill,
+        )
+        return await coordinator.run_debate()
+
+    return run
+
+
+class Progress:
+    """Live throughput line: debates done, rate, tokens per minute and ETA."""
+
+    def __init__(self, total: int, stream: TextIO = sys.stderr, clock: Callable[[], float] = time.monotonic):
+        self.total = total
+        self.stream = stream
+        self._clock = clock
+        self.started = clock()
+        self.done = 0
+        self.failed = 0
+        self.tokens = 0
+
+    def update(self, record: dict[str, Any]) -> None:
+        if record["status"] == "done":
+            self.done += 1
+            self.tokens += ((record["state"] or {}).get("token_total") or {}).get("total_tokens", 0)
+        else:
+            self.failed += 1
+        finished = self.done + self.failed
+        minutes = max(self._clock() - self.started, 1e-9) / 60.0
+        rate = finished / minutes
+        eta = (self.total - finished) / rate if rate else float("inf")
+        self.stream.write(
+            f"[{finished}/{self.total}] {record['status']} {record['id']} "
+            f"({record['elapsed_s']:.1f}s) | {rate:.2f} debates/min | "
+            f"{self.tokens / minutes:.0f} tokens/min | {self.failed} failed | ETA {eta:.1f} min\n"
+        )
+        self.stream.flush()
+
+
+async def run_batch(
+    configs: list[dict[str, Any]],
+    output: Path,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    run_debate: RunDebate | None = None,
+    resume: bool = True,
+    progress_stream: TextIO = sys.stderr,
+) -> dict[str, int]:
+    """
+    Run `configs` with at most `concurrency` debates at once, appending each
+    result to `output` as it completes.
+
+    Args:
+        configs: Output of `load_configs`.
+        output: JSONL file; one record per finished debate.
+        concurrency: Debates in flight at once (LLM calls are further limited
+            by the shared per-model limiters).
+        run_debate: Runs one configuration and returns the final state
+            (default: `coordinator_runner()`).
+        resume: Skip configurations already recorded as done in `output`;
+            otherwise `output` is truncated first.
+        progress_stream: Where the live throughput lines go.
+
+    Returns:
+        Counts of "done", "failed" and "skipped" debates.
+    """
+    if resume:
+        _drop_partial_line(output)
+        already = completed_ids(output)
+    else:
+        already = set()
+        output.write_text("")
+    run_debate = run_debate or coordinator_runner()
+    pending = [c for c in configs if c["id"] not in already]
+    progress = Progress(len(pending), progress_stream)
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    counts = {"done": 0, "failed": 0, "skipped": len(configs) - len(pending)}
+
+    with output.open("a") as out:
+
+        async def run_one(config: dict[str, Any]) -> None:
+            async with semaphore:
+                started = time.monotonic()
+                try:
+                    state, status, error = await run_debate(config), "done", None
+                except Exception as e:
+                    state, status, error = None, "failed", str(e) or repr(e)
+                record = {
+                    "id": config["id"],
+                    "config": {k: v for k, v in config.items() if k != "id"},
+                    "status": status,
+                    "error": error,
+                    "elapsed_s": round(time.monotonic() - started, 3),
+                    "state": state,
+                }
+                # One write per record, flushed at once: a crash loses at most the line in progress
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                counts[status] += 1
+                progress.update(record)
+
+        await asyncio.gather(*(run_one(c) for c in pending))
+    return counts
+
+
+def main(argv: list[str] | None = None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run debates in batch and write results as JSONL.")
+    parser.add_argument("configs", type=Path, help="JSONL (or JSON list) of debate configurations")
+    parser.add_argument("-o", "--output", type=Path, default=Path("results.jsonl"))
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument(
+        "--restart", action="store_true", help="Discard existing results instead of resuming"
+    )
+    parser.add_argument("--record", type=Path, default=None, help="Save every model call to this cassette")
+    parser.add_argument("--replay", type=Path, default=None, help="Serve model calls from this cassette")
+    parser.add_argument(
+        "--time-scale", type=float, default=1.0, help="Replay latency multiplier (0 = instant)"
+    )
+    parser.add_argument(
+        "--spill-dir", type=Path, default=None, help="Move older messages of each debate to files here"
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    try:
+        configs = load_configs(args.configs, os.getenv("GOOGLE_API_MODEL", DEFAULT_MODEL))
+    except (OSError, ValueError) as e:
+        print(f"Invalid configs: {e}", file=sys.stderr)
+        return 2
+    replay = None
+    if args.replay is not None:
+        try:
+            replay = Cassette.load(args.replay)
+        except (OSError, ValueError) as e:
+            print(f"Invalid cassette: {e}", file=sys.stderr)
+            return 2
+    elif not load_adk():
+        print("Google ADK is not installed. Install with: uv add google-adk", file=sys.stderr)
+        return 2
+
+    record_to = Cassette() if args.record is not None else None
+    if args.spill_dir is not None:
+        configure_spill_dir(args.spill_dir)
+    run_debate = coordinator_runner(record_to, replay, args.time_scale, spill=args.spill_dir is not None)
+    try:
+        counts = asyncio.run(
+            run_batch(configs, args.output, args.concurrency, run_debate, resume=not args.restart)
+        )
+    finally:
+        if record_to is not None:
+            record_to.save(args.record)
+            print(f"Recorded {len(record_to)} model calls -> {args.record}", file=sys.stderr)
+    print(
+        f"{counts['done']} done, {counts['failed']} failed, {counts['skipped']} already done "
+        f"-> {args.output}",
+        file=sys.stderr,
+    )
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Columnar export of debate transcripts for corpus-wide analytics.
+
+    simulacra-export results.jsonl -o corpus.simcol
+    PYTHONPATH=src python3 -m backend.columnar results.jsonl states.json -o corpus.simcol
+
+Reads finished debates (batch output records, GET /debates/{id} records or
+bare state dicts; JSONL or a JSON list) and writes one file in which every
+message is a row across fixed-width columns:
+
+    debate   uint32  index into the header's debate ids
+    author   uint8   persona code (header "personas")
+    phase    uint8   phase code (header "phases")
+    round    uint16  round index
+    flags    uint8   FLAG_CONCESSION on reflections that read as a change of position
+    length   uint32  characters in the message
+    offsets  uint64  (messages + 1) byte offsets into `text`, the UTF-8 message bodies
+
+plus per-debate columns (exchange_rounds, max_exchange_rounds,
+budget_exhausted, arbitrated). The file is a magic line, a JSON header and
+little-endian column bytes aligned to 8, so `backend.analytics` can map the
+columns straight into NumPy arrays. Writing and reading need only the stdlib.
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+import argparse
+import json
+import re
+import struct
+import sys
+
+from backend.core import PersonaId, RoundPhase, state_messages
+
+MAGIC = b"SIMCOL1\n"
+FORMAT_VERSION = 1
+PERSONAS = [p.value for p in PersonaId]
+PHASES = [p.value for p in RoundPhase]
+_PERSONA_CODES = {p: i for i, p in enumerate(PERSONAS)}
+_PHASE_CODES = {p: i for i, p in enumerate(PHASES)}
+
+FLAG_CONCESSION = 1
+# Heuristic: phrases with which a persona concedes or moves towards another's view
+CONCESSION_PATTERN = re.compile(
+    r"\b(i (now |must |have to )?(concede|admit|accept|agree)|i was wrong|i stand corrected|"
+    r"changed my (mind|view|position)|you have persuaded|(has|have) persuaded me|"
+    r"i am persuaded|you are right|i reconsider)\b",
+    re.IGNORECASE,
+)
+
+# Message columns: name -> array typecode (fixed width on every platform)
+MESSAGE_COLUMNS = {"debate": "I", "author": "B", "phase": "B", "round": "H", "flags": "B", "length": "I"}
+DEBATE_COLUMNS = {"exchange_rounds": "H", "max_exchange_rounds": "H", "budget_exhausted": "B", "arbitrated": "B"}
+
+
+@dataclass
+class Corpus:
+    """Columns of an exported corpus (stdlib arrays; see backend.analytics for NumPy views)."""
+
+    debate_ids: list[str] = field(default_factory=list)
+    columns: dict[str, array] = field(
+        default_factory=lambda: {name: array(code) for name, code in {**MESSAGE_COLUMNS, **DEBATE_COLUMNS}.items()}
+    )
+    offsets: array = field(default_factory=lambda: array("Q", [0]))
+    text: bytearray = field(default_factory=bytearray)
+
+    def __len__(self) -> int:
+        return len(self.columns["debate"])
+
+    def message_text(self, i: int) -> str:
+        return self.text[self.offsets[i] : self.offsets[i + 1]].decode()
+
+    def add_debate(self, debate_id: str, state: dict[str, Any]) -> None:
+        """Append one debate's transcript (a state dict, spilled messages included) as rows."""
+        index = len(self.debate_ids)
+        self.debate_ids.append(debate_id)
+        cols = self.columns
+        for m in state_messages(state):
+            content = m["content"]
+            # The pattern is the costly part of an export: only reflections need it
+            conceded = m["phase"] == "reflection" and CONCESSION_PATTERN.search(content)
+            cols["debate"].append(index)
+            cols["author"].append(_PERSONA_CODES[m["author_id"]])
+            cols["phase"].append(_PHASE_CODES[m["phase"]])
+            cols["round"].append(m.get("round_index", 0))
+            cols["flags"].append(FLAG_CONCESSION if conceded else 0)
+            cols["length"].append(len(content))
+            self.text += content.encode()
+            self.offsets.append(len(self.text))
+        cols["exchange_rounds"].append(state.get("exchange_rounds", 0))
+        cols["max_exchange_rounds"].append(state.get("max_exchange_rounds", 0))
+        cols["budget_exhausted"].append(bool(state.get("budget_exhausted")))
+        cols["arbitrated"].append(bool(state.get("arbitration")))
+
+
+def _pad(n: int) -> int:
+    return -n % 8
+
+
+def _le_bytes(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def write_corpus(corpus: Corpus, path: str | Path) -> None:
+    """Write the corpus file atomically."""
+    blobs: list[tuple[str, str, bytes]] = [
+        (name, corpus.columns[name].typecode, _le_bytes(corpus.columns[name]))
+        for name in (*MESSAGE_COLUMNS, *DEBATE_COLUMNS)
+    ]
+    blobs.append(("offsets", "Q", _le_bytes(corpus.offsets)))
+    blobs.append(("text", "bytes", bytes(corpus.text)))
+    layout, position = {}, 0
+    for name, typecode, blob in blobs:
+        layout[name] = {"type": typecode, "offset": position, "nbytes": len(blob)}
+        position += len(blob) + _pad(len(blob))
+    header = json.dumps(
+        {
+            "version": FORMAT_VERSION,
+            "messages": len(corpus),
+            "debate_ids": corpus.debate_ids,
+            "personas": PERSONAS,
+            "phases": PHASES,
+            "flags": {"concession": FLAG_CONCESSION},
+            "columns": layout,
+        }
+    ).encode()
+    header += b" " * _pad(len(MAGIC) + 8 + len(header))  # column data starts 8-aligned
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        for _, _, blob in blobs:
+            f.write(blob + b"\0" * _pad(len(blob)))
+    tmp.replace(path)
+
+
+def read_header(data: bytes | memoryview) -> tuple[dict[str, Any], int]:
+    """
+    Parse a corpus file's header. Returns (header, offset of the column data).
+
+    Raises:
+        ValueError: Not a corpus file, or an unsupported version.
+    """
+    if bytes(data[: len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a columnar corpus file")
+    (size,) = struct.unpack_from("<Q", data, len(MAGIC))
+    start = len(MAGIC) + 8
+    header = json.loads(bytes(data[start : start + size]))
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported corpus version {header.get('version')}")
+    return header, start + size
+
+
+def read_corpus(path: str | Path) -> Corpus:
+    """Load a corpus file into stdlib arrays."""
+    data = Path(path).read_bytes()
+    header, base = read_header(data)
+    corpus = Corpus(debate_ids=header["debate_ids"])
+    for name, spec in header["columns"].items():
+        blob = data[base + spec["offset"] : base + spec["offset"] + spec["nbytes"]]
+        if name == "text":
+            corpus.text = bytearray(blob)
+            continue
+        column = array(spec["type"])
+        column.frombytes(blob)
+        if sys.byteorder == "big":
+            column.byteswap()
+        if name == "offsets":
+            corpus.offsets = column
+        else:
+            corpus.columns[name] = column
+    return corpus
+
+
+def iter_states(path: Path) -> Iterator[tuple[str, dict[str, Any]]]:
+    """
+    (debate id, state) for each finished debate in a JSONL file or JSON list of
+    batch records ({"id", "status", "state"}), API records ({"debate_id",
+    "state"}) or bare states (numbered by position).
+    """
+    text = path.read_text()
+    if text.lstrip().startswith("["):
+        records: Iterable[Any] = json.loads(text)
+    else:
+        records = (json.loads(line) for line in text.splitlines() if line.strip())
+    for n, record in enumerate(records):
+        if "messages" in record:
+            yield f"{path.stem}-{n}", record
+            continue
+        if record.get("status", "done") != "done" or not record.get("state"):
+            continue
+        yield str(record.get("id") or record.get("debate_id") or f"{path.stem}-{n}"), record["state"]
+
+
+def export(paths: Iterable[Path], output: Path) -> Corpus:
+    """Export every finished debate in `paths` to one corpus file."""
+    corpus = Corpus()
+    for path in paths:
+        for debate_id, state in iter_states(path):
+            corpus.add_debate(debate_id, state)
+    write_corpus(corpus, output)
+    return corpus
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export debate transcripts to a columnar corpus file.")
+    parser.add_argument("inputs", type=Path, nargs="+", help="Batch results, debate records or states (JSONL or JSON)")
+    parser.add_argument("-o", "--output", type=Path, default=Path("corpus.simcol"))
+    args = parser.parse_args(argv)
+    try:
+        corpus = export(args.inputs, args.output)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Export failed: {e!r}", file=sys.stderr)
+        return 2
+    print(
+        f"{len(corpus.debate_ids)} debates, {len(corpus)} messages, {len(corpus.text)} bytes of text "
+        f"-> {args.output}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,23 @@
-from .persona import Persona, PersonaId
-from .debate import DebateState, DebateRound, DebateMessage, RoundPhase
+from .persona import PERSONA_REGISTRY, Persona, PersonaId, PersonaRegistry
+from .debate import DebateState, DebateRound, DebateMessage, RoundPhase, TokenUsage, ModelRoute, PhaseTimings, SegmentRef
+from .segment import MessageSegment, configure_spill_dir, new_segment_id, spill_enabled, state_messages
 
 __all__ = [
     "Persona",
     "PersonaId",
+    "PersonaRegistry",
+    "PERSONA_REGISTRY",
     "DebateState",
     "DebateRound",
     "DebateMessage",
     "RoundPhase",
+    "TokenUsage",
+    "ModelRoute",
+    "PhaseTimings",
+    "SegmentRef",
+    "MessageSegment",
+    "state_messages",
+    "configure_spill_dir",
+    "new_segment_id",
+    "spill_enabled",
 ]
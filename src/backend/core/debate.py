@@ -1,9 +1,18 @@
-"""Debate state and message types. No I/O; pure data structures."""
+"""
+Debate state and message types. Pure data structures; the only I/O is
+reading and appending a long debate's spilled messages (see core.segment).
+"""
 
 from enum import Enum
-from pydantic import BaseModel, Field
+from typing import Annotated, Any
+import sys
 
-from .persona import PersonaId
+from pydantic import BaseModel, Field, GetCoreSchemaHandler, TypeAdapter, computed_field
+from pydantic_core import core_schema
+from typing_extensions import NotRequired, TypedDict
+
+from .persona import PERSONA_REGISTRY, PersonaId
+from .segment import SEGMENT_ID_PATTERN, MessageSegment
 
 
 class RoundPhase(str, Enum):
@@ -17,26 +26,192 @@ class RoundPhase(str, Enum):
     DONE = "done"
 
 
-class DebateMessage(BaseModel):
-    """A single message in the debate transcript."""
+class _MessageFields(TypedDict):
+    author_id: PersonaId  # Which persona said this
+    author_name: str  # Display name of author
+    content: str  # Message text
+    round_index: NotRequired[Annotated[int, Field(ge=0)]]  # Exchange round (0 = opening/defence)
+    phase: RoundPhase  # Phase when this was said
+
+
+# Enum members by value, for building messages from trusted state dicts
+_PERSONAS_BY_VALUE: dict[str, PersonaId] = {p.value: p for p in PersonaId}
+_PHASES_BY_VALUE: dict[str, RoundPhase] = {p.value: p for p in RoundPhase}
+
+
+class DebateMessage:
+    """
+    A single message in the debate transcript.
+
+    Transcripts run to 100k messages, so a message is a slotted record, not a
+    pydantic model: its persona and phase are the shared enum members and its
+    author name is interned. Constructing one validates its fields, and
+    pydantic validates and serializes it as a field (DebateState.messages,
+    TypeAdapter) like a model; `model_construct` skips the checks for data
+    this package produced itself.
+    """
+
+    __slots__ = ("author_id", "author_name", "content", "round_index", "phase")
+
+    def __init__(
+        self,
+        *,
+        author_id: PersonaId | str,
+        author_name: str,
+        content: str,
+        phase: RoundPhase | str,
+        round_index: int = 0,
+    ):
+        """
+        Raises:
+            ValueError: An invalid field (pydantic ValidationError).
+        """
+        fields = _MESSAGE_FIELDS.validate_python(
+            {
+                "author_id": author_id,
+                "author_name": author_name,
+                "content": content,
+                "round_index": round_index,
+                "phase": phase,
+            }
+        )
+        self._set(**fields)
+
+    def _set(
+        self, author_id: PersonaId, author_name: str, content: str, phase: RoundPhase, round_index: int = 0
+    ) -> None:
+        self.author_id = author_id
+        self.author_name = sys.intern(author_name)
+        self.content = content
+        self.round_index = round_index
+        self.phase = phase
+
+    @classmethod
+    def model_construct(
+        cls,
+        author_id: PersonaId | str,
+        author_name: str,
+        content: str,
+        phase: RoundPhase | str,
+        round_index: int = 0,
+    ) -> "DebateMessage":
+        """
+        A message from trusted values (e.g. a state dict serialized by this
+        package), without validation. Ids and phases may be given by value.
+
+        Raises:
+            KeyError: Unknown persona id or phase.
+        """
+        message = object.__new__(cls)
+        message._set(_PERSONAS_BY_VALUE[author_id], author_name, content, _PHASES_BY_VALUE[phase], round_index)
+        return message
+
+    def to_dict(self) -> dict[str, Any]:
+        """The message as in a state dict."""
+        return {
+            "author_id": self.author_id.value,
+            "author_name": self.author_name,
+            "content": self.content,
+            "round_index": self.round_index,
+            "phase": self.phase.value,
+        }
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        from_fields = core_schema.no_info_after_validator_function(
+            lambda fields: cls.model_construct(**fields), handler.generate_schema(_MessageFields)
+        )
+        return core_schema.json_or_python_schema(
+            json_schema=from_fields,
+            python_schema=core_schema.union_schema([core_schema.is_instance_schema(cls), from_fields]),
+            serialization=core_schema.plain_serializer_function_ser_schema(cls.to_dict),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DebateMessage):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    __hash__ = None  # type: ignore[assignment]  # mutable, like the model it replaced
+
+    def __repr__(self) -> str:
+        return (
+            f"DebateMessage(author_id={self.author_id.value!r}, phase={self.phase.value!r}, "
+            f"round_index={self.round_index}, content={self.content[:40]!r})"
+        )
+
+
+_MESSAGE_FIELDS = TypeAdapter(_MessageFields)
+
+
+# Phases in the order a debate goes through them
+_PHASE_ORDER: dict[RoundPhase, int] = {p: i for i, p in enumerate(RoundPhase)}
+
 
-    author_id: PersonaId = Field(..., description="Which persona said this")
-    author_name: str = Field(..., description="Display name of author")
-    content: str = Field(..., description="Message text")
-    round_index: int = Field(default=0, ge=0, description="Exchange round (0 = opening/defence)")
-    phase: RoundPhase = Field(..., description="Phase when this was said")
+class TokenUsage(BaseModel):
+    """Prompt, completion and total token counts reported by the model."""
+
+    prompt_tokens: int = Field(default=0, ge=0)
+    completion_tokens: int = Field(default=0, ge=0)
+    total_tokens: int = Field(default=0, ge=0)
+
+    def add(self, other: "TokenUsage") -> None:
+        """Accumulate another usage record into this one."""
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.total_tokens += other.total_tokens
+
+
+class PhaseTimings(BaseModel):
+    """Where one phase's wall-clock time went, in milliseconds."""
+
+    model_wait_ms: float = Field(default=0.0, ge=0)  # Waiting on model calls
+    backoff_ms: float = Field(default=0.0, ge=0)  # Waiting for a limiter slot or retry-after
+    pacing_ms: float = Field(default=0.0, ge=0)  # Fixed delays between turns and phases
+    prompt_ms: float = Field(default=0.0, ge=0)  # Building prompts
+    state_ms: float = Field(default=0.0, ge=0)  # Recording turns (state (de)serialization)
+
+
+class ModelRoute(BaseModel):
+    """Which model served one LLM turn, and whether it was a quota fallback."""
+
+    phase: RoundPhase = Field(..., description="Phase of the turn")
+    persona_id: PersonaId = Field(..., description="Who spoke")
+    round_index: int = Field(default=0, ge=0)
+    model: str = Field(..., description="Model that produced the reply")
+    fallback: bool = Field(default=False, description="Primary model was quota-exhausted")
+
+
+class SegmentRef(BaseModel):
+    """The segment holding a long debate's older messages."""
+
+    id: str = Field(..., pattern=SEGMENT_ID_PATTERN, description="Segment id in the spill directory (see core.segment)")
+    count: int = Field(default=0, ge=0, description="Messages moved there; `messages` follows them")
+
+
+def _line(author_name: str, phase: str, content: str) -> str:
+    return f"[{author_name}] ({phase}): {content}\n"
 
 
 class DebateState(BaseModel):
     """Full state of the debate: phase, transcript, openings, and round count."""
 
     phase: RoundPhase = Field(default=RoundPhase.OPENING)
+    # The panel of debaters, in speaking order
+    debaters: list[PersonaId] = Field(default_factory=lambda: list(PERSONA_REGISTRY.default_debaters))
     messages: list[DebateMessage] = Field(default_factory=list)
     openings: dict[str, str] = Field(default_factory=dict)  # persona_id -> opening text
     exchange_rounds: int = Field(default=0, ge=0)
     max_exchange_rounds: int = Field(default=4, ge=1)
     reflections: dict[str, str] = Field(default_factory=dict)  # persona_id -> reflection text
     arbitration: str = Field(default="")  # Arbitrator's final consensus
+    token_usage: dict[str, TokenUsage] = Field(default_factory=dict)  # phase -> usage
+    token_budget: int | None = Field(default=None, ge=1)  # Max total tokens per debate
+    budget_exhausted: bool = Field(default=False)  # Exchange/reflection cut short by budget
+    routes: list[ModelRoute] = Field(default_factory=list)  # Model used per LLM turn
+    timings: dict[str, PhaseTimings] = Field(default_factory=dict)  # phase -> time breakdown
+    # Set for debates that spill: `messages` is then only the recent part of the transcript
+    segment: SegmentRef | None = Field(default=None)
 
     def add_message(self, author_id: PersonaId, author_name: str, content: str, phase: RoundPhase, round_index: int = 0) -> None:
         """Append a message and optionally update phase."""
@@ -58,11 +233,101 @@ class DebateState(BaseModel):
         """Store a reflection (would you change position) by persona."""
         self.reflections[persona_id.value] = text
 
+    def add_token_usage(self, phase: RoundPhase, usage: TokenUsage) -> None:
+        """Add one turn's token usage to the running total for its phase."""
+        self.token_usage.setdefault(phase.value, TokenUsage()).add(usage)
+
+    def total_token_usage(self) -> TokenUsage:
+        """Token usage summed over all phases."""
+        total = TokenUsage()
+        for usage in self.token_usage.values():
+            total.add(usage)
+        return total
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def token_total(self) -> TokenUsage:
+        """Serialized alongside the fields, as in the tools' state dict."""
+        return self.total_token_usage()
+
+    @property
+    def spilled(self) -> int:
+        """Messages moved to the segment; message i of the transcript is messages[i - spilled]."""
+        return self.segment.count if self.segment is not None else 0
+
+    def message_count(self) -> int:
+        """Length of the whole transcript, spilled messages included."""
+        return self.spilled + len(self.messages)
+
+    def spill(self, keep: int) -> None:
+        """
+        Move all but the last `keep` messages to the segment file (no-op for a
+        debate without a segment).
+
+        Raises:
+            OSError: The segment cannot be written.
+            ValueError: Spilling is not enabled (see core.segment).
+        """
+        if self.segment is None or len(self.messages) <= keep:
+            return
+        moved = len(self.messages) - keep
+        rows = (
+            {
+                "author_id": m.author_id.value,
+                "author_name": m.author_name,
+                "content": m.content,
+                "round_index": m.round_index,
+                "phase": m.phase.value,
+            }
+            for m in self.messages[:moved]
+        )
+        self.segment.count = MessageSegment.open(self.segment.id).append(rows, at=self.segment.count)
+        del self.messages[:moved]
+
     def transcript_for_context(self, limit: int = 50) -> str:
         """Produce a concise transcript string for agent context (last N messages)."""
-        recent = self.messages[-limit:] if limit else self.messages
-        lines = [f"[{m.author_name}] ({m.phase.value}): {m.content}" for m in recent]
-        return "\n".join(lines)
+        text = self.transcript_lines(max(0, self.message_count() - limit) if limit else 0)
+        return text[:-1]
+
+    def transcript_lines(self, start: int = 0, end: int | None = None) -> str:
+        """
+        Messages[start:end] of the whole transcript as lines, each ending in a
+        newline, so the text for a longer range starts with the text for a
+        shorter one. Spilled messages are read back from the segment.
+        """
+        spilled = self.spilled
+        start, end, _ = slice(start, end).indices(self.message_count())
+        lines = []
+        if start < spilled:
+            rows = MessageSegment.open(self.segment.id).rows(start, min(end, spilled))
+            lines = [_line(r["author_name"], r["phase"], r["content"]) for r in rows]
+        hot = self.messages[max(start - spilled, 0) : max(end - spilled, 0)]
+        return "".join(lines) + "".join(_line(m.author_name, m.phase.value, m.content) for m in hot)
+
+    def phase_start(self, phase: RoundPhase, round_index: int | None = None) -> int:
+        """Index of the first message of `phase` (and round), or the transcript length if none yet."""
+        target = (_PHASE_ORDER[phase], round_index or 0)
+
+        def key(p: RoundPhase, r: int) -> tuple[int, int]:
+            return _PHASE_ORDER[p], (r if round_index is not None else 0)
+
+        spilled = self.spilled
+        first = next((i for i, m in enumerate(self.messages) if key(m.phase, m.round_index) == target), None)
+        if first is not None and (first or not spilled):
+            return spilled + first
+        if first is None and (not spilled or not self.messages or key(self.messages[0].phase, self.messages[0].round_index) < target):
+            return self.message_count()
+        # Transcripts are in phase and round order: the phase starts among the
+        # spilled messages (or right after them), found walking back from the end
+        first = spilled if first is not None else None
+        rows = MessageSegment.open(self.segment.id).rows(0, spilled, reverse=True)
+        for i, row in zip(range(spilled - 1, -1, -1), rows):
+            found = key(RoundPhase(row["phase"]), row.get("round_index", 0))
+            if found < target:
+                break
+            if found == target:
+                first = i
+        return first if first is not None else self.message_count()
 
     def openings_text(self) -> str:
         """All opening statements as a single block for context."""
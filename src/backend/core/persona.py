@@ -1,16 +1,68 @@
-"""Persona definitions for debate agents. No I/O; pure data and behaviour descriptions."""
+"""
+Persona definitions for debate agents: data and behaviour descriptions.
+
+Personas are read once, at import, from personas.json next to this module
+or the file named by SIMULACRA_PERSONAS. The file lists every persona (id,
+name, philosophy, icon hint) and the default panel of debaters:
+
+    {"default_debaters": ["napoleon", "gandhi", "alexander"],
+     "personas": [{"id": "napoleon", "name": "Napoleon", "philosophy": "...", "icon_hint": "napoleon"},
+                  ...,
+                  {"id": "arbitrator", "name": "Arbitrator", "philosophy": "..."}]}
+
+Every persona other than "arbitrator" is a debater; a debate may seat any
+two or more of them (see PersonaRegistry.panel). PersonaId is built from
+the file, so ids are lowercase identifiers and "arbitrator" is required.
+"""
 
 from enum import Enum
-from pydantic import BaseModel, Field
+from pathlib import Path
+from typing import Any, Iterator
+import json
+import os
+import re
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+DEFAULT_PERSONAS_FILE = Path(__file__).with_name("personas.json")
+ARBITRATOR_ID = "arbitrator"
+MIN_DEBATERS = 2
+_ID_PATTERN = re.compile(r"[a-z][a-z0-9_]*")
+
 
+def _read_config(path: Path) -> dict[str, Any]:
+    """
+    Read and check a personas file.
 
-class PersonaId(str, Enum):
-    """Identifies each debate persona."""
+    Raises:
+        ValueError: Malformed file, bad or duplicate ids, no arbitrator, or a bad default panel.
+    """
+    try:
+        config = json.loads(path.read_text())
+        entries = config["personas"]
+        ids = [entry["id"] for entry in entries]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Cannot read personas from {path}: {e!r}") from None
+    bad = [pid for pid in ids if not isinstance(pid, str) or not _ID_PATTERN.fullmatch(pid)]
+    if bad:
+        raise ValueError(f"{path}: persona ids must be lowercase identifiers, got {bad}")
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"{path}: duplicate persona ids")
+    if ARBITRATOR_ID not in ids:
+        raise ValueError(f"{path}: an {ARBITRATOR_ID!r} persona is required")
+    config.setdefault("default_debaters", [pid for pid in ids if pid != ARBITRATOR_ID])
+    return config
 
-    NAPOLEON = "napoleon"
-    GANDHI = "gandhi"
-    ALEXANDER = "alexander"
-    ARBITRATOR = "arbitrator"
+
+_CONFIG = _read_config(Path(os.getenv("SIMULACRA_PERSONAS", "").strip() or DEFAULT_PERSONAS_FILE))
+
+# Identifies each debate persona: one member per persona in the file (NAPOLEON = "napoleon", ...)
+PersonaId = Enum(  # type: ignore[misc]
+    "PersonaId",
+    [(entry["id"].upper(), entry["id"]) for entry in _CONFIG["personas"]],
+    type=str,
+    module=__name__,
+)
 
 
 class Persona(BaseModel):
@@ -20,68 +72,71 @@ class Persona(BaseModel):
     name: str = Field(..., description="Display name")
     philosophy: str = Field(..., description="Core philosophy for opening/defence/summary")
     icon_hint: str = Field(default="", description="Frontend icon identifier")
+    _prompt_prefix: str = PrivateAttr(default="")
 
-    @classmethod
-    def napoleon(cls) -> "Persona":
-        return cls(
-            id=PersonaId.NAPOLEON,
-            name="Napoleon",
-            philosophy=(
-                "Conquer the world for benevolence. "
-                "A single kingdom leaves less room for wars between kingdoms."
-            ),
-            icon_hint="napoleon",
-        )
-
-    @classmethod
-    def gandhi(cls) -> "Persona":
-        return cls(
-            id=PersonaId.GANDHI,
-            name="Gandhi",
-            philosophy=(
-                "Spartan life; peace through setting low expectations; non-violence."
-            ),
-            icon_hint="gandhi",
-        )
+    def model_post_init(self, __context: Any) -> None:
+        self._prompt_prefix = f"You are {self.name}. Your view: {self.philosophy}. "
 
-    @classmethod
-    def alexander(cls) -> "Persona":
-        return cls(
-            id=PersonaId.ALEXANDER,
-            name="Alexander",
-            philosophy=(
-                "Motivated by pure ambition. Greatness lies in conquest. "
-                "Wars are acceptable; death in pursuit of glory is acceptable; "
-                "everything is fair game in the pursuit of greatness."
-            ),
-            icon_hint="alexander",
-        )
+    @property
+    def prompt_prefix(self) -> str:
+        """The static start of every prompt this persona answers, formatted once."""
+        return self._prompt_prefix
 
     @classmethod
     def arbitrator(cls) -> "Persona":
-        return cls(
-            id=PersonaId.ARBITRATOR,
-            name="Arbitrator",
-            philosophy=(
-                "Impartial arbitrator who analyzes all perspectives, "
-                "identifies common ground, and brings all viewpoints to a balanced consensus. "
-                "Synthesizes the debate and proposes unified solutions that respect all positions."
-            ),
-            icon_hint="arbitrator",
-        )
+        return cls.get(PersonaId(ARBITRATOR_ID))
 
     @classmethod
     def debaters(cls) -> list["Persona"]:
-        """The three debate personas (excludes Arbitrator)."""
-        return [cls.napoleon(), cls.gandhi(), cls.alexander()]
+        """The default panel of debaters (excludes Arbitrator)."""
+        return [PERSONA_REGISTRY.get(pid) for pid in PERSONA_REGISTRY.default_debaters]
 
     @classmethod
     def get(cls, persona_id: PersonaId) -> "Persona":
         """Return the persona for the given id."""
-        mapping = {
-            PersonaId.NAPOLEON: cls.napoleon(),
-            PersonaId.GANDHI: cls.gandhi(),
-            PersonaId.ALEXANDER: cls.alexander(),
-            PersonaId.ARBITRATOR: cls.arbitrator(),
-        }
-        return mapping[persona_id]
+        return PERSONA_REGISTRY.get(persona_id)
+
+
+class PersonaRegistry:
+    """Every persona by id, built once; lookups return the shared instances."""
+
+    def __init__(self, personas: list[Persona], default_debaters: list[PersonaId]):
+        self._personas = {p.id: p for p in personas}
+        self._ids = {pid.value: pid for pid in self._personas}
+        self.debater_ids = tuple(pid for pid in self._personas if pid.value != ARBITRATOR_ID)
+        self.default_debaters = tuple(self.panel([pid.value for pid in default_debaters]))
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "PersonaRegistry":
+        personas = [Persona(**entry) for entry in config["personas"]]
+        return cls(personas, [PersonaId(pid) for pid in config["default_debaters"]])
+
+    def get(self, persona_id: PersonaId) -> Persona:
+        return self._personas[persona_id]
+
+    def __iter__(self) -> Iterator[Persona]:
+        return iter(self._personas.values())
+
+    def __len__(self) -> int:
+        return len(self._personas)
+
+    def panel(self, persona_ids: list[str] | None = None) -> list[PersonaId]:
+        """
+        Check a debate's panel of debaters (None: the default panel).
+
+        Raises:
+            ValueError: Unknown or repeated ids, the arbitrator, or fewer than MIN_DEBATERS.
+        """
+        if persona_ids is None:
+            return list(self.default_debaters)
+        unknown = [pid for pid in persona_ids if pid == ARBITRATOR_ID or pid not in self._ids]
+        if unknown:
+            raise ValueError(f"Unknown debaters {unknown}; choose from {[p.value for p in self.debater_ids]}")
+        if len(set(persona_ids)) != len(persona_ids):
+            raise ValueError(f"Debaters repeated in {persona_ids}")
+        if len(persona_ids) < MIN_DEBATERS:
+            raise ValueError(f"A debate needs at least {MIN_DEBATERS} debaters, got {persona_ids}")
+        return [self._ids[pid] for pid in persona_ids]
+
+
+PERSONA_REGISTRY = PersonaRegistry.from_config(_CONFIG)
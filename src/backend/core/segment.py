@@ -0,0 +1,197 @@
+"""
+Append-only message segment files for long debates.
+
+A segment holds the older part of a debate's transcript, moved out of the
+state (see DebateState.spill) so that only a hot window of recent messages
+stays in memory and is copied on each tool call. Two files:
+
+    <path>      the messages as JSON lines, in state-dict form
+    <path>.idx  one little-endian uint64 byte offset per message into <path>
+
+Reads map both files (mmap) and decode only the rows asked for, so random
+access by index costs the same at message 10 or 10 million. Appends write the
+rows first and their offsets second: after a crash the index never points
+past the data, and a torn row at the end is simply not indexed.
+
+A state records how many messages it has moved to its segment; rows past
+that count (written by a later state, e.g. before a crash and a resume from
+an earlier checkpoint) are ignored by reads and cut off by the next append.
+
+States come from clients (tool calls, MCP), so they name a segment only by
+an opaque id: a plain name resolved inside the spill directory
+(SIMULACRA_SPILL_DIR or `configure_spill_dir`). Without a spill directory,
+segments are disabled.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, overload
+import json
+import mmap
+import os
+import re
+import struct
+import uuid
+
+_OFFSET = struct.Struct("<Q")
+# Segment ids: no separators or dots, so an id can only name a file in the spill directory
+SEGMENT_ID_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+
+_spill_dir: Path | None = Path(d) if (d := os.getenv("SIMULACRA_SPILL_DIR", "").strip()) else None
+
+
+def configure_spill_dir(path: str | Path | None) -> None:
+    """Set the directory segments live in (None disables spilling)."""
+    global _spill_dir
+    _spill_dir = Path(path) if path is not None else None
+
+
+def spill_enabled() -> bool:
+    return _spill_dir is not None
+
+
+def new_segment_id() -> str:
+    return uuid.uuid4().hex
+
+
+def segment_path(segment_id: str) -> Path:
+    """
+    The data file of segment `segment_id` in the spill directory.
+
+    Raises:
+        ValueError: Not a plain segment id, or spilling is not enabled.
+    """
+    if not isinstance(segment_id, str) or not re.fullmatch(SEGMENT_ID_PATTERN, segment_id):
+        raise ValueError(f"Invalid segment id {segment_id!r}")
+    if _spill_dir is None:
+        raise ValueError("Spilling is not enabled (set SIMULACRA_SPILL_DIR)")
+    return _spill_dir / f"{segment_id}.jsonl"
+
+
+class MessageSegment:
+    """Messages appended to a file pair, read back by index through memory maps."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+
+    @classmethod
+    def open(cls, segment_id: str) -> "MessageSegment":
+        """The segment with this id in the spill directory (see segment_path)."""
+        return cls(segment_path(segment_id))
+
+    def __len__(self) -> int:
+        try:
+            return self.index_path.stat().st_size // _OFFSET.size
+        except FileNotFoundError:
+            return 0
+
+    def truncate(self, count: int) -> None:
+        """Drop every message from index `count` on (and a torn index entry at the end)."""
+        n = len(self)
+        if n > count:
+            with self._mapped() as (index, _):
+                (end,) = _OFFSET.unpack_from(index, count * _OFFSET.size)
+            os.truncate(self.path, end)
+        size = min(n, count) * _OFFSET.size
+        if self.index_path.exists() and self.index_path.stat().st_size != size:
+            os.truncate(self.index_path, size)
+
+    def append(self, rows: Iterable[dict[str, Any]], at: int | None = None) -> int:
+        """
+        Append messages (state-dict form) and return the segment's new length.
+
+        Args:
+            rows: Messages to add.
+            at: Write them from this index on, dropping any messages after it.
+
+        Raises:
+            OSError: The files cannot be written.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if at is not None:
+            self.truncate(at)
+        offsets = bytearray()
+        with self.path.open("ab") as data:
+            position = data.tell()
+            for row in rows:
+                line = json.dumps(row, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+                offsets += _OFFSET.pack(position)
+                data.write(line)
+                position += len(line)
+            data.flush()
+        with self.index_path.open("ab") as index:
+            index.write(offsets)
+        return len(self)
+
+    @contextmanager
+    def _mapped(self) -> Iterator[tuple[mmap.mmap, mmap.mmap] | None]:
+        """Both files mapped read-only, or None while the segment is empty."""
+        if len(self) == 0:
+            yield None
+            return
+        with self.index_path.open("rb") as index_file, self.path.open("rb") as data_file:
+            with mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ) as index, mmap.mmap(
+                data_file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as data:
+                yield index, data
+
+    @staticmethod
+    def _row(index: mmap.mmap, data: mmap.mmap, i: int) -> dict[str, Any]:
+        (start,) = _OFFSET.unpack_from(index, i * _OFFSET.size)
+        return json.loads(data[start : data.find(b"\n", start)])
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[dict[str, Any]]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.read(index.start, index.stop)
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("segment index out of range")
+        return self.read(index, index + 1)[0]
+
+    def read(self, start: int | None = 0, end: int | None = None) -> list[dict[str, Any]]:
+        """Messages[start:end], with slice semantics."""
+        return list(self.rows(start, end))
+
+    def rows(
+        self, start: int | None = 0, end: int | None = None, reverse: bool = False
+    ) -> Iterator[dict[str, Any]]:
+        """Messages[start:end] (last first if `reverse`) decoded one at a time from a single mapping."""
+        first, stop, _ = slice(start, end).indices(len(self))
+        indexes = range(stop - 1, first - 1, -1) if reverse else range(first, stop)
+        with self._mapped() as maps:
+            if maps is None:
+                return
+            for i in indexes:
+                yield self._row(*maps, i)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self.rows()
+
+    def remove(self) -> None:
+        """Delete both files."""
+        self.path.unlink(missing_ok=True)
+        self.index_path.unlink(missing_ok=True)
+
+
+def state_messages(state: dict[str, Any], start: int = 0) -> Iterator[dict[str, Any]]:
+    """
+    Every message of a state dict from index `start` on, in order: those
+    moved to its segment (read from the file), then those still in `messages`.
+
+    Raises:
+        ValueError: The state names an invalid segment id, or spilling is not enabled.
+    """
+    segment = state.get("segment")
+    spilled = segment["count"] if segment else 0
+    if start < spilled:
+        yield from MessageSegment.open(segment["id"]).rows(start, spilled)
+    yield from (state.get("messages") or [])[max(start - spilled, 0):]
@@ -3,12 +3,21 @@ FastMCP server: exposes debate tools via MCP for use by ADK or other clients.
 """
 
 from typing import Any
+import os
+import time
+import uuid
 
 from fastmcp import FastMCP
 
+from backend.profiling import profiled
+from backend import tools
 from backend.tools.debate_tools import (
     create_initial_state,
     get_debate_state,
+    validate_state,
+    spill_transcript,
+    read_messages,
+    list_personas,
     build_opening_prompt,
     record_opening,
     build_defence_prompt,
@@ -17,30 +26,65 @@ from backend.tools.debate_tools import (
     record_exchange_message,
     build_reflection_prompt,
     record_reflection,
-    build_summary_prompt,
-    record_summary,
+    build_prompt_parts,
+    build_verdict_prompt,
+    parse_verdict,
+    build_arbitration_prompt,
+    record_arbitration,
     advance_phase,
     advance_exchange_round,
+    record_token_usage,
+    mark_budget_exhausted,
+    record_route,
+    record_timings,
 )
 
+# Where profile_tool_call writes profiles (empty = profiling off)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "").strip()
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5") or 5)
+# Upper bound on profile_tool_call's repeat, so one call cannot pin the server
+MAX_PROFILE_REPEAT = 1000
+
 mcp = FastMCP(
     name="simulacra-debate",
-    description="Tools for running a multi-agent debate (Napoleon, Gandhi, Alexander, Summariser).",
+    description="Tools for running a multi-agent debate (debaters from the persona registry and an Arbitrator).",
 )
 
 
 @mcp.tool()
-def create_initial_state_tool(max_exchange_rounds: int = 4) -> dict[str, Any]:
+def create_initial_state_tool(
+    max_exchange_rounds: int = 4,
+    token_budget: int | None = None,
+    debaters: list[str] | None = None,
+    spill: bool = False,
+) -> dict[str, Any]:
     """
     Create a fresh debate state for a new session.
 
     Args:
         max_exchange_rounds: Number of exchange rounds (default 4).
+        token_budget: Optional ceiling on total tokens for the whole debate.
+        debaters: Debater ids in speaking order (default: the default panel).
+        spill: Give a long debate a segment in the server's spill directory
+            (see spill_transcript_tool and read_messages_tool).
+
+    Returns:
+        State dict with phase OPENING, the panel, empty messages and openings.
+    """
+    return create_initial_state(
+        max_exchange_rounds=max_exchange_rounds, token_budget=token_budget, debaters=debaters, spill=spill
+    )
+
+
+@mcp.tool()
+def list_personas_tool() -> dict[str, Any]:
+    """
+    List every persona and the default panel of debaters.
 
     Returns:
-        State dict with phase OPENING, empty messages and openings.
+        Dict with default_debaters, debaters and personas.
     """
-    return create_initial_state(max_exchange_rounds=max_exchange_rounds)
+    return list_personas()
 
 
 @mcp.tool()
@@ -54,7 +98,38 @@ def get_debate_state_tool(state_dict: dict[str, Any]) -> dict[str, Any]:
     Returns:
         The same state dict.
     """
-    return get_debate_state(state_dict)
+    return get_debate_state(validate_state(state_dict))
+
+
+@mcp.tool()
+def spill_transcript_tool(state_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Move older messages of a debate with a segment out of the state (call after recording a turn).
+
+    Args:
+        state_dict: Current state.
+
+    Returns:
+        Updated state dict, holding only the most recent messages.
+    """
+    return spill_transcript(validate_state(state_dict))
+
+
+@mcp.tool()
+def read_messages_tool(state_dict: dict[str, Any], start: int = 0, end: int | None = None) -> list[dict[str, Any]]:
+    """
+    Read messages of the whole transcript by index, including those a long
+    debate moved to its segment file.
+
+    Args:
+        state_dict: Current state from previous tool calls.
+        start: First message index.
+        end: Index after the last message (None: to the end).
+
+    Returns:
+        Messages[start:end].
+    """
+    return read_messages(validate_state(state_dict), start, end)
 
 
 @mcp.tool()
@@ -63,7 +138,7 @@ def build_opening_prompt_tool(persona_id: str) -> str:
     Build the prompt for a debater to give their brief opening statement.
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas_tool).
 
     Returns:
         Instruction text for the LLM to generate an opening (2-4 sentences).
@@ -79,14 +154,14 @@ def record_opening_tool(
     Record one debater's opening statement and add it to the transcript.
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas_tool).
         opening_text: The opening statement to store.
         state_dict: Current debate state.
 
     Returns:
         Updated state dict.
     """
-    return record_opening(persona_id, opening_text, state_dict)
+    return record_opening(persona_id, opening_text, validate_state(state_dict))
 
 
 @mcp.tool()
@@ -95,13 +170,13 @@ def build_defence_prompt_tool(persona_id: str, state_dict: dict[str, Any]) -> st
     Build the prompt asking this debater to defend their position after seeing all openings.
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas_tool).
         state_dict: Current state (must contain openings from all three).
 
     Returns:
         Instruction text for the LLM to defend vigorously.
     """
-    return build_defence_prompt(persona_id, state_dict)
+    return build_defence_prompt(persona_id, validate_state(state_dict))
 
 
 @mcp.tool()
@@ -112,14 +187,14 @@ def record_defence_tool(
     Record a defence and add it to the transcript.
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas_tool).
         defence_text: The defence statement.
         state_dict: Current debate state.
 
     Returns:
         Updated state dict.
     """
-    return record_defence(persona_id, defence_text, state_dict)
+    return record_defence(persona_id, defence_text, validate_state(state_dict))
 
 
 @mcp.tool()
@@ -130,14 +205,14 @@ def build_exchange_prompt_tool(
     Build the prompt for one debater in an exchange round.
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas_tool).
         state_dict: Current state (transcript so far).
         round_index: Current exchange round (1-based).
 
     Returns:
         Instruction for the LLM to respond to the discussion.
     """
-    return build_exchange_prompt(persona_id, state_dict, round_index)
+    return build_exchange_prompt(persona_id, validate_state(state_dict), round_index)
 
 
 @mcp.tool()
@@ -148,7 +223,7 @@ def record_exchange_message_tool(
     Record one message in an exchange round.
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas_tool).
         content: The message text.
         state_dict: Current state.
         round_index: Current exchange round.
@@ -156,7 +231,7 @@ def record_exchange_message_tool(
     Returns:
         Updated state dict.
     """
-    return record_exchange_message(persona_id, content, state_dict, round_index)
+    return record_exchange_message(persona_id, content, validate_state(state_dict), round_index)
 
 
 @mcp.tool()
@@ -165,13 +240,62 @@ def build_reflection_prompt_tool(persona_id: str, state_dict: dict[str, Any]) ->
     Build the prompt asking whether the debater would change their position.
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas_tool).
         state_dict: Current state (full transcript).
 
     Returns:
         Instruction for the LLM to reflect and state if/how they would change.
     """
-    return build_reflection_prompt(persona_id, state_dict)
+    return build_reflection_prompt(persona_id, validate_state(state_dict))
+
+
+@mcp.tool()
+def build_prompt_parts_tool(
+    phase: str, persona_id: str, state_dict: dict[str, Any], round_index: int = 0
+) -> dict[str, str]:
+    """
+    Build a turn's prompt split into its shared prefix (cacheable across the
+    phase's turns) and per-turn suffix.
+
+    Args:
+        phase: "opening", "defence", "exchange", "reflection" or "arbitration".
+        persona_id: The speaker (ignored for arbitration).
+        state_dict: Current state.
+        round_index: Exchange round (1-based) for the exchange phase.
+
+    Returns:
+        {"prefix": ..., "suffix": ...}.
+    """
+    return build_prompt_parts(phase, persona_id, validate_state(state_dict), round_index)
+
+
+@mcp.tool()
+def build_verdict_prompt_tool(state_dict: dict[str, Any]) -> str:
+    """
+    Build the prompt asking a judge which debater of a finished debate argued best.
+
+    Args:
+        state_dict: A finished debate's state.
+
+    Returns:
+        Instruction to answer with the winner's name only.
+    """
+    return build_verdict_prompt(validate_state(state_dict))
+
+
+@mcp.tool()
+def parse_verdict_tool(verdict_text: str, state_dict: dict[str, Any]) -> str | None:
+    """
+    Find the winner named in a judge's reply.
+
+    Args:
+        verdict_text: The reply to build_verdict_prompt_tool.
+        state_dict: The judged debate's state.
+
+    Returns:
+        The winning debater's id, or None for a draw or an unclear reply.
+    """
+    return parse_verdict(verdict_text, validate_state(state_dict))
 
 
 @mcp.tool()
@@ -182,43 +306,43 @@ def record_reflection_tool(
     Record a debater's reflection (change of position or not).
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas_tool).
         reflection_text: Their reflection response.
         state_dict: Current state.
 
     Returns:
         Updated state dict.
     """
-    return record_reflection(persona_id, reflection_text, state_dict)
+    return record_reflection(persona_id, reflection_text, validate_state(state_dict))
 
 
 @mcp.tool()
-def build_summary_prompt_tool(state_dict: dict[str, Any]) -> str:
+def build_arbitration_prompt_tool(state_dict: dict[str, Any]) -> str:
     """
-    Build the prompt for the Summariser to summarise standings.
+    Build the prompt for the Arbitrator to bring all viewpoints to a consensus.
 
     Args:
-        state_dict: Current state (openings, defences, exchange, reflections).
+        state_dict: Current state (all debate phases completed).
 
     Returns:
-        Instruction for the Summariser LLM.
+        Instruction for the Arbitrator LLM.
     """
-    return build_summary_prompt(state_dict)
+    return build_arbitration_prompt(validate_state(state_dict))
 
 
 @mcp.tool()
-def record_summary_tool(summary_text: str, state_dict: dict[str, Any]) -> dict[str, Any]:
+def record_arbitration_tool(arbitration_text: str, state_dict: dict[str, Any]) -> dict[str, Any]:
     """
-    Record the Summariser's summary and mark debate done.
+    Record the Arbitrator's consensus and mark debate done.
 
     Args:
-        summary_text: The summary content.
+        arbitration_text: The arbitration content.
         state_dict: Current state.
 
     Returns:
         Updated state dict with phase DONE.
     """
-    return record_summary(summary_text, state_dict)
+    return record_arbitration(arbitration_text, validate_state(state_dict))
 
 
 @mcp.tool()
@@ -228,12 +352,12 @@ def advance_phase_tool(state_dict: dict[str, Any], new_phase: str) -> dict[str,
 
     Args:
         state_dict: Current state.
-        new_phase: One of 'defence', 'exchange', 'reflection', 'summary', 'done'.
+        new_phase: One of 'defence', 'exchange', 'reflection', 'arbitration', 'done'.
 
     Returns:
         Updated state dict.
     """
-    return advance_phase(state_dict, new_phase)
+    return advance_phase(validate_state(state_dict), new_phase)
 
 
 @mcp.tool()
@@ -247,4 +371,121 @@ def advance_exchange_round_tool(state_dict: dict[str, Any]) -> dict[str, Any]:
     Returns:
         Updated state with exchange_rounds incremented.
     """
-    return advance_exchange_round(state_dict)
+    return advance_exchange_round(validate_state(state_dict))
+
+
+@mcp.tool()
+def record_token_usage_tool(
+    phase: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    total_tokens: int,
+    state_dict: dict[str, Any],
+) -> dict[str, Any]:
+    """
+    Add one LLM turn's token usage to the per-phase and per-debate totals.
+
+    Args:
+        phase: Phase the turn belongs to.
+        prompt_tokens: Tokens in the prompt.
+        completion_tokens: Tokens in the generated reply.
+        total_tokens: Total tokens billed for the turn.
+        state_dict: Current state.
+
+    Returns:
+        Updated state dict.
+    """
+    return record_token_usage(phase, prompt_tokens, completion_tokens, total_tokens, validate_state(state_dict))
+
+
+@mcp.tool()
+def mark_budget_exhausted_tool(state_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Flag that the token budget cut the debate short.
+
+    Args:
+        state_dict: Current state.
+
+    Returns:
+        Updated state dict with budget_exhausted set.
+    """
+    return mark_budget_exhausted(validate_state(state_dict))
+
+
+@mcp.tool()
+def record_route_tool(
+    phase: str,
+    persona_id: str,
+    round_index: int,
+    model: str,
+    fallback: bool,
+    state_dict: dict[str, Any],
+) -> dict[str, Any]:
+    """
+    Record which model served one LLM turn.
+
+    Args:
+        phase: Phase the turn belongs to.
+        persona_id: Who spoke.
+        round_index: Exchange round (0 outside the exchange phase).
+        model: Model that produced the reply.
+        fallback: True if the fallback model answered after quota exhaustion.
+        state_dict: Current state.
+
+    Returns:
+        Updated state dict.
+    """
+    return record_route(phase, persona_id, round_index, model, fallback, validate_state(state_dict))
+
+
+@mcp.tool()
+def record_timings_tool(
+    timings: dict[str, dict[str, float]], state_dict: dict[str, Any]
+) -> dict[str, Any]:
+    """
+    Store the debate's time breakdown per phase.
+
+    Args:
+        timings: Phase -> {model_wait_ms, backoff_ms, pacing_ms, prompt_ms, state_ms}.
+        state_dict: Current state.
+
+    Returns:
+        Updated state dict.
+    """
+    return record_timings(timings, validate_state(state_dict))
+
+
+@mcp.tool()
+def profile_tool_call(tool_name: str, arguments: dict[str, Any], repeat: int = 1) -> dict[str, Any]:
+    """
+    Run one debate tool under the sampling profiler and write the profile to PROFILE_DIR.
+
+    Args:
+        tool_name: A debate tool function, e.g. 'record_exchange_message'.
+        arguments: Its keyword arguments.
+        repeat: Calls to make, so that fast tools collect enough samples
+            (1 to MAX_PROFILE_REPEAT).
+
+    Returns:
+        The last call's result, the profile's file name and the mean time per call.
+    """
+    if not PROFILE_DIR:
+        raise ValueError("Profiling is not enabled (set PROFILE_DIR)")
+    if tool_name not in tools.__all__:
+        raise ValueError(f"Unknown tool {tool_name!r}")
+    tool = getattr(tools, tool_name)
+    repeat = min(max(1, repeat), MAX_PROFILE_REPEAT)
+    if "state_dict" in arguments:
+        # Checked once, outside the profile: the tools themselves trust their state
+        arguments = {**arguments, "state_dict": validate_state(arguments["state_dict"])}
+    with profiled(PROFILE_DIR, f"{tool_name}-{uuid.uuid4().hex}", PROFILE_INTERVAL_MS / 1000) as profiler:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = tool(**arguments)
+        elapsed = time.perf_counter() - started
+    return {
+        "result": result,
+        "profile": profiler.path.name,
+        "samples": sum(profiler.samples.values()),
+        "mean_ms": round(elapsed * 1000 / repeat, 3),
+    }
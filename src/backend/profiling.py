@@ -0,0 +1,164 @@
+"""
+Opt-in sampling profiler for a single request (stdlib only).
+
+A background thread wakes every `interval` seconds and records the stack of
+the thread being profiled. For an asyncio task, the sample is the task's
+own stack: the frames actually running when the task has the event loop,
+or, while it is suspended, the chain of coroutines it is awaiting through
+(ending in an "<await ...>" leaf). So the profile shows where the debate
+spends wall-clock time, model waits included, and other requests sharing
+the loop do not show up in it.
+
+Profiles are written in the collapsed-stack ("folded") format read by
+flamegraph.pl, speedscope and most flame graph viewers. Nothing runs unless
+a profiler is started.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from types import FrameType
+from typing import Any, Iterator
+import asyncio
+import re
+import sys
+import threading
+import time
+
+DEFAULT_INTERVAL = 0.005  # seconds between samples
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def _label(frame: FrameType) -> str:
+    code = frame.f_code
+    path = Path(code.co_filename)
+    # "a;b" separates frames in the folded format
+    return f"{code.co_name} ({path.parent.name}/{path.name}:{frame.f_lineno})".replace(";", ",")
+
+
+def _thread_stack(frame: FrameType | None, root_code: Any = None) -> list[str]:
+    """Labels of `frame` and its callers, outermost first, from `root_code` down if it is on the stack."""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    for i, f in enumerate(frames):
+        if f.f_code is root_code:
+            frames = frames[i:]
+            break
+    return [_label(f) for f in frames]
+
+
+def _await_stack(task: asyncio.Task) -> list[str]:
+    """Labels of the coroutines a suspended task is awaiting through, outermost first."""
+    labels = []
+    awaitable: Any = task.get_coro()
+    while awaitable is not None:
+        frame = (
+            getattr(awaitable, "cr_frame", None)
+            or getattr(awaitable, "ag_frame", None)
+            or getattr(awaitable, "gi_frame", None)
+        )
+        if frame is None:
+            labels.append(f"<await {type(awaitable).__name__}>")
+            break
+        labels.append(_label(frame))
+        awaitable = (
+            getattr(awaitable, "cr_await", None)
+            or getattr(awaitable, "ag_await", None)
+            or getattr(awaitable, "gi_yieldfrom", None)
+        )
+    return labels
+
+
+class SamplingProfiler:
+    """Samples the stack of the starting thread, or of one asyncio task, until stopped."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.duration = 0.0
+        self.path: Path | None = None  # set by `profiled` once written
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self._thread_id = 0
+        self._task: asyncio.Task | None = None
+        self._started = 0.0
+
+    def start(self, task: asyncio.Task | None = None) -> None:
+        """
+        Start sampling from a background thread.
+
+        Args:
+            task: Profile this task (call from its event loop's thread);
+                None profiles the calling thread.
+        """
+        self._thread_id = threading.get_ident()
+        self._task = task
+        self._started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop sampling (samples taken so far are kept)."""
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+        self.duration = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            stack = self._sample()
+            if stack:
+                self.samples[tuple(stack)] += 1
+
+    def _sample(self) -> list[str]:
+        task = self._task
+        if task is None:
+            return _thread_stack(sys._current_frames().get(self._thread_id))
+        if task.done():
+            return []
+        if asyncio.current_task(task.get_loop()) is not task:
+            return _await_stack(task)
+        root = getattr(task.get_coro(), "cr_code", None)
+        return _thread_stack(sys._current_frames().get(self._thread_id), root)
+
+    def folded(self) -> str:
+        """The samples as collapsed stacks: "outer;...;inner count" per line, most frequent first."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+    def write(self, directory: str | Path, name: str) -> Path:
+        """Write the folded profile to `directory`/`name`.folded and return its path."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{_UNSAFE_NAME.sub('_', name)}.folded"
+        path.write_text(self.folded())
+        return path
+
+
+@contextmanager
+def profiled(
+    directory: str | Path,
+    name: str,
+    interval: float = DEFAULT_INTERVAL,
+    task: asyncio.Task | None = None,
+) -> Iterator[SamplingProfiler]:
+    """
+    Profile the body of the `with` block and write the profile when it exits,
+    also when it raises.
+
+    Args:
+        directory: Where profiles are written.
+        name: File name stem (e.g. the debate id).
+        interval: Seconds between samples.
+        task: Profile this asyncio task instead of the calling thread.
+    """
+    profiler = SamplingProfiler(interval)
+    profiler.start(task)
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        profiler.path = profiler.write(directory, name)
@@ -0,0 +1,308 @@
+"""
+Discrete-event simulator for capacity planning.
+
+Runs the real DebateCoordinator schedule (turn and phase sleeps, retries,
+limiter, hedging) on an event loop with a virtual clock: whenever every task
+is waiting on a timer, the clock jumps to the next timer instead of sleeping.
+Model calls go to a simulated provider with RPM/TPM limits and a latency
+distribution, so a day of debates takes seconds of wall time.
+
+    simulacra-simulate --users 1,4,8 --rounds 4 --rpm 15 --latency 2.5 --latency-p95 6
+    PYTHONPATH=src python3 -m backend.simulate --users 4 --json
+
+Reports the predicted debate duration and throughput for each number of
+concurrent users.
+"""
+
+from collections import deque
+from typing import Any, Callable
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import selectors
+import sys
+import time
+
+from backend.agent import coordinator as coordinator_module
+from backend.agent.coordinator import DEFAULT_MODEL, DebateCoordinator, _percentile
+from backend.agent.limiter import AdaptiveLimiter, QuotaBucket
+from backend.agent.store import MemoryStore
+
+CHARS_PER_TOKEN = 4  # rough prompt size estimate for TPM accounting
+QUOTA_WINDOW = 60.0  # seconds; provider quotas are per minute
+
+
+class _VirtualSelector(selectors.BaseSelector):
+    """Polls the real selector without blocking and advances the loop's clock instead of waiting."""
+
+    def __init__(self, loop: "VirtualClockLoop"):
+        self._loop = loop
+        self._inner = selectors.DefaultSelector()
+
+    def register(self, fileobj, events, data=None):
+        return self._inner.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self._inner.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        return self._inner.modify(fileobj, events, data)
+
+    def select(self, timeout=None):
+        if timeout is None:
+            return self._inner.select(None)  # nothing scheduled: wait for real I/O
+        events = self._inner.select(0)
+        if not events and timeout > 0:
+            self._loop.advance(timeout)
+        return events
+
+    def close(self):
+        self._inner.close()
+
+    def get_map(self):
+        return self._inner.get_map()
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """Event loop whose time() only moves when every task waits on a timer."""
+
+    def __init__(self, start: float = 0.0):
+        self._virtual_now = start
+        super().__init__(selector=_VirtualSelector(self))
+
+    def time(self) -> float:
+        return self._virtual_now
+
+    def advance(self, seconds: float) -> None:
+        self._virtual_now += seconds
+
+
+class LatencyModel:
+    """Log-normal call latency from a median and a 95th percentile (seconds)."""
+
+    def __init__(self, median: float, p95: float | None = None, rng: random.Random | None = None):
+        self.median = median
+        self.p95 = p95 if p95 is not None else median
+        self._rng = rng or random.Random()
+        # p95 = median * exp(1.645 * sigma)
+        self._sigma = math.log(self.p95 / median) / 1.645 if self.p95 > median else 0.0
+
+    def sample(self) -> float:
+        if self._sigma == 0:
+            return self.median
+        return self.median * math.exp(self._rng.gauss(0.0, self._sigma))
+
+
+class SimulatedProvider:
+    """
+    A model API with per-minute request and token quotas. Calls over quota fail
+    with a Gemini-style 429 carrying a "retry in Ns" hint.
+    """
+
+    def __init__(
+        self,
+        rpm: float,
+        tpm: float | None,
+        latency: LatencyModel,
+        completion_tokens: int = 250,
+        clock: Callable[[], float] | None = None,
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.latency = latency
+        self.completion_tokens = completion_tokens
+        self._clock = clock
+        self._window: deque[tuple[float, int]] = deque()  # (started_at, tokens) in the last minute
+        self.stats = {"calls": 0, "rate_limited": 0, "tokens": 0}
+
+    def _now(self) -> float:
+        return self._clock() if self._clock is not None else asyncio.get_running_loop().time()
+
+    def _over_quota(self, now: float, tokens: int) -> float | None:
+        """Seconds until the call would fit the quota, or None if it fits now."""
+        while self._window and self._window[0][0] <= now - QUOTA_WINDOW:
+            self._window.popleft()
+        if len(self._window) >= self.rpm:
+            return self._window[0][0] + QUOTA_WINDOW - now
+        if self.tpm is not None and sum(t for _, t in self._window) + tokens > self.tpm:
+            return self._window[0][0] + QUOTA_WINDOW - now if self._window else QUOTA_WINDOW
+        return None
+
+    async def __call__(
+        self, model: str, prompt: str, on_delta: Callable[[str], None] | None = None
+    ) -> tuple[str, dict[str, int]]:
+        now = self._now()
+        prompt_tokens = max(1, len(prompt) // CHARS_PER_TOKEN)
+        total = prompt_tokens + self.completion_tokens
+        wait = self._over_quota(now, total)
+        self.stats["calls"] += 1
+        if wait is not None:
+            self.stats["rate_limited"] += 1
+            await asyncio.sleep(0.2)  # the provider still takes a round trip to refuse
+            raise RuntimeError(
+                f"429 RESOURCE_EXHAUSTED. Quota exceeded for {model}. Please retry in {max(wait, 0.1):.1f}s."
+            )
+        self._window.append((now, total))
+        self.stats["tokens"] += total
+        await asyncio.sleep(self.latency.sample())
+        text = "word " * self.completion_tokens
+        if on_delta is not None:
+            on_delta(text)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": total,
+        }
+        return text, usage
+
+
+async def _simulate(
+    users: int,
+    rounds: int,
+    provider: SimulatedProvider,
+    pace_rpm: float | None,
+    coordinator_kwargs: dict[str, Any],
+) -> dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    bucket = None
+    if pace_rpm:
+        bucket = QuotaBucket(MemoryStore(clock=loop.time), "quota:sim", pace_rpm, clock=loop.time)
+    limiter = AdaptiveLimiter(clock=loop.time, bucket=bucket)
+    durations: list[float] = []
+    failures: list[str] = []
+
+    async def one_debate() -> None:
+        started = loop.time()
+        coordinator = DebateCoordinator(
+            max_exchange_rounds=rounds, transport=provider, limiter=limiter, **coordinator_kwargs
+        )
+        try:
+            await coordinator.run_debate()
+        except Exception as e:
+            failures.append(str(e)[:200])
+            return
+        durations.append(loop.time() - started)
+
+    started = loop.time()
+    await asyncio.gather(*(one_debate() for _ in range(users)))
+    makespan = loop.time() - started
+    return {
+        "users": users,
+        "completed": len(durations),
+        "failed": len(failures),
+        "duration_s": {
+            "mean": round(sum(durations) / len(durations), 1) if durations else None,
+            "p50": round(_percentile(durations, 0.5), 1) if durations else None,
+            "p95": round(_percentile(durations, 0.95), 1) if durations else None,
+            "max": round(max(durations), 1) if durations else None,
+        },
+        "makespan_s": round(makespan, 1),
+        "debates_per_hour": round(len(durations) * 3600 / makespan, 2) if makespan else None,
+        "calls": provider.stats["calls"],
+        "rate_limited": provider.stats["rate_limited"],
+        "circuit_opens": limiter.stats["circuit_opens"],
+        "tokens": provider.stats["tokens"],
+        "errors": sorted(set(failures))[:3],
+    }
+
+
+def simulate(
+    users: int,
+    rounds: int = 4,
+    rpm: float = 15,
+    tpm: float | None = 1_000_000,
+    latency: float = 2.5,
+    latency_p95: float | None = None,
+    completion_tokens: int = 250,
+    pace_rpm: float | None = None,
+    seed: int = 0,
+    **coordinator_kwargs: Any,
+) -> dict[str, Any]:
+    """
+    Simulate `users` concurrent debates and return predicted durations and throughput.
+
+    Args:
+        users: Debates started at the same time.
+        rounds: max_exchange_rounds of each debate.
+        rpm: Provider requests-per-minute quota.
+        tpm: Provider tokens-per-minute quota (None = unlimited).
+        latency: Median seconds per model call.
+        latency_p95: 95th percentile seconds per call (default: no variance).
+        completion_tokens: Tokens per response.
+        pace_rpm: Client-side pacing through a QuotaBucket (as with LLM_QUOTA_RPM).
+        seed: Seed for the latency samples.
+        **coordinator_kwargs: Passed to DebateCoordinator (e.g. hedge_percentile).
+
+    Returns:
+        Report dict; durations are in simulated seconds, `wall_s` is real time taken.
+    """
+    loop = VirtualClockLoop()
+    provider = SimulatedProvider(
+        rpm, tpm, LatencyModel(latency, latency_p95, random.Random(seed)), completion_tokens
+    )
+    wall_started = time.perf_counter()
+    try:
+        report = loop.run_until_complete(
+            _simulate(users, rounds, provider, pace_rpm, coordinator_kwargs)
+        )
+    finally:
+        loop.close()
+    report["wall_s"] = round(time.perf_counter() - wall_started, 2)
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Predict debate latency and throughput under a quota.")
+    parser.add_argument("--users", default="1", help="Concurrent debates; comma-separated to sweep")
+    parser.add_argument("--rounds", type=int, default=4, help="max_exchange_rounds per debate")
+    parser.add_argument("--rpm", type=float, default=15, help="Provider requests per minute")
+    parser.add_argument("--tpm", type=float, default=1_000_000, help="Provider tokens per minute (0 = unlimited)")
+    parser.add_argument("--latency", type=float, default=2.5, help="Median seconds per model call")
+    parser.add_argument("--latency-p95", type=float, default=None, help="95th percentile seconds per call")
+    parser.add_argument("--completion-tokens", type=int, default=250)
+    parser.add_argument("--pace-rpm", type=float, default=None, help="Client-side pacing (LLM_QUOTA_RPM)")
+    parser.add_argument("--turn-delay", type=float, default=None, help="Override TURN_DELAY seconds")
+    parser.add_argument("--phase-delay", type=float, default=None, help="Override PHASE_DELAY seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print one JSON report per line")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show coordinator logs")
+    args = parser.parse_args(argv)
+    # Hundreds of simulated 429 retries would otherwise drown the report
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL)
+
+    if args.turn_delay is not None:
+        coordinator_module.TURN_DELAY = args.turn_delay
+    if args.phase_delay is not None:
+        coordinator_module.PHASE_DELAY = args.phase_delay
+
+    for users in (int(u) for u in args.users.split(",") if u.strip()):
+        report = simulate(
+            users,
+            rounds=args.rounds,
+            rpm=args.rpm,
+            tpm=args.tpm or None,
+            latency=args.latency,
+            latency_p95=args.latency_p95,
+            completion_tokens=args.completion_tokens,
+            pace_rpm=args.pace_rpm,
+            seed=args.seed,
+            model=DEFAULT_MODEL,
+        )
+        if args.json:
+            print(json.dumps(report))
+            continue
+        d = report["duration_s"]
+        print(
+            f"users={users:<3} debate p50={d['p50']}s p95={d['p95']}s max={d['max']}s | "
+            f"{report['debates_per_hour']} debates/h | {report['calls']} calls, "
+            f"{report['rate_limited']} x 429, {report['failed']} failed | sim {report['makespan_s']}s "
+            f"in {report['wall_s']}s wall"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
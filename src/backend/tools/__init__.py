@@ -14,10 +14,23 @@ from .debate_tools import (
     record_reflection,
     build_arbitration_prompt,
     record_arbitration,
+    build_prompt_parts,
+    build_verdict_prompt,
+    parse_verdict,
     get_debate_state,
+    validate_state,
     create_initial_state,
+    spill_transcript,
+    read_messages,
+    iter_messages,
     advance_phase,
     advance_exchange_round,
+    record_token_usage,
+    mark_budget_exhausted,
+    record_route,
+    record_timings,
+    list_personas,
+    check_panel,
 )
 
 __all__ = [
@@ -31,8 +44,21 @@ __all__ = [
     "record_reflection",
     "build_arbitration_prompt",
     "record_arbitration",
+    "build_prompt_parts",
+    "build_verdict_prompt",
+    "parse_verdict",
     "get_debate_state",
+    "validate_state",
     "create_initial_state",
+    "spill_transcript",
+    "read_messages",
+    "iter_messages",
     "advance_phase",
     "advance_exchange_round",
+    "record_token_usage",
+    "mark_budget_exhausted",
+    "record_route",
+    "record_timings",
+    "list_personas",
+    "check_panel",
 ]
@@ -1,36 +1,113 @@
 """
 Debate tool implementations. Build prompts and update state.
 Used by FastMCP server and by ADK agent; agent does not import core directly.
+
+Prompts that carry the transcript are laid out as a shared prefix and a
+per-turn suffix (see build_prompt_parts). The prefix is the transcript up to
+the start of the current phase or exchange round: the same bytes for every
+debater's turn in it, and the start of the next phase's prefix, so provider
+prefix caches and explicit cache handles can reuse it. The suffix holds the
+messages since, the persona header and the instruction.
 """
 
-from typing import Any
+from typing import Any, Iterator
+
+from pydantic import TypeAdapter
+
+from backend.core import PERSONA_REGISTRY, Persona, PersonaId, DebateState, DebateMessage, RoundPhase, TokenUsage, ModelRoute, PhaseTimings, SegmentRef, new_segment_id, spill_enabled, state_messages
 
-from backend.core import Persona, PersonaId, DebateState, RoundPhase
+
+# Client state dicts (validate_state) are validated a list at a time
+_MESSAGES = TypeAdapter(list[DebateMessage])
+_ROUTES = TypeAdapter(list[ModelRoute])
+
+# Starts every shared prefix; the transcript lines follow
+CONTEXT_HEADER = "Debate transcript:\n"
+# The context window's first message moves in steps of this many messages
+CONTEXT_BLOCK = 20
+# A debate with a segment keeps this many recent messages in its state: more
+# than any prompt's context reaches back (see _context), so prompts never read the file
+HOT_MESSAGES = 128
+# Older messages are moved once this many have piled up, so the segment grows in batches
+SPILL_BATCH = 64
 
 
 def _state_from_dict(data: dict[str, Any]) -> DebateState:
-    """Deserialize state dict to DebateState."""
-    from backend.core.debate import DebateMessage
-
-    messages = []
-    for m in data.get("messages", []):
-        messages.append(
-            DebateMessage(
-                author_id=PersonaId(m["author_id"]),
-                author_name=m["author_name"],
-                content=m["content"],
-                round_index=m.get("round_index", 0),
-                phase=RoundPhase(m["phase"]),
+    """
+    Deserialize a state dict this package produced (_state_to_dict, a
+    checkpoint, the registry's live state) to DebateState without validating
+    it again: a record turn would otherwise re-check the whole transcript.
+    Client input goes through validate_state first. The segment is still
+    checked, since its id names a file.
+
+    Raises:
+        ValueError: A malformed segment (pydantic ValidationError).
+        KeyError: Unknown persona id or phase in a message or route.
+    """
+    message = DebateMessage.model_construct
+    return DebateState.model_construct(
+        phase=RoundPhase(data.get("phase", RoundPhase.OPENING.value)),
+        debaters=PERSONA_REGISTRY.panel(data.get("debaters")),
+        messages=[message(**m) for m in data.get("messages", [])],
+        openings=dict(data.get("openings", {})),
+        exchange_rounds=data.get("exchange_rounds", 0),
+        max_exchange_rounds=data.get("max_exchange_rounds", 4),
+        reflections=dict(data.get("reflections", {})),
+        arbitration=data.get("arbitration", ""),
+        token_usage={
+            phase: TokenUsage.model_construct(**usage)
+            for phase, usage in data.get("token_usage", {}).items()
+        },
+        token_budget=data.get("token_budget"),
+        budget_exhausted=data.get("budget_exhausted", False),
+        routes=[
+            ModelRoute.model_construct(
+                phase=RoundPhase(r["phase"]),
+                persona_id=PersonaId(r["persona_id"]),
+                round_index=r.get("round_index", 0),
+                model=r["model"],
+                fallback=r.get("fallback", False),
             )
-        )
+            for r in data.get("routes", [])
+        ],
+        timings={
+            phase: PhaseTimings.model_construct(**timings)
+            for phase, timings in data.get("timings", {}).items()
+        },
+        segment=SegmentRef(**data["segment"]) if data.get("segment") else None,
+    )
+
+
+def _validated_state(data: dict[str, Any]) -> DebateState:
+    """
+    Deserialize a client's state dict to DebateState, validating everything
+    (messages and routes as whole lists).
+
+    Raises:
+        ValueError: A malformed state (pydantic ValidationError).
+    """
+    messages = _MESSAGES.validate_python(data.get("messages", []))
     return DebateState(
         phase=RoundPhase(data.get("phase", RoundPhase.OPENING.value)),
+        debaters=PERSONA_REGISTRY.panel(data.get("debaters")),
         messages=messages,
         openings=dict(data.get("openings", {})),
         exchange_rounds=data.get("exchange_rounds", 0),
         max_exchange_rounds=data.get("max_exchange_rounds", 4),
         reflections=dict(data.get("reflections", {})),
         arbitration=data.get("arbitration", ""),
+        token_usage={
+            phase: TokenUsage(**usage)
+            for phase, usage in data.get("token_usage", {}).items()
+        },
+        token_budget=data.get("token_budget"),
+        budget_exhausted=data.get("budget_exhausted", False),
+        routes=_ROUTES.validate_python(data.get("routes", [])),
+        timings={
+            phase: PhaseTimings(**timings)
+            for phase, timings in data.get("timings", {}).items()
+        },
+        segment=SegmentRef(**data["segment"]) if data.get("segment") else None,
     )
 
 
@@ -38,38 +115,119 @@ def _state_to_dict(state: DebateState) -> dict[str, Any]:
     """Serialize DebateState to JSON-suitable dict."""
     return {
         "phase": state.phase.value,
-        "messages": [
-            {
-                "author_id": m.author_id.value,
-                "author_name": m.author_name,
-                "content": m.content,
-                "round_index": m.round_index,
-                "phase": m.phase.value,
-            }
-            for m in state.messages
-        ],
+        "debaters": [pid.value for pid in state.debaters],
+        "messages": [m.to_dict() for m in state.messages],
         "openings": dict(state.openings),
         "exchange_rounds": state.exchange_rounds,
         "max_exchange_rounds": state.max_exchange_rounds,
         "reflections": dict(state.reflections),
         "arbitration": state.arbitration,
+        "token_usage": {
+            phase: usage.model_dump() for phase, usage in state.token_usage.items()
+        },
+        "token_total": state.total_token_usage().model_dump(),
+        "token_budget": state.token_budget,
+        "budget_exhausted": state.budget_exhausted,
+        "routes": [
+            {
+                "phase": r.phase.value,
+                "persona_id": r.persona_id.value,
+                "round_index": r.round_index,
+                "model": r.model,
+                "fallback": r.fallback,
+            }
+            for r in state.routes
+        ],
+        "timings": {
+            phase: timings.model_dump() for phase, timings in state.timings.items()
+        },
+        "segment": state.segment.model_dump() if state.segment is not None else None,
     }
 
 
-def create_initial_state(max_exchange_rounds: int = 4) -> dict[str, Any]:
+def create_initial_state(
+    max_exchange_rounds: int = 4,
+    token_budget: int | None = None,
+    debaters: list[str] | None = None,
+    spill: bool = False,
+) -> dict[str, Any]:
     """
     Create a fresh debate state for a new session.
 
     Args:
         max_exchange_rounds: Number of exchange rounds (default 4).
+        token_budget: Optional ceiling on total tokens for the whole debate.
+        debaters: Debater ids in speaking order (default: the default panel).
+        spill: Give the debate a segment in the spill directory that
+            spill_transcript moves older messages to (see read_messages).
 
     Returns:
-        State dict with phase OPENING, empty messages and openings.
+        State dict with phase OPENING, the panel, empty messages and openings.
+
+    Raises:
+        ValueError: Unknown or repeated debaters, or fewer than two; or `spill`
+            without a spill directory (SIMULACRA_SPILL_DIR).
     """
-    state = DebateState(phase=RoundPhase.OPENING, max_exchange_rounds=max_exchange_rounds)
+    if spill and not spill_enabled():
+        raise ValueError("Spilling is not enabled (set SIMULACRA_SPILL_DIR)")
+    state = DebateState(
+        phase=RoundPhase.OPENING,
+        debaters=PERSONA_REGISTRY.panel(debaters),
+        max_exchange_rounds=max_exchange_rounds,
+        token_budget=token_budget,
+        segment=SegmentRef(id=new_segment_id()) if spill else None,
+    )
     return _state_to_dict(state)
 
 
+def list_personas() -> dict[str, Any]:
+    """
+    The persona registry: every persona and the default panel of debaters.
+
+    Returns:
+        Dict with default_debaters (ids), debaters (all debater ids) and
+        personas (id, name, philosophy, icon_hint; the arbitrator included).
+    """
+    return {
+        "default_debaters": [pid.value for pid in PERSONA_REGISTRY.default_debaters],
+        "debaters": [pid.value for pid in PERSONA_REGISTRY.debater_ids],
+        "personas": [p.model_dump(mode="json") for p in PERSONA_REGISTRY],
+    }
+
+
+def check_panel(debaters: list[str] | None = None) -> list[str]:
+    """
+    Validate a debate's panel of debaters.
+
+    Args:
+        debaters: Debater ids in speaking order, or None for the default panel.
+
+    Returns:
+        The panel's ids.
+
+    Raises:
+        ValueError: Unknown or repeated debaters, the arbitrator, or fewer than two.
+    """
+    return [pid.value for pid in PERSONA_REGISTRY.panel(debaters)]
+
+
+def validate_state(state_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Check a state dict from outside the package (an MCP client) before it
+    reaches the other tools, which trust their state.
+
+    Args:
+        state_dict: State as sent by the client.
+
+    Returns:
+        The state, normalized as _state_to_dict writes it.
+
+    Raises:
+        ValueError: A malformed state (pydantic ValidationError).
+    """
+    return _state_to_dict(_validated_state(state_dict))
+
+
 def get_debate_state(state_dict: dict[str, Any]) -> dict[str, Any]:
     """
     Return the current debate state as a JSON-serializable dict.
@@ -83,20 +241,77 @@ def get_debate_state(state_dict: dict[str, Any]) -> dict[str, Any]:
     return state_dict
 
 
+def spill_transcript(state_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Move all but the HOT_MESSAGES most recent messages of a debate with a
+    segment there, once SPILL_BATCH more have piled up (call after recording
+    a turn; a no-op otherwise).
+
+    Args:
+        state_dict: Current state.
+
+    Returns:
+        Updated state dict.
+
+    Raises:
+        ValueError: The state names an invalid segment, or spilling is not enabled.
+    """
+    if not state_dict.get("segment") or len(state_dict["messages"]) < HOT_MESSAGES + SPILL_BATCH:
+        return state_dict
+    state = _state_from_dict(state_dict)
+    state.spill(HOT_MESSAGES)
+    return _state_to_dict(state)
+
+
+def read_messages(state_dict: dict[str, Any], start: int = 0, end: int | None = None) -> list[dict[str, Any]]:
+    """
+    Messages of the whole transcript by index, also those moved to the
+    debate's segment (state_dict["messages"] holds only the recent ones then).
+
+    Args:
+        state_dict: Current state.
+        start: First message index.
+        end: Index after the last message (None: to the end).
+
+    Returns:
+        Messages[start:end] in state-dict form.
+
+    Raises:
+        ValueError: The state names an invalid segment, or spilling is not enabled.
+    """
+    count = (state_dict["segment"]["count"] if state_dict.get("segment") else 0) + len(state_dict["messages"])
+    start, end, _ = slice(start, end).indices(count)
+    return [m for _, m in zip(range(start, end), state_messages(state_dict, start))]
+
+
+def iter_messages(state_dict: dict[str, Any], start: int = 0) -> Iterator[dict[str, Any]]:
+    """
+    Every message of the transcript from index `start` on, spilled ones read
+    from the segment one at a time (for replay and export of long debates).
+
+    Args:
+        state_dict: Current state.
+        start: First message index.
+
+    Returns:
+        An iterator of messages in state-dict form.
+    """
+    return state_messages(state_dict, start)
+
+
 def build_opening_prompt(persona_id: str) -> str:
     """
     Build the prompt for a debater to give their brief opening statement.
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas).
 
     Returns:
         Instruction text for the LLM to generate an opening (2-4 sentences).
     """
     pid = PersonaId(persona_id)
     persona = Persona.get(pid)
-    return (
-        f"You are {persona.name}. Your view: {persona.philosophy}. "
+    return persona.prompt_prefix + (
         "Give a brief opening statement (2-4 sentences) stating your position with brevity."
     )
 
@@ -106,7 +321,7 @@ def record_opening(persona_id: str, opening_text: str, state_dict: dict[str, Any
     Record one debater's opening statement and add it to the transcript.
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas).
         opening_text: The opening statement to store.
         state_dict: Current debate state.
 
@@ -126,19 +341,20 @@ def build_defence_prompt(persona_id: str, state_dict: dict[str, Any]) -> str:
     Build the prompt asking this debater to defend their position after seeing all openings.
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
-        state_dict: Current state (must contain openings from all three).
+        persona_id: A debater id (see list_personas).
+        state_dict: Current state (must contain every debater's opening).
 
     Returns:
         Instruction text for the LLM to defend vigorously.
     """
-    state = _state_from_dict(state_dict)
-    pid = PersonaId(persona_id)
-    persona = Persona.get(pid)
-    openings_block = state.openings_text()
-    return (
-        f"You are {persona.name}. Your view: {persona.philosophy}. "
-        f"Here are everyone's opening statements:\n\n{openings_block}\n\n"
+    return "".join(_defence_parts(PersonaId(persona_id), _state_from_dict(state_dict)))
+
+
+def _defence_parts(pid: PersonaId, state: DebateState) -> tuple[str, str]:
+    # Openings only: the defences already given are not shown
+    prefix, _ = _context(state, state.phase_start(RoundPhase.DEFENCE), limit=0)
+    return prefix, "\n" + Persona.get(pid).prompt_prefix + (
+        "Above are everyone's opening statements. "
         "Defend your point of view vigorously in a short response (3-5 sentences)."
     )
 
@@ -148,7 +364,7 @@ def record_defence(persona_id: str, defence_text: str, state_dict: dict[str, Any
     Record a defence and add it to the transcript.
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas).
         defence_text: The defence statement.
         state_dict: Current debate state.
 
@@ -169,20 +385,20 @@ def build_exchange_prompt(
     Build the prompt for one debater in an exchange round (react to others).
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas).
         state_dict: Current state (transcript so far).
         round_index: Current exchange round (1-based).
 
     Returns:
         Instruction for the LLM to respond to the discussion.
     """
-    state = _state_from_dict(state_dict)
-    pid = PersonaId(persona_id)
-    persona = Persona.get(pid)
-    transcript = state.transcript_for_context(limit=40)
-    return (
-        f"You are {persona.name}. Your view: {persona.philosophy}. "
-        f"Exchange round {round_index}. Recent discussion:\n\n{transcript}\n\n"
+    return "".join(_exchange_parts(PersonaId(persona_id), _state_from_dict(state_dict), round_index))
+
+
+def _exchange_parts(pid: PersonaId, state: DebateState, round_index: int) -> tuple[str, str]:
+    prefix, recent = _context(state, state.phase_start(RoundPhase.EXCHANGE, round_index), limit=40)
+    return prefix, recent + "\n" + Persona.get(pid).prompt_prefix + (
+        f"Exchange round {round_index}. "
         "Respond to the others in character; keep it concise (2-4 sentences)."
     )
 
@@ -194,7 +410,7 @@ def record_exchange_message(
     Record one message in an exchange round.
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas).
         content: The message text.
         state_dict: Current state.
         round_index: Current exchange round.
@@ -214,19 +430,18 @@ def build_reflection_prompt(persona_id: str, state_dict: dict[str, Any]) -> str:
     Build the prompt asking whether the debater would change their position.
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas).
         state_dict: Current state (full transcript).
 
     Returns:
         Instruction for the LLM to reflect and state if/how they would change.
     """
-    state = _state_from_dict(state_dict)
-    pid = PersonaId(persona_id)
-    persona = Persona.get(pid)
-    transcript = state.transcript_for_context(limit=60)
-    return (
-        f"You are {persona.name}. Your view: {persona.philosophy}. "
-        f"Full discussion so far:\n\n{transcript}\n\n"
+    return "".join(_reflection_parts(PersonaId(persona_id), _state_from_dict(state_dict)))
+
+
+def _reflection_parts(pid: PersonaId, state: DebateState) -> tuple[str, str]:
+    prefix, recent = _context(state, state.phase_start(RoundPhase.REFLECTION), limit=60)
+    return prefix, recent + "\n" + Persona.get(pid).prompt_prefix + (
         "In light of this discussion, are you willing to change your position? If so, how? "
         "Answer briefly (2-4 sentences)."
     )
@@ -237,7 +452,7 @@ def record_reflection(persona_id: str, reflection_text: str, state_dict: dict[st
     Record a debater's reflection (change of position or not).
 
     Args:
-        persona_id: One of 'napoleon', 'gandhi', 'alexander'.
+        persona_id: A debater id (see list_personas).
         reflection_text: Their reflection response.
         state_dict: Current state.
 
@@ -252,6 +467,14 @@ def record_reflection(persona_id: str, reflection_text: str, state_dict: dict[st
     return _state_to_dict(state)
 
 
+def _names(persona_ids: list[PersonaId]) -> str:
+    """Display names as prose: "A, B, and C"."""
+    names = [Persona.get(pid).name for pid in persona_ids]
+    if len(names) <= 2:
+        return " and ".join(names)
+    return ", ".join(names[:-1]) + f", and {names[-1]}"
+
+
 def build_arbitration_prompt(state_dict: dict[str, Any]) -> str:
     """
     Build the prompt for the Arbitrator to analyze all viewpoints and bring them to consensus.
@@ -262,22 +485,75 @@ def build_arbitration_prompt(state_dict: dict[str, Any]) -> str:
     Returns:
         Instruction for the Arbitrator LLM.
     """
-    state = _state_from_dict(state_dict)
-    transcript = state.transcript_for_context(limit=100)
-    return (
+    return "".join(_arbitration_parts(_state_from_dict(state_dict)))
+
+
+def _arbitration_parts(state: DebateState) -> tuple[str, str]:
+    # Same boundary as the reflections, so their shared prefix is reused when the windows agree
+    prefix, recent = _context(state, state.phase_start(RoundPhase.REFLECTION), limit=100)
+    return prefix, recent + "\n" + (
         "You are an impartial Arbitrator. Your role is to synthesize all perspectives presented "
         "and bring them to a balanced consensus. "
-        "Review the complete debate between Napoleon, Gandhi, and Alexander. "
+        f"Review the complete debate above between {_names(state.debaters)}. "
         "Identify common ground across all positions, acknowledge the valid merits of each viewpoint, "
         "and propose a unified consensus that integrates the best elements from all perspectives. "
         "Your goal is to find a solution that all parties can accept. "
-        f"Full debate:\n\n{transcript}\n\n"
         "Provide your final arbitration (one comprehensive paragraph): "
         "synthesize all viewpoints, identify shared values, and present a consensus solution "
         "that brings together the best of all perspectives."
     )
 
 
+def _context(state: DebateState, boundary: int, limit: int) -> tuple[str, str]:
+    """
+    The transcript split at `boundary`: the shared prefix (header and up to
+    `limit` messages before it, 0 for all) and the lines of the messages since.
+    The window's first message is aligned to CONTEXT_BLOCK, so it stays put
+    for several rounds instead of sliding with every turn.
+    """
+    excess = max(0, boundary - limit) if limit else 0
+    start = -(-excess // CONTEXT_BLOCK) * CONTEXT_BLOCK
+    return CONTEXT_HEADER + state.transcript_lines(start, boundary), state.transcript_lines(boundary)
+
+
+def build_prompt_parts(
+    phase: str, persona_id: str, state_dict: dict[str, Any], round_index: int = 0
+) -> dict[str, str]:
+    """
+    Build a turn's prompt split into its shared prefix and per-turn suffix;
+    prefix + suffix is the text the phase's build_*_prompt tool returns.
+
+    Args:
+        phase: "opening", "defence", "exchange", "reflection", "arbitration"
+            or "verdict" (see build_verdict_prompt).
+        persona_id: The speaker (ignored for arbitration and verdict).
+        state_dict: Current state.
+        round_index: Exchange round (1-based) for the exchange phase.
+
+    Returns:
+        {"prefix": ..., "suffix": ...}; the prefix is "" for openings, which carry no transcript.
+
+    Raises:
+        ValueError: Unknown phase or persona id.
+    """
+    if phase == "opening":
+        return {"prefix": "", "suffix": build_opening_prompt(persona_id)}
+    state = _state_from_dict(state_dict)
+    if phase == "defence":
+        prefix, suffix = _defence_parts(PersonaId(persona_id), state)
+    elif phase == "exchange":
+        prefix, suffix = _exchange_parts(PersonaId(persona_id), state, round_index)
+    elif phase == "reflection":
+        prefix, suffix = _reflection_parts(PersonaId(persona_id), state)
+    elif phase == "arbitration":
+        prefix, suffix = _arbitration_parts(state)
+    elif phase == "verdict":
+        prefix, suffix = _verdict_parts(state)
+    else:
+        raise ValueError(f"No prompt for phase {phase!r}")
+    return {"prefix": prefix, "suffix": suffix}
+
+
 def record_arbitration(arbitration_text: str, state_dict: dict[str, Any]) -> dict[str, Any]:
     """
     Record the Arbitrator's final consensus and mark debate as done.
@@ -297,6 +573,52 @@ def record_arbitration(arbitration_text: str, state_dict: dict[str, Any]) -> dic
     return _state_to_dict(state)
 
 
+def build_verdict_prompt(state_dict: dict[str, Any]) -> str:
+    """
+    Build the prompt asking a judge which debater argued best (for tournaments;
+    not part of the debate itself).
+
+    Args:
+        state_dict: A finished debate's state.
+
+    Returns:
+        Instruction to answer with the winner's name only.
+    """
+    return "".join(_verdict_parts(_state_from_dict(state_dict)))
+
+
+def _verdict_parts(state: DebateState) -> tuple[str, str]:
+    # Shares the arbitration prompt's prefix
+    prefix, recent = _context(state, state.phase_start(RoundPhase.REFLECTION), limit=100)
+    return prefix, recent + "\n" + (
+        f"You are an impartial judge of the debate above between {_names(state.debaters)}. "
+        "Which debater argued most persuasively? Answer with that debater's name only, "
+        "or \"draw\" if none stood out."
+    )
+
+
+def parse_verdict(verdict_text: str, state_dict: dict[str, Any]) -> str | None:
+    """
+    Find the winner named in a judge's reply.
+
+    Args:
+        verdict_text: The reply to build_verdict_prompt.
+        state_dict: The judged debate's state.
+
+    Returns:
+        The id of the one debater the reply names (by name or id), or None
+        for a draw or an unclear reply.
+    """
+    state = _state_from_dict(state_dict)
+    text = verdict_text.lower()
+    named = [
+        pid.value
+        for pid in state.debaters
+        if Persona.get(pid).name.lower() in text or pid.value.replace("_", " ") in text
+    ]
+    return named[0] if len(named) == 1 else None
+
+
 def advance_phase(state_dict: dict[str, Any], new_phase: str) -> dict[str, Any]:
     """
     Advance the debate to a new phase (opening -> defence -> exchange -> reflection -> arbitration).
@@ -317,7 +639,7 @@ def advance_phase(state_dict: dict[str, Any], new_phase: str) -> dict[str, Any]:
 
 def advance_exchange_round(state_dict: dict[str, Any]) -> dict[str, Any]:
     """
-    Move to the next exchange round (after all three debaters have spoken this round).
+    Move to the next exchange round (after every debater has spoken this round).
 
     Args:
         state_dict: Current state.
@@ -328,3 +650,101 @@ def advance_exchange_round(state_dict: dict[str, Any]) -> dict[str, Any]:
     state = _state_from_dict(state_dict)
     state.exchange_rounds = min(state.exchange_rounds + 1, state.max_exchange_rounds)
     return _state_to_dict(state)
+
+
+def record_token_usage(
+    phase: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    total_tokens: int,
+    state_dict: dict[str, Any],
+) -> dict[str, Any]:
+    """
+    Add one LLM turn's token usage to the per-phase and per-debate totals.
+
+    Args:
+        phase: Phase the turn belongs to ('opening', 'defence', ...).
+        prompt_tokens: Tokens in the prompt.
+        completion_tokens: Tokens in the generated reply.
+        total_tokens: Total tokens billed for the turn.
+        state_dict: Current state.
+
+    Returns:
+        Updated state dict with token_usage and token_total updated.
+    """
+    state = _state_from_dict(state_dict)
+    state.add_token_usage(
+        RoundPhase(phase),
+        TokenUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=total_tokens,
+        ),
+    )
+    return _state_to_dict(state)
+
+
+def mark_budget_exhausted(state_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Flag that the token budget cut the debate short (remaining rounds skipped).
+
+    Args:
+        state_dict: Current state.
+
+    Returns:
+        Updated state dict with budget_exhausted set.
+    """
+    state = _state_from_dict(state_dict)
+    state.budget_exhausted = True
+    return _state_to_dict(state)
+
+
+def record_route(
+    phase: str,
+    persona_id: str,
+    round_index: int,
+    model: str,
+    fallback: bool,
+    state_dict: dict[str, Any],
+) -> dict[str, Any]:
+    """
+    Record which model served one LLM turn.
+
+    Args:
+        phase: Phase the turn belongs to.
+        persona_id: Who spoke ('napoleon', 'gandhi', 'alexander', 'arbitrator').
+        round_index: Exchange round (0 outside the exchange phase).
+        model: Model that produced the reply.
+        fallback: True if the routed model was quota-exhausted and the fallback answered.
+        state_dict: Current state.
+
+    Returns:
+        Updated state dict with the route appended.
+    """
+    state = _state_from_dict(state_dict)
+    state.routes.append(
+        ModelRoute(
+            phase=RoundPhase(phase),
+            persona_id=PersonaId(persona_id),
+            round_index=round_index,
+            model=model,
+            fallback=fallback,
+        )
+    )
+    return _state_to_dict(state)
+
+
+def record_timings(timings: dict[str, dict[str, float]], state_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Store the debate's time breakdown (replaces any recorded before).
+
+    Args:
+        timings: Phase -> {model_wait_ms, backoff_ms, pacing_ms, prompt_ms, state_ms}.
+        state_dict: Current state.
+
+    Returns:
+        Updated state dict with `timings` set.
+    """
+    state = _state_from_dict(state_dict)
+    state.timings = {phase: PhaseTimings(**t) for phase, t in timings.items()}
+    return _state_to_dict(state)
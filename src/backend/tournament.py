@@ -0,0 +1,277 @@
+"""
+Tournament runner: many matches between personas, with turns whose prompts
+repeat across matches generated once, and a standings table at the end.
+
+    simulacra-tournament socrates,confucius,machiavelli,mandela -o matches.jsonl --standings standings.csv
+    simulacra-tournament --matchups matchups.json --quota-rpm 15 --concurrency 4
+    PYTHONPATH=src python3 -m backend.tournament napoleon,gandhi,alexander --size 2
+
+Without `--matchups`, every `--size`-debater combination of the listed
+personas (default: all registered debaters) plays once: a round robin.
+`--matchups` is a JSON list of panels, e.g. [["socrates", "confucius"],
+["napoleon", "gandhi", "alexander"]].
+
+Matches run through the batch runner (see backend.batch): at most
+`--concurrency` at once, every model call under the shared per-model
+limiters (paced to `--quota-rpm` when given), each finished match appended
+to the output as it completes, and a rerun resumes. All matches share one
+SharedTurns, so a prompt sent by one match (every opening of a persona, for
+a start) is generated once and its reply reused by the others.
+
+After its debate, each match gets a verdict turn naming the debater who
+argued best (see DebateCoordinator.judge). A win is worth 3 points, a draw 1
+to every debater of the match, a loss 0.
+"""
+
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Iterable, TextIO
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from backend.agent import DebateCoordinator
+from backend.agent.cassette import Transport
+from backend.agent.coordinator import DEFAULT_MODEL, debate_panel, load_adk, personas
+from backend.agent.limiter import AdaptiveLimiter, configure_shared_quota
+from backend.agent.scheduler import BATCH
+from backend.agent.shared_turns import SharedTurns
+from backend.agent.store import MemoryStore
+from backend.batch import DEFAULT_CONCURRENCY, RunDebate, run_batch
+
+WIN_POINTS = 3
+DRAW_POINTS = 1
+STANDINGS_COLUMNS = ["rank", "persona", "played", "won", "drawn", "lost", "points"]
+
+
+def round_robin(persona_ids: list[str] | None = None, size: int = 2) -> list[list[str]]:
+    """
+    Every `size`-debater panel from `persona_ids` (default: all registered debaters), once each.
+
+    Raises:
+        ValueError: Unknown or repeated personas, or fewer than `size` of them.
+    """
+    persona_ids = list(persona_ids or personas()["debaters"])
+    if len(persona_ids) < size:
+        raise ValueError(f"A round robin of {size}-debater matches needs at least {size} personas")
+    debate_panel(persona_ids)
+    return [debate_panel(list(panel)) for panel in combinations(persona_ids, size)]
+
+
+def load_matchups(path: Path) -> list[list[str]]:
+    """
+    Read a JSON list of panels.
+
+    Raises:
+        ValueError: Not a list of panels, or a panel that is not valid (see debate_panel).
+    """
+    matchups = json.loads(path.read_text())
+    if not isinstance(matchups, list):
+        raise ValueError(f"{path}: expected a JSON list of panels")
+    panels = []
+    for n, panel in enumerate(matchups, start=1):
+        try:
+            panels.append(debate_panel(list(panel)))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Matchup {n}: {e}") from None
+    return panels
+
+
+def match_configs(
+    matchups: list[list[str]],
+    max_exchange_rounds: int = 4,
+    model: str = DEFAULT_MODEL,
+    token_budget: int | None = None,
+) -> list[dict[str, Any]]:
+    """
+    One batch configuration per match (see backend.batch.load_configs), with
+    an id naming its panel ("socrates-vs-confucius"; repeats get "-2", "-3").
+    """
+    configs = []
+    seen: dict[str, int] = {}
+    for panel in matchups:
+        base = "-vs-".join(panel)
+        seen[base] = seen.get(base, 0) + 1
+        configs.append(
+            {
+                "id": base if seen[base] == 1 else f"{base}-{seen[base]}",
+                "max_exchange_rounds": max_exchange_rounds,
+                "model": model,
+                "token_budget": token_budget,
+                "personas": panel,
+            }
+        )
+    return configs
+
+
+def tournament_runner(
+    shared_turns: SharedTurns, transport: Transport | None = None, limiter: AdaptiveLimiter | None = None
+) -> RunDebate:
+    """
+    Runs one match and its verdict turn; every match's model calls go through
+    `shared_turns`, then (turns actually generated) `limiter` (default: the
+    shared per-model limiters) and `transport` (default: ADK).
+    """
+
+    async def run(config: dict[str, Any]) -> dict[str, Any]:
+        coordinator = DebateCoordinator(
+            model=config["model"],
+            max_exchange_rounds=config["max_exchange_rounds"],
+            token_budget=config["token_budget"],
+            priority=BATCH,
+            transport=transport,
+            limiter=limiter,
+            debaters=config["personas"],
+            shared_turns=shared_turns,
+        )
+        state = await coordinator.run_debate()
+        return {**state, "verdict": await coordinator.judge(state)}
+
+    return run
+
+
+def standings(records: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    The standings table from finished match records (as written by run_batch),
+    best first: by points, then wins.
+    """
+    table: dict[str, dict[str, Any]] = {}
+    for record in records:
+        if record.get("status") != "done":
+            continue
+        state = record["state"]
+        panel = state["debaters"]
+        winner = (state.get("verdict") or {}).get("winner")
+        for pid in panel:
+            row = table.setdefault(pid, {"persona": pid, "played": 0, "won": 0, "drawn": 0, "lost": 0, "points": 0})
+            row["played"] += 1
+            if winner is None:
+                row["drawn"] += 1
+                row["points"] += DRAW_POINTS
+            elif winner == pid:
+                row["won"] += 1
+                row["points"] += WIN_POINTS
+            else:
+                row["lost"] += 1
+    ranked = sorted(table.values(), key=lambda r: (-r["points"], -r["won"], r["persona"]))
+    return [{"rank": i, **row} for i, row in enumerate(ranked, start=1)]
+
+
+def write_standings(rows: list[dict[str, Any]], path: Path) -> None:
+    """Write the standings as CSV."""
+    with path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=STANDINGS_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def format_standings(rows: list[dict[str, Any]]) -> str:
+    """The standings as an aligned text table."""
+    cells = [STANDINGS_COLUMNS] + [[str(row[c]) for c in STANDINGS_COLUMNS] for row in rows]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(STANDINGS_COLUMNS))]
+    return "\n".join("  ".join(cell.ljust(w) for cell, w in zip(line, widths)).rstrip() for line in cells)
+
+
+def read_records(output: Path) -> list[dict[str, Any]]:
+    """Match records in an output file (a truncated last line is ignored)."""
+    records = []
+    for line in output.read_text().splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
+
+
+async def run_tournament(
+    configs: list[dict[str, Any]],
+    output: Path,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    run_debate: RunDebate | None = None,
+    shared_turns: SharedTurns | None = None,
+    resume: bool = True,
+    progress_stream: TextIO = sys.stderr,
+) -> dict[str, Any]:
+    """
+    Run every match (see backend.batch.run_batch) and compute the standings
+    over all matches recorded in `output`, including ones from earlier runs.
+
+    Args:
+        configs: Output of `match_configs`.
+        output: JSONL file; one record per finished match.
+        concurrency: Matches in flight at once.
+        run_debate: Runs one match (default: `tournament_runner(shared_turns)`).
+        shared_turns: Shared across the matches (default: a new one).
+        resume: Skip matches already recorded as done in `output`.
+        progress_stream: Where the live progress lines go.
+
+    Returns:
+        {"counts": done/failed/skipped, "shared_turns": SharedTurns.snapshot(), "standings": rows}
+    """
+    shared_turns = shared_turns or SharedTurns()
+    run_debate = run_debate or tournament_runner(shared_turns)
+    counts = await run_batch(configs, output, concurrency, run_debate, resume, progress_stream)
+    ids = {c["id"] for c in configs}
+    records = [r for r in read_records(output) if r.get("id") in ids]
+    return {"counts": counts, "shared_turns": shared_turns.snapshot(), "standings": standings(records)}
+
+
+def main(argv: list[str] | None = None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run a debate tournament and write its standings.")
+    parser.add_argument(
+        "personas", nargs="?", default=None, help="Comma-separated debater ids for a round robin (default: all)"
+    )
+    parser.add_argument("--matchups", type=Path, default=None, help="JSON list of panels, instead of a round robin")
+    parser.add_argument("--size", type=int, default=2, help="Debaters per round-robin match")
+    parser.add_argument("--rounds", type=int, default=4, help="Exchange rounds per match")
+    parser.add_argument("--model", default=os.getenv("GOOGLE_API_MODEL", DEFAULT_MODEL))
+    parser.add_argument("--token-budget", type=int, default=None, help="Token budget per match")
+    parser.add_argument("-o", "--output", type=Path, default=Path("matches.jsonl"))
+    parser.add_argument("--standings", type=Path, default=Path("standings.csv"))
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument(
+        "--quota-rpm", type=float, default=None, help="Pace all model calls to this many requests per minute"
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Discard existing results instead of resuming"
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    try:
+        if args.matchups is not None:
+            matchups = load_matchups(args.matchups)
+        else:
+            matchups = round_robin(args.personas.split(",") if args.personas else None, args.size)
+    except (OSError, ValueError) as e:
+        print(f"Invalid matchups: {e}", file=sys.stderr)
+        return 2
+    if not load_adk():
+        print("Google ADK is not installed. Install with: uv add google-adk", file=sys.stderr)
+        return 2
+    if args.quota_rpm:
+        configure_shared_quota(MemoryStore(), args.quota_rpm)
+
+    configs = match_configs(matchups, args.rounds, args.model, args.token_budget)
+    result = asyncio.run(run_tournament(configs, args.output, args.concurrency, resume=not args.restart))
+    write_standings(result["standings"], args.standings)
+    counts, shared = result["counts"], result["shared_turns"]
+    print(format_standings(result["standings"]), file=sys.stderr)
+    print(
+        f"{counts['done']} done, {counts['failed']} failed, {counts['skipped']} already done; "
+        f"{shared['generated']} model calls, {shared['shared']} turns shared "
+        f"({shared['saved_tokens']} tokens saved) -> {args.output}, {args.standings}",
+        file=sys.stderr,
+    )
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
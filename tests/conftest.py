@@ -4,3 +4,6 @@ import os
 
 # Ensure src is on path for backend package
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Keep the app's search index out of the working tree
+os.environ.setdefault("SEARCH_INDEX", ":memory:")
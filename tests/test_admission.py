@@ -0,0 +1,60 @@
+"""Tests for backend.app.admission (deadline-based admission control)."""
+import pytest
+
+from backend.app.admission import AdmissionController, AdmissionRejected
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEstimate:
+    def test_single_debate_is_latency_bound(self):
+        controller = AdmissionController(quota_rpm=600, turn_seconds=2.0)
+        assert controller.estimate(22) == pytest.approx(44.0)
+
+    def test_in_flight_debates_make_it_quota_bound(self):
+        clock = FakeClock()
+        controller = AdmissionController(quota_rpm=15, turn_seconds=2.0, clock=clock)
+        with controller.admit(22, deadline_s=1000), controller.admit(22, deadline_s=1000):
+            # 44 pending + 22 new turns at 15 per minute
+            assert controller.estimate(22) == pytest.approx(66 * 4.0)
+            clock.now = 20.0  # each in-flight debate has made ~10 turns
+            assert controller.estimate(22) == pytest.approx(46 * 4.0)
+        assert controller.in_flight == 0
+
+
+class TestAdmission:
+    def test_rejects_with_429_when_deadline_cannot_be_met(self):
+        controller = AdmissionController(quota_rpm=15, turn_seconds=2.0)
+        with pytest.raises(AdmissionRejected) as exc:
+            controller.check(22, deadline_s=60)
+        assert exc.value.status_code == 429
+        assert exc.value.retry_after == pytest.approx(22 * 4.0 - 60)
+        assert controller.stats["rejected"] == 1
+
+    def test_rejects_with_503_when_circuit_open(self):
+        controller = AdmissionController()
+        with pytest.raises(AdmissionRejected) as exc:
+            controller.check(22, deadline_s=10_000, circuit_open=True, retry_after=30)
+        assert exc.value.status_code == 503
+        assert exc.value.retry_after == 30
+
+    def test_completed_debate_updates_turn_estimate(self):
+        clock = FakeClock()
+        controller = AdmissionController(quota_rpm=600, turn_seconds=4.0, clock=clock)
+        with controller.admit(10, deadline_s=1000):
+            clock.now = 20.0  # 2s per turn
+        assert controller.turn_seconds == pytest.approx(4.0 + 0.3 * (2.0 - 4.0))
+
+    def test_failed_debate_does_not_update_estimate(self):
+        controller = AdmissionController(turn_seconds=4.0)
+        with pytest.raises(ValueError):
+            with controller.admit(10, deadline_s=10_000):
+                raise ValueError("boom")
+        assert controller.turn_seconds == 4.0
+        assert controller.in_flight == 0
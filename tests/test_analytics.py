@@ -0,0 +1,47 @@
+"""Tests for backend.analytics (NumPy aggregates over a columnar corpus)."""
+import pytest
+
+pytest.importorskip("numpy")
+
+from backend.analytics import convergence, lengths, load, positions, summarize  # noqa: E402
+from backend.columnar import Corpus, write_corpus  # noqa: E402
+
+from .test_columnar import make_state  # noqa: E402
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    corpus = Corpus()
+    corpus.add_debate("a", make_state(rounds=1))
+    corpus.add_debate("b", make_state(rounds=4, conceding=("gandhi", "napoleon")))
+    corpus.add_debate("c", make_state(rounds=2, conceding=(), arbitration=""))
+    write_corpus(corpus, tmp_path / "c.simcol")
+    return load(tmp_path / "c.simcol")
+
+
+class TestAnalytics:
+    def test_lengths_match_python(self, corpus):
+        result = lengths(corpus)
+        exchange = [len(f"gandhi argues in round {r}") for r in (1, 1, 2, 3, 4, 1, 2)]
+        stats = result["gandhi"]["exchange"]
+        assert stats["messages"] == 7
+        assert stats["mean_chars"] == round(sum(exchange) / 7, 1)
+        assert stats["median_chars"] == sorted(exchange)[3]
+        assert result["arbitrator"]["arbitration"]["messages"] == 2
+
+    def test_positions(self, corpus):
+        result = positions(corpus)
+        assert result["by_persona"]["gandhi"] == {"reflections": 3, "changed_position": 2, "rate": 0.6667}
+        assert result["by_persona"]["alexander"]["changed_position"] == 0
+        assert result["debates_with_change"] == 2
+        assert result["debate_rate"] == 0.6667
+
+    def test_convergence(self, corpus):
+        result = convergence(corpus)
+        assert result["arbitrated"] == 2
+        assert result["histogram"] == {1: 1, 4: 1}
+        assert result["mean_rounds"] == 2.5
+        assert result["cut_short"] == 1
+
+    def test_summarize(self, corpus):
+        assert summarize(corpus)["messages"] == len(corpus)
@@ -4,6 +4,7 @@ from unittest.mock import patch, AsyncMock
 from fastapi.testclient import TestClient
 
 # Import after path is set
+from backend.agent.context_cache import LocalContextCache
 from backend.app.main import app
 
 
@@ -47,3 +48,256 @@ class TestDebateRun:
         data = r.json()
         assert "detail" in data
         assert "ADK" in data["detail"] or "not installed" in data["detail"]
+
+    def test_run_debate_returns_503_with_retry_after_when_circuit_open(self, client):
+        from backend.agent.limiter import CircuitOpenError
+
+        with patch("backend.app.main.DebateCoordinator") as MockCoordinator:
+            MockCoordinator.return_value.run_debate = AsyncMock(side_effect=CircuitOpenError(42.0))
+            r = client.post("/debate/run")
+        assert r.status_code == 503
+        assert r.headers["retry-after"] == "42"
+
+
+class TestAdmissionControl:
+    def test_debate_that_cannot_meet_deadline_is_rejected_early(self, client):
+        with patch("backend.app.main.DebateCoordinator") as MockCoordinator:
+            r = client.post("/debate/run?max_exchange_rounds=4&deadline_s=5")
+        assert r.status_code == 429
+        assert int(r.headers["retry-after"]) >= 1
+        MockCoordinator.assert_not_called()
+
+    def test_admission_metrics(self, client):
+        r = client.get("/metrics/admission")
+        assert r.status_code == 200
+        assert {"in_flight", "turn_seconds", "rejected"} <= set(r.json())
+
+
+class TestDebateRunCache:
+    def test_cached_result_served_without_new_debate(self, client):
+        from backend.app.main import debate_cache
+
+        debate_cache.clear()
+        with patch("backend.app.main.DebateCoordinator") as MockCoordinator:
+            MockCoordinator.return_value.run_debate = AsyncMock(return_value={"phase": "done"})
+            first = client.post("/debate/run?max_exchange_rounds=2&cache_ttl=60")
+            second = client.post("/debate/run?max_exchange_rounds=2&cache_ttl=60")
+            fresh = client.post("/debate/run?max_exchange_rounds=2&cache_ttl=60&fresh=true")
+        debate_cache.clear()
+        assert first.headers["x-debate-cache"] == "miss"
+        assert second.headers["x-debate-cache"] == "hit"
+        assert second.json() == {"phase": "done"}
+        assert fresh.headers["x-debate-cache"] == "miss"
+        assert MockCoordinator.call_count == 2
+
+
+class TestDebateStream:
+    def test_stream_forwards_events_as_sse(self, client):
+        async def fake_stream():
+            yield {"type": "delta", "persona_id": "napoleon", "phase": "opening", "round_index": 0, "text": "Uni"}
+            yield {"type": "done", "state": {"phase": "done"}}
+
+        with patch("backend.app.main.DebateCoordinator") as MockCoordinator:
+            MockCoordinator.return_value.stream_debate = fake_stream
+            r = client.post("/debate/stream?max_exchange_rounds=1")
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("text/event-stream")
+        blocks = [b for b in r.text.split("\n\n") if b]
+        assert blocks[0].startswith("event: delta\n")
+        assert '"text": "Uni"' in blocks[0]
+        assert blocks[1] == 'event: done\ndata: {"state": {"phase": "done"}}'
+
+    def test_failed_stream_recorded_as_failed(self, client, tmp_path, monkeypatch):
+        from backend.agent import coordinator as coordinator_module
+        from backend.agent.coordinator import DebateCoordinator
+        from backend.app.main import registry
+
+        async def broken(model, prompt, on_delta):
+            raise ValueError("model exploded")
+
+        monkeypatch.setattr(coordinator_module, "TURN_DELAY", 0)
+        monkeypatch.setattr(coordinator_module, "PHASE_DELAY", 0)
+        monkeypatch.setattr(registry, "checkpoint_dir", tmp_path)
+        with patch(
+            "backend.app.main.DebateCoordinator",
+            lambda **kwargs: DebateCoordinator(**{**kwargs, "transport": broken}),
+        ):
+            r = client.post("/debate/stream?max_exchange_rounds=1")
+        debate_id = r.headers["x-debate-id"]
+        assert 'event: error\ndata: {"detail": "model exploded"}' in r.text
+        record = client.get(f"/debates/{debate_id}").json()
+        assert record["status"] == "failed"
+        assert record["error"] == "model exploded"
+
+
+class TestContextCacheMetrics:
+    def test_off_by_default(self, client):
+        assert client.get("/metrics/context-cache").status_code == 404
+
+    def test_shared_cache_passed_to_coordinators(self, client):
+        cache = LocalContextCache()
+        with patch("backend.app.main.context_cache", cache), patch("backend.app.main.DebateCoordinator") as MockCoordinator:
+            MockCoordinator.return_value.run_debate = AsyncMock(return_value={"phase": "done"})
+            assert client.post("/debate/run").status_code == 200
+            assert MockCoordinator.call_args.kwargs["context_cache"] is cache
+            assert client.get("/metrics/context-cache").json()["lookups"] == 0
+
+
+class TestPersonas:
+    def test_personas_lists_registry(self, client):
+        r = client.get("/personas")
+        assert r.status_code == 200
+        assert r.json()["default_debaters"] == ["napoleon", "gandhi", "alexander"]
+
+    def test_custom_panel_passed_to_coordinator(self, client):
+        with patch("backend.app.main.DebateCoordinator") as MockCoordinator:
+            MockCoordinator.return_value.run_debate = AsyncMock(return_value={"phase": "done"})
+            r = client.post("/debate/run?debaters=socrates,mandela")
+        assert r.status_code == 200
+        assert MockCoordinator.call_args.kwargs["debaters"] == ["socrates", "mandela"]
+        assert client.post("/debate/run?debaters=socrates,caesar").status_code == 422
+
+
+class TestLlmMetrics:
+    def test_metrics_lists_shared_limiters_with_queue_waits(self, client):
+        from backend.agent.limiter import get_shared_limiter
+
+        get_shared_limiter("metrics-test-model")
+        r = client.get("/metrics/llm")
+        assert r.status_code == 200
+        queues = r.json()["metrics-test-model"]["queues"]
+        assert set(queues) == {"interactive", "batch"}
+
+    def test_unknown_priority_rejected(self, client):
+        r = client.post("/debate/run?priority=urgent")
+        assert r.status_code == 422
+
+
+class TestDebateJobs:
+    def test_debate_id_header_and_status_lookup(self, client):
+        with patch("backend.app.main.DebateCoordinator") as MockCoordinator:
+            MockCoordinator.return_value.run_debate = AsyncMock(return_value={"phase": "done"})
+            r = client.post("/debate/run?max_exchange_rounds=3")
+        debate = client.get(f"/debates/{r.headers['x-debate-id']}")
+        assert debate.status_code == 200
+        assert debate.json()["status"] == "done"
+        assert debate.json()["state"] == {"phase": "done"}
+        assert client.get("/debates/unknown").status_code == 404
+
+    def test_messages_since_cursor_with_etag(self, client):
+        messages = [
+            {"author_id": "gandhi", "author_name": "Gandhi", "content": f"m{i}", "round_index": 0, "phase": "opening"}
+            for i in range(3)
+        ]
+        with patch("backend.app.main.DebateCoordinator") as MockCoordinator:
+            MockCoordinator.return_value.run_debate = AsyncMock(return_value={"messages": messages})
+            r = client.post("/debate/run")
+        url = f"/debates/{r.headers['x-debate-id']}/messages"
+        first = client.get(url, params={"limit": 2})
+        assert first.status_code == 200
+        assert first.json()["messages"] == messages[:2]
+        assert first.json()["has_more"] is True
+        rest = client.get(url, params={"since": first.json()["cursor"]})
+        assert rest.json()["messages"] == messages[2:]
+        assert rest.json()["cursor"] == 3
+        # Nothing new since the cursor: 304 with the same ETag
+        poll = client.get(url, params={"since": 3}, headers={"If-None-Match": rest.headers["etag"]})
+        assert poll.status_code == 304
+        assert poll.headers["etag"] == rest.headers["etag"]
+        assert client.get(url, params={"since": -1}).status_code == 422
+        assert client.get("/debates/unknown/messages").status_code == 404
+
+    def test_websocket_receives_subscribed_debate_events(self, monkeypatch):
+        from backend.app.main import registry
+
+        # The app's shutdown drains the registry; undo that for later tests
+        monkeypatch.setattr(registry, "draining", False)
+
+        async def run_debate(on_event=None, state=None):
+            on_event({"type": "phase", "phase": "defence"})
+            on_event({"type": "message", "author_id": "gandhi", "content": "Peace."})
+            on_event({"type": "done", "state": {"phase": "done"}})
+            return {"phase": "done"}
+
+        with TestClient(app) as client, client.websocket_connect("/ws/debates") as ws:
+            ws.send_json({"action": "subscribe", "debate_ids": ["d1"]})
+            assert ws.receive_json() == {"debate_id": "d1", "type": "status", "status": "unknown", "cursor": 0}
+            with patch("backend.app.main.DebateCoordinator") as MockCoordinator, patch(
+                "backend.app.main.uuid.uuid4"
+            ) as uuid4:
+                uuid4.return_value.hex = "d1"
+                MockCoordinator.return_value.run_debate = run_debate
+                assert client.post("/debate/run?fresh=true").status_code == 200
+            events = [ws.receive_json() for _ in range(5)]
+            assert [e["type"] for e in events] == ["status", "phase", "message", "done", "status"]
+            assert events[-1]["status"] == "done"
+            assert events[3] == {"debate_id": "d1", "type": "done"}
+            ws.send_json({"action": "dance"})
+            assert ws.receive_json()["type"] == "error"
+
+    def test_search_finds_indexed_messages(self, tmp_path, monkeypatch):
+        from backend.app import main
+        from backend.app.main import registry
+
+        monkeypatch.setattr(main, "SEARCH_INDEX", str(tmp_path / "search.db"))
+        monkeypatch.setattr(registry, "draining", False)
+        messages = [
+            {"author_id": "gandhi", "author_name": "Gandhi", "content": "I yield on tariffs.", "round_index": 1, "phase": "exchange"}
+        ]
+        assert TestClient(app).get("/search", params={"q": "tariffs"}).status_code == 503
+        with TestClient(app) as client:
+            with patch("backend.app.main.DebateCoordinator") as MockCoordinator:
+                MockCoordinator.return_value.run_debate = AsyncMock(return_value={"messages": messages})
+                debate_id = client.post("/debate/run?fresh=true").headers["x-debate-id"]
+            r = client.get("/search", params={"q": "tariffs", "persona": "gandhi", "since": "2000-01-01"})
+            assert r.status_code == 200
+            assert [hit["debate_id"] for hit in r.json()["results"]] == [debate_id]
+            assert client.get("/search", params={"q": "tariffs", "persona": "caesar"}).status_code == 422
+        # Opened at startup, closed at shutdown
+        assert registry.search is None
+
+    def test_new_debates_rejected_while_draining(self, client, monkeypatch):
+        from backend.app.main import registry
+
+        monkeypatch.setattr(registry, "draining", True)
+        r = client.post("/debate/run")
+        assert r.status_code == 503
+        assert "retry-after" in r.headers
+
+
+class TestServerTiming:
+    def test_every_response_has_app_timing(self, client):
+        r = client.get("/health")
+        assert r.headers["server-timing"].startswith("app;dur=")
+
+    def test_debate_timings_in_header(self, client):
+        timings = {
+            "opening": {"model_wait_ms": 1500.0, "backoff_ms": 0.0, "pacing_ms": 3000.0, "prompt_ms": 0.25, "state_ms": 1.0},
+            "arbitration": {"model_wait_ms": 2500.0, "backoff_ms": 40.0, "pacing_ms": 2000.0, "prompt_ms": 0.5, "state_ms": 2.0},
+        }
+        with patch("backend.app.main.DebateCoordinator") as MockCoordinator:
+            MockCoordinator.return_value.run_debate = AsyncMock(return_value={"phase": "done", "timings": timings})
+            r = client.post("/debate/run?max_exchange_rounds=2")
+        entries = [e.strip() for e in r.headers["server-timing"].split(",")]
+        assert entries[:5] == [
+            "model_wait;dur=4000.0", "backoff;dur=40.0", "pacing;dur=5000.0", "prompt;dur=0.8", "state;dur=3.0",
+        ]
+        assert "opening.model_wait;dur=1500.0" in entries
+        assert "opening.backoff;dur=0.0" not in entries
+        assert entries[-1].startswith("app;dur=")
+        assert r.json()["timings"] == timings
+
+    def test_profile_requires_profile_dir(self, client, monkeypatch):
+        monkeypatch.setattr("backend.app.main.PROFILE_DIR", "")
+        assert client.post("/debate/run?profile=true").status_code == 400
+        assert client.post("/debate/run", headers={"X-Profile": "1"}).status_code == 400
+
+    def test_profiled_run_writes_profile(self, client, monkeypatch, tmp_path):
+        monkeypatch.setattr("backend.app.main.PROFILE_DIR", str(tmp_path))
+        with patch("backend.app.main.DebateCoordinator") as MockCoordinator:
+            MockCoordinator.return_value.run_debate = AsyncMock(return_value={"phase": "done"})
+            r = client.post("/debate/run", headers={"X-Profile": "1"})
+        assert r.status_code == 200
+        assert r.headers["x-debate-cache"] == "miss"
+        assert r.headers["x-profile"] == f"{r.headers['x-debate-id']}.folded"
+        assert (tmp_path / r.headers["x-profile"]).exists()
@@ -0,0 +1,79 @@
+"""Tests for backend.batch (offline batch runner)."""
+import asyncio
+import io
+import json
+
+import pytest
+
+from backend.batch import completed_ids, load_configs, run_batch
+
+
+def _write_configs(path, entries):
+    path.write_text("\n".join(json.dumps(e) for e in entries) + "\n")
+    return path
+
+
+class TestLoadConfigs:
+    def test_repeat_expands_with_stable_distinct_ids(self, tmp_path):
+        path = _write_configs(tmp_path / "c.jsonl", [{"max_exchange_rounds": 2, "repeat": 3}, {"id": "x"}])
+        configs = load_configs(path, default_model="m")
+        ids = [c["id"] for c in configs]
+        assert len(set(ids)) == 4
+        assert ids[1] == f"{ids[0]}-2"
+        assert ids[3] == "x"
+        assert configs[0] == {"id": ids[0], "max_exchange_rounds": 2, "model": "m", "token_budget": None}
+        assert [c["id"] for c in load_configs(path, default_model="m")] == ids
+
+    def test_custom_panel_kept_in_config(self, tmp_path):
+        path = _write_configs(tmp_path / "c.jsonl", [{"id": "panel", "personas": ["socrates", "ashoka", "lincoln"]}])
+        assert load_configs(path, default_model="m")[0]["personas"] == ["socrates", "ashoka", "lincoln"]
+
+    def test_unsupported_persona_set_rejected(self, tmp_path):
+        path = _write_configs(tmp_path / "c.jsonl", [{"personas": ["napoleon", "caesar"]}])
+        with pytest.raises(ValueError, match="persona set"):
+            load_configs(path)
+
+
+class TestRunBatch:
+    async def test_results_streamed_under_concurrency_cap(self, tmp_path):
+        running = 0
+        peak = 0
+
+        async def run_debate(config):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if config["id"] == "bad":
+                raise RuntimeError("boom")
+            return {"phase": "done", "token_total": {"total_tokens": 100}}
+
+        configs = [{"id": f"d{i}", "max_exchange_rounds": 1} for i in range(5)] + [{"id": "bad"}]
+        progress = io.StringIO()
+        counts = await run_batch(configs, tmp_path / "out.jsonl", 2, run_debate, progress_stream=progress)
+        assert peak == 2
+        assert counts == {"done": 5, "failed": 1, "skipped": 0}
+        records = [json.loads(l) for l in (tmp_path / "out.jsonl").read_text().splitlines()]
+        assert len(records) == 6
+        assert {r["error"] for r in records if r["status"] == "failed"} == {"boom"}
+        assert "debates/min" in progress.getvalue()
+
+    async def test_resume_skips_done_and_retries_failed(self, tmp_path):
+        out = tmp_path / "out.jsonl"
+        out.write_text(
+            json.dumps({"id": "a", "status": "done"}) + "\n"
+            + json.dumps({"id": "b", "status": "failed"}) + "\n"
+            + '{"id": "c", "sta'  # line cut off by a crash
+        )
+        ran = []
+
+        async def run_debate(config):
+            ran.append(config["id"])
+            return {"phase": "done"}
+
+        configs = [{"id": i} for i in "abc"]
+        counts = await run_batch(configs, out, run_debate=run_debate, progress_stream=io.StringIO())
+        assert sorted(ran) == ["b", "c"]
+        assert counts["skipped"] == 1
+        assert completed_ids(out) == {"a", "b", "c"}
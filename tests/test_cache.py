@@ -0,0 +1,92 @@
+"""Tests for backend.app.cache (single-flight coalescing and TTL result cache)."""
+import asyncio
+import pytest
+
+from backend.app.cache import DebateCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _runner(counter):
+    async def run():
+        counter.append(1)
+        await asyncio.sleep(0.01)
+        return {"phase": "done", "messages": [], "run": len(counter)}
+
+    return run
+
+
+class TestCoalescing:
+    async def test_identical_inflight_requests_share_one_debate(self):
+        cache = DebateCache()
+        runs = []
+        results = await asyncio.gather(*(cache.get_or_run("k", _runner(runs)) for _ in range(3)))
+        assert len(runs) == 1
+        assert sorted(status for _, status in results) == ["coalesced", "coalesced", "miss"]
+        states = [state for state, _ in results]
+        assert all(state == states[0] for state in states)
+        assert states[0] is not states[1]  # each caller gets its own copy
+
+    async def test_different_keys_run_separately(self):
+        cache = DebateCache()
+        runs = []
+        await asyncio.gather(cache.get_or_run("a", _runner(runs)), cache.get_or_run("b", _runner(runs)))
+        assert len(runs) == 2
+
+    async def test_failure_reaches_all_waiters_and_is_not_cached(self):
+        cache = DebateCache()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("quota")
+
+        results = await asyncio.gather(
+            cache.get_or_run("k", fail, ttl=60), cache.get_or_run("k", fail, ttl=60), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        runs = []
+        _, status = await cache.get_or_run("k", _runner(runs), ttl=60)
+        assert status == "miss"
+
+
+class TestResultCache:
+    async def test_ttl_hit_then_expiry(self):
+        clock = FakeClock()
+        cache = DebateCache(clock=clock)
+        runs = []
+        await cache.get_or_run("k", _runner(runs), ttl=10)
+        _, status = await cache.get_or_run("k", _runner(runs), ttl=10)
+        assert status == "hit"
+        clock.now = 11
+        _, status = await cache.get_or_run("k", _runner(runs), ttl=10)
+        assert status == "miss"
+        assert len(runs) == 2
+
+    async def test_fresh_skips_cache(self):
+        cache = DebateCache()
+        runs = []
+        await cache.get_or_run("k", _runner(runs), ttl=60)
+        state, status = await cache.get_or_run("k", _runner(runs), ttl=60, fresh=True)
+        assert status == "miss"
+        assert state["run"] == 2
+
+    async def test_zero_ttl_does_not_cache(self):
+        cache = DebateCache()
+        runs = []
+        await cache.get_or_run("k", _runner(runs))
+        await cache.get_or_run("k", _runner(runs))
+        assert len(runs) == 2
+
+    async def test_lru_bound(self):
+        cache = DebateCache(max_entries=2)
+        runs = []
+        for key in ("a", "b", "c"):
+            await cache.get_or_run(key, _runner(runs), ttl=60)
+        _, status = await cache.get_or_run("a", _runner(runs), ttl=60)
+        assert status == "miss"
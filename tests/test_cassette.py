@@ -0,0 +1,70 @@
+"""Tests for backend.agent.cassette (record/replay of model calls)."""
+import pytest
+
+from backend.agent import coordinator as coordinator_module
+from backend.agent.cassette import Cassette, CassetteMiss, ReplayTransport, prompt_key
+from backend.agent.coordinator import DebateCoordinator
+from backend.agent.limiter import AdaptiveLimiter
+
+
+@pytest.fixture(autouse=True)
+def no_pacing(monkeypatch):
+    monkeypatch.setattr(coordinator_module, "TURN_DELAY", 0)
+    monkeypatch.setattr(coordinator_module, "PHASE_DELAY", 0)
+
+
+def _live_transport():
+    calls = []
+
+    async def transport(model, prompt, on_delta):
+        calls.append(prompt)
+        if len(calls) == 2:
+            raise RuntimeError("429 RESOURCE_EXHAUSTED. Please retry in 0.01s.")
+        return f"Reply {len(calls)}.", {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+
+    return transport, calls
+
+
+class TestRecordReplay:
+    async def test_replay_reproduces_recorded_debate_without_adk(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(coordinator_module, "INITIAL_RETRY_DELAY", 0.01)
+        live, calls = _live_transport()
+        cassette = Cassette()
+        recorded = await DebateCoordinator(
+            max_exchange_rounds=1, transport=live, record_to=cassette, limiter=AdaptiveLimiter()
+        ).run_debate()
+        assert len(cassette) == len(calls) == 14  # 13 turns + one rate-limited attempt
+        assert "error" in cassette.entries[1]
+
+        cassette.save(tmp_path / "run.jsonl.gz")
+        replay = ReplayTransport(Cassette.load(tmp_path / "run.jsonl.gz"), time_scale=0)
+        limiter = AdaptiveLimiter()
+        replayed = await DebateCoordinator(
+            max_exchange_rounds=1, transport=replay, limiter=limiter
+        ).run_debate()
+        assert replayed["messages"] == recorded["messages"]
+        assert replayed["token_total"] == recorded["token_total"]
+        assert replay.stats == {"served": 14, "misses": 0, "errors": 1}
+        assert limiter.stats["rate_limited"] == 1
+
+    async def test_unknown_prompt_misses_unless_lenient(self):
+        cassette = Cassette(
+            [{"model": "m", "key": prompt_key("old"), "latency": 0.0, "text": "hi", "usage": {}}]
+        )
+        with pytest.raises(CassetteMiss):
+            await ReplayTransport(cassette, time_scale=0)("m", "new", None)
+        lenient = ReplayTransport(cassette, time_scale=0, strict=False)
+        assert await lenient("m", "new", None) == ("hi", {})
+        assert lenient.stats["misses"] == 1
+
+    async def test_scope_and_scaled_timing(self):
+        cassette = Cassette(
+            [
+                {"model": "m", "key": prompt_key("p"), "latency": 10.0, "text": "a", "usage": {}, "scope": "d1"},
+                {"model": "m", "key": prompt_key("p"), "latency": 0.02, "text": "b", "usage": {}, "scope": "d2"},
+            ]
+        )
+        deltas = []
+        replay = ReplayTransport(cassette, time_scale=0.5, scope="d2")
+        assert await replay("m", "p", deltas.append) == ("b", {})
+        assert deltas == ["b"]
@@ -0,0 +1,75 @@
+"""Tests for backend.columnar (columnar transcript export)."""
+import json
+
+import pytest
+
+from backend.columnar import (
+    FLAG_CONCESSION,
+    PERSONAS,
+    PHASES,
+    Corpus,
+    export,
+    iter_states,
+    read_corpus,
+    write_corpus,
+)
+
+
+def _message(author_id, content, phase="exchange", round_index=1):
+    return {"author_id": author_id, "author_name": author_id.title(), "content": content,
+            "round_index": round_index, "phase": phase}
+
+
+def make_state(rounds=2, conceding=("gandhi",), arbitration="Consensus.", max_rounds=4):
+    messages = [_message(p, f"{p} opens with résumé", "opening", 0) for p in ("napoleon", "gandhi", "alexander")]
+    for r in range(1, rounds + 1):
+        messages += [_message(p, f"{p} argues in round {r}", "exchange", r) for p in ("napoleon", "gandhi", "alexander")]
+    for p in ("napoleon", "gandhi", "alexander"):
+        text = "I now concede that unity needs consent." if p in conceding else "I hold my ground."
+        messages.append(_message(p, text, "reflection", 0))
+    if arbitration:
+        messages.append(_message("arbitrator", arbitration, "arbitration", 0))
+    return {"phase": "done", "messages": messages, "exchange_rounds": rounds,
+            "max_exchange_rounds": max_rounds, "arbitration": arbitration, "budget_exhausted": False}
+
+
+class TestCorpus:
+    def test_round_trip(self, tmp_path):
+        corpus = Corpus()
+        corpus.add_debate("a", make_state(rounds=1))
+        corpus.add_debate("b", make_state(rounds=3, conceding=()))
+        write_corpus(corpus, tmp_path / "c.simcol")
+        loaded = read_corpus(tmp_path / "c.simcol")
+        assert loaded.debate_ids == ["a", "b"]
+        assert len(loaded) == len(corpus) == 10 + 16
+        for name, column in corpus.columns.items():
+            assert loaded.columns[name] == column, name
+        assert loaded.message_text(0) == "napoleon opens with résumé"
+        assert loaded.columns["length"][0] == len("napoleon opens with résumé")
+
+    def test_codes_and_flags(self):
+        corpus = Corpus()
+        corpus.add_debate("a", make_state(rounds=1))
+        reflections = [i for i in range(len(corpus)) if corpus.columns["phase"][i] == PHASES.index("reflection")]
+        flagged = [PERSONAS[corpus.columns["author"][i]] for i in reflections if corpus.columns["flags"][i] & FLAG_CONCESSION]
+        assert flagged == ["gandhi"]
+
+    def test_rejects_other_files(self, tmp_path):
+        (tmp_path / "x").write_bytes(b"not a corpus")
+        with pytest.raises(ValueError):
+            read_corpus(tmp_path / "x")
+
+
+class TestExport:
+    def test_reads_batch_records_and_states(self, tmp_path):
+        batch = tmp_path / "results.jsonl"
+        batch.write_text(
+            json.dumps({"id": "ok", "status": "done", "state": make_state()}) + "\n"
+            + json.dumps({"id": "bad", "status": "failed", "state": None}) + "\n"
+        )
+        states = tmp_path / "states.json"
+        states.write_text(json.dumps([make_state()]))
+        assert [i for i, _ in iter_states(batch)] == ["ok"]
+        corpus = export([batch, states], tmp_path / "c.simcol")
+        assert corpus.debate_ids == ["ok", "states-0"]
+        assert read_corpus(tmp_path / "c.simcol").debate_ids == ["ok", "states-0"]
@@ -0,0 +1,369 @@
+"""Tests for backend.agent.coordinator (ADK runner replaced by a fake)."""
+import asyncio
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+
+from backend.agent import coordinator as coordinator_module
+from backend.agent.context_cache import LocalContextCache
+from backend.agent.coordinator import DebateCoordinator, _extract_usage
+from backend.agent.limiter import AdaptiveLimiter
+from backend.tools import create_initial_state
+
+
+def _usage(prompt, completion):
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+@pytest.fixture
+def fake_adk(monkeypatch):
+    """Make DebateCoordinator constructible without ADK and skip the pacing sleeps."""
+    session_service = MagicMock()
+    session_service.create_session = AsyncMock()
+    monkeypatch.setattr(coordinator_module, "_ADK_AVAILABLE", True)
+    monkeypatch.setattr(
+        coordinator_module, "Agent", MagicMock(side_effect=lambda model, name: MagicMock(model=model))
+    )
+    monkeypatch.setattr(
+        coordinator_module, "Runner", MagicMock(side_effect=lambda agent, **kwargs: MagicMock(agent=agent))
+    )
+    monkeypatch.setattr(coordinator_module, "InMemorySessionService", MagicMock(return_value=session_service))
+    monkeypatch.setattr(coordinator_module, "TURN_DELAY", 0)
+    monkeypatch.setattr(coordinator_module, "PHASE_DELAY", 0)
+
+
+def _fake_agent(usage_per_turn=(100, 20)):
+    """Fake _run_agent_for_prompt that echoes a short reply with fixed usage."""
+    calls = []
+
+    async def run(runner, user_id, session_id, prompt, *args, **kwargs):
+        calls.append(prompt)
+        return f"Reply {len(calls)}.", _usage(*usage_per_turn)
+
+    return run, calls
+
+
+class TestExtractUsage:
+    def test_sums_final_events_and_skips_partials(self):
+        meta = MagicMock(prompt_token_count=12, candidates_token_count=8, total_token_count=20)
+        final = MagicMock(partial=False, usage_metadata=meta)
+        partial = MagicMock(partial=True, usage_metadata=meta)
+        no_usage = MagicMock(partial=False, usage_metadata=None)
+        assert _extract_usage([partial, no_usage, final]) == _usage(12, 8)
+
+    def test_missing_total_falls_back_to_sum(self):
+        meta = MagicMock(prompt_token_count=5, candidates_token_count=None, total_token_count=None)
+        assert _extract_usage([MagicMock(partial=False, usage_metadata=meta)]) == _usage(5, 0)
+
+
+class TestTokenAccounting:
+    async def test_usage_summed_per_phase_and_debate(self, fake_adk):
+        run, calls = _fake_agent()
+        with patch.object(coordinator_module, "_run_agent_for_prompt", run):
+            coordinator = DebateCoordinator(max_exchange_rounds=2)
+            state = await coordinator.run_debate()
+        # 3 openings + 3 defences + 2*3 exchanges + 3 reflections + 1 arbitration
+        assert len(calls) == 16
+        assert state["token_usage"]["exchange"]["total_tokens"] == 6 * 120
+        assert state["token_usage"]["arbitration"]["total_tokens"] == 120
+        assert state["token_total"] == _usage(1600, 320)
+        assert coordinator.metrics["turns"] == 16
+        assert coordinator.metrics["token_total"] == state["token_total"]
+        assert state["budget_exhausted"] is False
+
+    async def test_budget_cuts_exchange_short_and_arbitrates(self, fake_adk):
+        run, calls = _fake_agent()
+        with patch.object(coordinator_module, "_run_agent_for_prompt", run):
+            # Openings + defences cost 720; one round (360) + arbitration reserve (120) fits 1300.
+            coordinator = DebateCoordinator(max_exchange_rounds=4, token_budget=1300)
+            state = await coordinator.run_debate()
+        assert state["budget_exhausted"] is True
+        assert coordinator.metrics["budget_exhausted"] is True
+        phases = [m["phase"] for m in state["messages"]]
+        assert phases.count("exchange") == 3
+        assert "reflection" not in phases
+        assert phases[-1] == "arbitration"
+        assert state["phase"] == "done"
+        assert state["token_total"]["total_tokens"] <= 1300
+
+
+class TestStreaming:
+    async def test_stream_debate_yields_tagged_deltas_then_messages(self, fake_adk):
+        async def run(runner, user_id, session_id, prompt, on_delta=None):
+            assert on_delta is not None
+            on_delta("Hello ")
+            on_delta("world.")
+            return "Hello world.", _usage(10, 2)
+
+        with patch.object(coordinator_module, "_run_agent_for_prompt", run):
+            coordinator = DebateCoordinator(max_exchange_rounds=1)
+            events = [e async for e in coordinator.stream_debate()]
+
+        first_delta, second_delta, first_message = events[0], events[1], events[2]
+        assert first_delta == {
+            "type": "delta", "persona_id": "napoleon", "phase": "opening", "round_index": 0, "text": "Hello ",
+        }
+        assert second_delta["text"] == "world."
+        assert first_message["type"] == "message"
+        assert first_message["content"] == "Hello world."
+        exchange_deltas = [e for e in events if e["type"] == "delta" and e["phase"] == "exchange"]
+        assert {e["round_index"] for e in exchange_deltas} == {1}
+        assert events[-1]["type"] == "done"
+        assert events[-1]["state"]["phase"] == "done"
+
+    async def test_stream_debate_reports_error(self, fake_adk):
+        async def run(*args, **kwargs):
+            raise ValueError("boom")
+
+        with patch.object(coordinator_module, "_run_agent_for_prompt", run):
+            coordinator = DebateCoordinator(max_exchange_rounds=1)
+            events = [e async for e in coordinator.stream_debate()]
+        assert events == [{"type": "error", "detail": "boom"}]
+
+    async def test_run_debate_without_subscriber_does_not_stream(self, fake_adk):
+        async def run(runner, user_id, session_id, prompt, on_delta=None):
+            assert on_delta is None
+            return "Fine.", _usage(1, 1)
+
+        with patch.object(coordinator_module, "_run_agent_for_prompt", run):
+            state = await DebateCoordinator(max_exchange_rounds=1).run_debate()
+        assert state["phase"] == "done"
+
+
+class TestRateLimiting:
+    async def test_rate_limit_is_reported_to_shared_limiter_and_retried(self, fake_adk):
+        from backend.agent.limiter import AdaptiveLimiter
+
+        limiter = AdaptiveLimiter(initial_limit=4)
+        attempts = 0
+
+        async def run(runner, user_id, session_id, prompt, on_delta=None):
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise RuntimeError("429 RESOURCE_EXHAUSTED. Please retry in 0.01s")
+            return "Ok.", _usage(1, 1)
+
+        with patch.object(coordinator_module, "_run_agent_for_prompt", run), \
+                patch.object(coordinator_module, "INITIAL_RETRY_DELAY", 0.01):
+            coordinator = DebateCoordinator(limiter=limiter)
+            text, _, model = await coordinator._run_turn("prompt")
+        assert text == "Ok."
+        assert limiter.stats["rate_limited"] == 1
+        assert limiter.stats["successes"] == 1
+        assert limiter.limit == 2
+
+    def test_retry_delay_prefers_longer_provider_hint(self):
+        assert coordinator_module._retry_delay("429 retry in 20s", 0) == 20.0
+        assert coordinator_module._retry_delay("429", 1) == coordinator_module.INITIAL_RETRY_DELAY * 2
+
+
+class TestModelRouting:
+    async def test_phases_routed_to_bulk_model_and_recorded(self, fake_adk):
+        models = []
+
+        async def run(runner, user_id, session_id, prompt, on_delta=None):
+            models.append(runner.agent.model)
+            return "Ok.", _usage(1, 1)
+
+        with patch.object(coordinator_module, "_run_agent_for_prompt", run):
+            coordinator = DebateCoordinator(
+                model="strong", max_exchange_rounds=1, routes=coordinator_module.bulk_routes("cheap")
+            )
+            state = await coordinator.run_debate()
+        assert models[:-1] == ["cheap"] * 12
+        assert models[-1] == "strong"
+        assert state["routes"][-1] == {
+            "phase": "arbitration", "persona_id": "arbitrator", "round_index": 0, "model": "strong", "fallback": False,
+        }
+        assert coordinator.metrics["routes"] == {"cheap": 12, "strong": 1}
+        assert coordinator.metrics["fallbacks"] == 0
+
+    async def test_quota_exhaustion_falls_back_without_sleeping(self, fake_adk):
+        from backend.agent.limiter import AdaptiveLimiter
+
+        models = []
+
+        async def run(runner, user_id, session_id, prompt, on_delta=None):
+            models.append(runner.agent.model)
+            if runner.agent.model == "primary":
+                raise RuntimeError("429 RESOURCE_EXHAUSTED. Please retry in 30s")
+            return "Ok.", _usage(1, 1)
+
+        limiters = {"primary": AdaptiveLimiter(), "backup": AdaptiveLimiter()}
+        with patch.object(coordinator_module, "_run_agent_for_prompt", run), \
+                patch.object(coordinator_module, "get_shared_limiter", limiters.__getitem__):
+            coordinator = DebateCoordinator(model="primary", fallback_model="backup")
+            state = coordinator_module.create_initial_state()
+            text, state = await asyncio.wait_for(
+                coordinator._generate(state, "opening", "prompt", "napoleon"), timeout=1
+            )
+        assert text == "Ok."
+        assert models == ["primary", "backup"]
+        assert state["routes"][0]["model"] == "backup"
+        assert state["routes"][0]["fallback"] is True
+        assert coordinator.metrics["fallbacks"] == 1
+        assert limiters["primary"].retry_after() > 0
+
+
+class TestHedging:
+    async def test_slow_call_is_hedged_and_duplicate_wins(self, fake_adk):
+        from backend.agent.limiter import AdaptiveLimiter
+
+        calls = 0
+
+        async def run(runner, user_id, session_id, prompt, on_delta=None):
+            nonlocal calls
+            calls += 1
+            # The 6th call (first of the last turn) straggles; its duplicate is fast
+            await asyncio.sleep(1.0 if calls == 6 else 0.01)
+            return f"Reply {calls}.", _usage(1, 1)
+
+        with patch.object(coordinator_module, "_run_agent_for_prompt", run):
+            coordinator = DebateCoordinator(
+                limiter=AdaptiveLimiter(), hedge_percentile=0.9, hedge_budget=0.5
+            )
+            for _ in range(5):
+                await coordinator._run_turn("warm up")
+            text, _, _ = await asyncio.wait_for(coordinator._run_turn("slow"), timeout=0.5)
+        assert text == "Reply 7."
+        hedging = coordinator.metrics["hedging"]
+        assert hedging["calls"] == 6
+        assert hedging["hedged"] == 1
+        assert hedging["hedge_wins"] == 1
+        assert hedging["hedge_rate"] == pytest.approx(1 / 6, abs=1e-3)
+
+    async def test_no_hedging_by_default(self, fake_adk):
+        from backend.agent.limiter import AdaptiveLimiter
+
+        async def run(runner, user_id, session_id, prompt, on_delta=None):
+            await asyncio.sleep(0.01)
+            return "Ok.", _usage(1, 1)
+
+        with patch.object(coordinator_module, "_run_agent_for_prompt", run):
+            coordinator = DebateCoordinator(limiter=AdaptiveLimiter())
+            for _ in range(8):
+                await coordinator._run_turn("prompt")
+        assert coordinator.metrics["hedging"]["hedged"] == 0
+
+
+class TestPanel:
+    async def test_phases_scale_to_the_panel(self, fake_adk):
+        run, calls = _fake_agent()
+        panel = ["socrates", "confucius", "machiavelli", "mandela", "lincoln"]
+        with patch.object(coordinator_module, "_run_agent_for_prompt", run):
+            state = await DebateCoordinator(max_exchange_rounds=2, debaters=panel).run_debate()
+        assert len(calls) == coordinator_module.expected_turns(2, len(panel)) == 26
+        assert state["debaters"] == panel
+        assert [m["author_id"] for m in state["messages"] if m["phase"] == "opening"] == panel
+        assert set(state["reflections"]) == set(panel)
+
+    def test_invalid_panel_rejected_up_front(self, fake_adk):
+        with pytest.raises(ValueError):
+            DebateCoordinator(debaters=["socrates", "caesar"])
+
+
+class TestContextCache:
+    async def test_turns_in_a_phase_reuse_the_shared_prefix(self, fake_adk):
+        prompts = []
+
+        async def transport(model, prompt, on_delta):
+            prompts.append(prompt)
+            return f"Reply {len(prompts)}.", _usage(100, 20)
+
+        cache = LocalContextCache()
+        coordinator = DebateCoordinator(
+            max_exchange_rounds=2, transport=transport, limiter=AdaptiveLimiter(), context_cache=cache
+        )
+        await coordinator.run_debate()
+        stats = coordinator.metrics["context_cache"]
+        # Defence, two exchange rounds and reflection: one miss then two hits each;
+        # arbitration shares the reflections' prefix
+        assert (stats["lookups"], stats["hits"]) == (13, 9)
+        assert stats["hit_ratio"] == round(9 / 13, 3)
+        assert 0 < stats["cached_fraction"] < 1
+        assert cache.snapshot()["created"] == 4
+        openings, defences = prompts[:3], prompts[3:6]
+        assert all(p.cache is None for p in openings)
+        assert len({p.cache.name for p in defences}) == 1
+        assert all(p.suffix.startswith("\nYou are ") for p in defences)
+
+    def test_local_cache_expires_and_evicts(self):
+        now = [0.0]
+        cache = LocalContextCache(ttl=10, max_entries=2, min_chars=3, clock=lambda: now[0])
+
+        async def run():
+            assert await cache.acquire("m", "ab") == (None, False)
+            first, hit = await cache.acquire("m", "prefix")
+            assert not hit
+            assert await cache.acquire("m", "prefix") == (first, True)
+            assert (await cache.acquire("other", "prefix"))[1] is False
+            now[0] = 11
+            assert (await cache.acquire("m", "prefix"))[1] is False
+            await cache.acquire("m", "third")
+            return cache.snapshot()
+
+        snapshot = asyncio.run(run())
+        assert snapshot == {"entries": 2, "lookups": 5, "hits": 1, "hit_ratio": 0.2, "created": 4, "evicted": 2}
+
+
+class TestResume:
+    async def test_resume_from_checkpoint_skips_recorded_turns(self, fake_adk):
+        calls = []
+
+        async def crash_after_eight(runner, user_id, session_id, prompt, on_delta=None):
+            calls.append(prompt)
+            if len(calls) > 8:
+                raise asyncio.CancelledError()
+            return f"Reply {len(calls)}.", _usage(100, 20)
+
+        first = DebateCoordinator(max_exchange_rounds=2)
+        with patch.object(coordinator_module, "_run_agent_for_prompt", crash_after_eight):
+            with pytest.raises(asyncio.CancelledError):
+                await first.run_debate()
+        checkpoint = first.state
+        # 3 openings, 3 defences, 2 of round 1's exchanges
+        assert len(checkpoint["messages"]) == 8
+
+        run, resumed_calls = _fake_agent()
+        with patch.object(coordinator_module, "_run_agent_for_prompt", run):
+            state = await DebateCoordinator(max_exchange_rounds=2).run_debate(state=checkpoint)
+        assert len(resumed_calls) == 16 - 8
+        rounds = [(m["author_id"], m["round_index"]) for m in state["messages"] if m["phase"] == "exchange"]
+        assert len(rounds) == len(set(rounds)) == 6
+        assert state["phase"] == "done"
+        assert state["token_total"]["total_tokens"] == 16 * 120
+
+    async def test_finished_state_is_returned_unchanged(self, fake_adk):
+        run, calls = _fake_agent()
+        with patch.object(coordinator_module, "_run_agent_for_prompt", run):
+            done = await DebateCoordinator(max_exchange_rounds=1).run_debate()
+            again = await DebateCoordinator(max_exchange_rounds=1).run_debate(state=done)
+        assert again == done
+        assert len(calls) == 13
+
+
+class TestTimings:
+    async def test_time_split_per_phase_into_state(self, fake_adk):
+        from backend.agent.limiter import AdaptiveLimiter
+
+        async def slow_transport(model, prompt, on_delta):
+            await asyncio.sleep(0.01)
+            return "Reply.", _usage(100, 20)
+
+        coordinator = DebateCoordinator(max_exchange_rounds=1, transport=slow_transport, limiter=AdaptiveLimiter())
+        state = await coordinator.run_debate()
+        timings = state["timings"]
+        assert list(timings) == ["opening", "defence", "exchange", "reflection", "arbitration"]
+        assert set(timings["exchange"]) == {"model_wait_ms", "backoff_ms", "pacing_ms", "prompt_ms", "state_ms"}
+        # 13 turns of at least 10 ms each
+        assert coordinator.timings.total("model_wait") >= 130
+        assert all(t["model_wait_ms"] >= 10 and t["state_ms"] > 0 for t in timings.values())
+        assert timings["defence"]["prompt_ms"] > 0
+
+    async def test_resumed_debate_continues_recorded_timings(self, fake_adk):
+        run, _ = _fake_agent()
+        checkpoint = {"opening": {"model_wait_ms": 5000.0}}
+        with patch.object(coordinator_module, "_run_agent_for_prompt", run):
+            resumed = {**create_initial_state(max_exchange_rounds=1), "timings": checkpoint}
+            state = await DebateCoordinator(max_exchange_rounds=1).run_debate(state=resumed)
+        assert state["timings"]["opening"]["model_wait_ms"] >= 5000.0
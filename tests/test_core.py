@@ -2,23 +2,24 @@
 import pytest
 from backend.core import Persona, PersonaId, DebateState, DebateRound, RoundPhase
 from backend.core.debate import DebateMessage
+from backend.core.persona import PERSONA_REGISTRY, _read_config
 
 
 class TestPersona:
     def test_napoleon_philosophy(self):
-        p = Persona.napoleon()
+        p = PERSONA_REGISTRY.get(PersonaId.NAPOLEON)
         assert p.id == PersonaId.NAPOLEON
         assert p.name == "Napoleon"
         assert "benevolence" in p.philosophy.lower()
         assert "single kingdom" in p.philosophy.lower()
 
     def test_gandhi_philosophy(self):
-        p = Persona.gandhi()
+        p = PERSONA_REGISTRY.get(PersonaId.GANDHI)
         assert p.id == PersonaId.GANDHI
         assert "non-violence" in p.philosophy.lower() or "peace" in p.philosophy.lower()
 
     def test_alexander_philosophy(self):
-        p = Persona.alexander()
+        p = PERSONA_REGISTRY.get(PersonaId.ALEXANDER)
         assert p.id == PersonaId.ALEXANDER
         assert "conquest" in p.philosophy.lower() or "ambition" in p.philosophy.lower()
 
@@ -41,6 +42,34 @@ class TestPersona:
             p = Persona.get(pid)
             assert p.id == pid
 
+    def test_get_returns_shared_instance_with_prompt_prefix(self):
+        p = Persona.get(PersonaId.GANDHI)
+        assert Persona.get(PersonaId.GANDHI) is p
+        assert p.prompt_prefix == f"You are Gandhi. Your view: {p.philosophy}. "
+
+
+class TestPersonaRegistry:
+    def test_registry_has_panel_personas_beyond_defaults(self):
+        assert len(PERSONA_REGISTRY.debater_ids) >= 10
+        assert PersonaId.ARBITRATOR not in PERSONA_REGISTRY.debater_ids
+        assert PersonaId("socrates") in PERSONA_REGISTRY.debater_ids
+
+    def test_panel_validation(self):
+        assert PERSONA_REGISTRY.panel(None) == [PersonaId.NAPOLEON, PersonaId.GANDHI, PersonaId.ALEXANDER]
+        assert PERSONA_REGISTRY.panel(["socrates", "gandhi"]) == [PersonaId("socrates"), PersonaId.GANDHI]
+        for bad in (["socrates"], ["socrates", "socrates"], ["caesar", "gandhi"], ["arbitrator", "gandhi"]):
+            with pytest.raises(ValueError):
+                PERSONA_REGISTRY.panel(bad)
+
+    def test_config_requires_arbitrator_and_identifier_ids(self, tmp_path):
+        path = tmp_path / "personas.json"
+        path.write_text('{"personas": [{"id": "a", "name": "A", "philosophy": "x"}]}')
+        with pytest.raises(ValueError, match="arbitrator"):
+            _read_config(path)
+        path.write_text('{"personas": [{"id": "Big Name", "name": "A", "philosophy": "x"}]}')
+        with pytest.raises(ValueError, match="identifiers"):
+            _read_config(path)
+
 
 class TestDebateState:
     def test_initial_phase(self):
@@ -78,3 +107,35 @@ class TestDebateState:
         block = state.openings_text()
         assert "napoleon" in block.lower() or "N opening" in block
         assert "gandhi" in block.lower() or "G opening" in block
+
+
+class TestDebateMessage:
+    def _fields(self, **overrides):
+        return {"author_id": "napoleon", "author_name": "Napoleon", "content": "One world.", "phase": "opening", **overrides}
+
+    def test_slotted(self):
+        message = DebateMessage(**self._fields())
+        assert not hasattr(message, "__dict__")
+        assert message.author_id is PersonaId.NAPOLEON and message.phase is RoundPhase.OPENING
+
+    @pytest.mark.parametrize("overrides", [{"author_id": "caesar"}, {"round_index": -1}, {"content": None}])
+    def test_constructor_validates(self, overrides):
+        with pytest.raises(ValueError):
+            DebateMessage(**self._fields(**overrides))
+
+    def test_state_validates_message_dicts(self):
+        state = DebateState(messages=[self._fields(round_index=2)])
+        assert state.messages == [DebateMessage(**self._fields(round_index=2))]
+        with pytest.raises(ValueError, match="author_name"):
+            DebateState(messages=[{"author_id": "napoleon", "content": "x", "phase": "opening"}])
+
+    def test_json_round_trip_shares_author_names(self):
+        state = DebateState(messages=[self._fields(), self._fields(content="Again.")])
+        loaded = DebateState.model_validate_json(state.model_dump_json())
+        assert loaded.messages == state.messages
+        assert loaded.messages[0].author_name is loaded.messages[1].author_name
+        assert state.model_dump()["messages"][0] == {**self._fields(), "round_index": 0}
+
+    def test_model_construct_trusts_values(self):
+        message = DebateMessage.model_construct(**self._fields(round_index=-1))
+        assert message.round_index == -1 and message.author_id is PersonaId.NAPOLEON
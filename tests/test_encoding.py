@@ -0,0 +1,85 @@
+"""Tests for backend.app.encoding (fast JSON and negotiated compression)."""
+import gzip
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.encoding import (
+    CompressionMiddleware,
+    FastJSONResponse,
+    available_encodings,
+    dumps,
+    negotiate,
+)
+from backend.core import DebateState, PersonaId, RoundPhase
+from backend.tools.debate_tools import _state_to_dict
+
+
+def _state(n=3):
+    state = DebateState()
+    for i in range(n):
+        state.add_message(PersonaId.GANDHI, "Gandhi", f"Message {i} " * 20, RoundPhase.OPENING)
+    return state
+
+
+class TestDumps:
+    def test_debate_state_matches_state_dict(self):
+        state = _state()
+        assert json.loads(dumps(state)) == _state_to_dict(state)
+
+    def test_dict_with_nested_model(self):
+        state = _state(1)
+        assert json.loads(dumps({"state": state, "n": 1})) == {"state": _state_to_dict(state), "n": 1}
+
+
+class TestNegotiate:
+    def test_prefers_first_available_on_tie(self):
+        assert negotiate("gzip, zstd", ["zstd", "gzip"]) == "zstd"
+        assert negotiate("gzip, deflate, br") == "gzip"
+
+    def test_q_values_and_refusals(self):
+        assert negotiate("zstd;q=0.5, gzip", ["zstd", "gzip"]) == "gzip"
+        assert negotiate("gzip;q=0", ["gzip"]) is None
+        assert negotiate("*", ["gzip"]) == "gzip"
+        assert negotiate("", ["gzip"]) is None
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/state", response_class=FastJSONResponse)
+    def state():
+        return FastJSONResponse(_state(20))
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    return app
+
+
+class TestCompressionMiddleware:
+    def test_large_response_is_compressed(self):
+        client = TestClient(_app())
+        r = client.get("/state", headers={"Accept-Encoding": "gzip"})
+        assert r.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in r.headers["vary"].lower()
+        assert int(r.headers["content-length"]) < len(dumps(_state(20)))
+        assert r.json() == _state_to_dict(_state(20))  # httpx decodes gzip
+
+    def test_raw_body_is_valid_gzip(self):
+        client = TestClient(_app())
+        with client.stream("GET", "/state", headers={"Accept-Encoding": "gzip"}) as r:
+            raw = b"".join(r.iter_raw())
+        assert json.loads(gzip.decompress(raw)) == _state_to_dict(_state(20))
+
+    def test_small_or_unaccepted_responses_are_not_compressed(self):
+        client = TestClient(_app())
+        assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+        r = client.get("/state", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in r.headers
+
+    def test_gzip_always_available(self):
+        assert "gzip" in available_encodings()
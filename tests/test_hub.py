@@ -0,0 +1,74 @@
+"""Tests for backend.app.hub (pub/sub fan-out with bounded buffers)."""
+import asyncio
+
+import pytest
+
+from backend.app.hub import Hub, Subscription, SubscriptionClosed
+
+
+def _delta(text, persona="gandhi", round_index=1):
+    return {"type": "delta", "persona_id": persona, "phase": "exchange", "round_index": round_index, "text": text}
+
+
+class TestSubscription:
+    async def test_fans_out_only_subscribed_debates(self):
+        hub = Hub()
+        a, b = hub.connect(), hub.connect()
+        hub.subscribe(a, "d1")
+        hub.subscribe(a, "d2")
+        hub.subscribe(b, "d2")
+        hub.publish("d1", {"type": "phase", "phase": "defence"})
+        hub.publish("d2", {"type": "message", "content": "hi"})
+        assert await a.get() == ("d1", {"type": "phase", "phase": "defence"})
+        assert (await a.get())[0] == "d2"
+        assert await b.get() == ("d2", {"type": "message", "content": "hi"})
+        assert len(b) == 0
+
+    async def test_get_waits_for_publish(self):
+        hub = Hub()
+        sub = hub.connect()
+        hub.subscribe(sub, "d1")
+        waiter = asyncio.create_task(sub.get())
+        await asyncio.sleep(0)
+        hub.publish("d1", {"type": "phase", "phase": "exchange"})
+        assert (await asyncio.wait_for(waiter, 1))[1]["phase"] == "exchange"
+
+    def test_deltas_of_one_turn_are_merged(self):
+        sub = Subscription(maxsize=4)
+        sub.offer("d1", _delta("Hello "))
+        sub.offer("d1", _delta("world"))
+        sub.offer("d1", _delta("!", persona="napoleon"))
+        assert len(sub) == 2
+        assert sub._buffer[0][1]["text"] == "Hello world"
+
+    def test_full_buffer_drops_oldest_delta(self):
+        sub = Subscription(maxsize=2)
+        sub.offer("d1", _delta("a", round_index=1))
+        sub.offer("d1", {"type": "message", "content": "a"})
+        assert sub.offer("d1", {"type": "message", "content": "b"})
+        assert sub.dropped == 1
+        assert [e["type"] for _, e in sub._buffer] == ["message", "message"]
+
+    async def test_slow_consumer_is_dropped(self):
+        hub = Hub(buffer_size=2)
+        sub = hub.connect()
+        hub.subscribe(sub, "d1")
+        for i in range(3):
+            hub.publish("d1", {"type": "message", "content": str(i)})
+        assert sub.closed_reason == "slow consumer"
+        assert hub.snapshot()["slow_consumers"] == 1
+        assert hub.snapshot()["subscriptions"] == 0
+        with pytest.raises(SubscriptionClosed):
+            await sub.get()
+
+    def test_unsubscribe_and_disconnect(self):
+        hub = Hub()
+        sub = hub.connect()
+        hub.subscribe(sub, "d1")
+        hub.subscribe(sub, "d2")
+        hub.unsubscribe(sub, "d1")
+        hub.publish("d1", {"type": "phase", "phase": "defence"})
+        assert len(sub) == 0
+        hub.disconnect(sub)
+        assert hub.snapshot()["debates"] == 0
+        assert sub.closed
@@ -0,0 +1,141 @@
+"""Tests for backend.app.jobs (drain, checkpoint and resume)."""
+import asyncio
+import json
+
+from backend.app.jobs import CHECKPOINTED, DONE, FAILED, DebateRegistry, transcript_page
+from backend.core import MessageSegment
+from backend.core import segment as segment_module
+
+
+class FakeCoordinator:
+    """Runs until released; exposes a partial state like DebateCoordinator."""
+
+    def __init__(self, state=None):
+        self.state = state or {"phase": "opening", "messages": [{"content": "partial"}]}
+        self.release = asyncio.Event()
+        self.resumed_from = None
+
+    async def run_debate(self, on_event=None, state=None):
+        self.resumed_from = state
+        await self.release.wait()
+        return {"phase": "done", "messages": []}
+
+
+async def _run(registry, coordinator, params=None):
+    async with registry.track(params or {"max_exchange_rounds": 2}, coordinator) as job:
+        job.result = await coordinator.run_debate()
+        return job.result
+
+
+class TestDrain:
+    async def test_finished_within_grace_is_not_checkpointed(self, tmp_path):
+        registry = DebateRegistry(tmp_path)
+        coordinator = FakeCoordinator()
+        task = asyncio.create_task(_run(registry, coordinator))
+        await asyncio.sleep(0)
+        asyncio.get_running_loop().call_later(0.01, coordinator.release.set)
+        assert await registry.drain(grace_seconds=1) == []
+        assert (await task)["phase"] == "done"
+        assert registry.draining is True
+        assert list(tmp_path.iterdir()) == []
+
+    async def test_unfinished_debate_checkpointed_and_cancelled(self, tmp_path):
+        registry = DebateRegistry(tmp_path)
+        task = asyncio.create_task(_run(registry, FakeCoordinator(), {"max_exchange_rounds": 3}))
+        await asyncio.sleep(0)
+        [debate_id] = await registry.drain(grace_seconds=0.01)
+        await asyncio.gather(task, return_exceptions=True)
+        assert task.cancelled()
+        assert registry.get(debate_id).status == CHECKPOINTED
+        saved = json.loads((tmp_path / f"{debate_id}.json").read_text())
+        assert saved["params"] == {"max_exchange_rounds": 3}
+        assert saved["state"]["messages"] == [{"content": "partial"}]
+
+    async def test_debate_without_state_is_failed_not_checkpointed(self, tmp_path):
+        registry = DebateRegistry(tmp_path)
+        coordinator = FakeCoordinator()
+        coordinator.state = None
+        task = asyncio.create_task(_run(registry, coordinator))
+        await asyncio.sleep(0)
+        [job] = registry._running.values()
+        assert await registry.drain(grace_seconds=0.01) == []
+        await asyncio.gather(task, return_exceptions=True)
+        assert registry.lookup(job.id)["status"] == FAILED
+        assert registry.lookup(job.id)["error"] == "shutdown before first turn"
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestTrack:
+    async def test_failure_reported_by_the_block_keeps_the_checkpoint(self, tmp_path):
+        registry = DebateRegistry(tmp_path)
+        (tmp_path / "abc.json").write_text("{}")
+        async with registry.track({}, FakeCoordinator(), debate_id="abc") as job:
+            job.fail("model exploded")
+        assert registry.lookup("abc")["status"] == FAILED
+        assert registry.lookup("abc")["error"] == "model exploded"
+        assert (tmp_path / "abc.json").exists()
+
+
+class TestResume:
+    async def test_checkpoint_resumed_under_same_id_and_removed(self, tmp_path):
+        state = {"phase": "exchange", "messages": [{"content": "partial"}]}
+        (tmp_path / "abc.json").write_text(
+            json.dumps({"debate_id": "abc", "params": {"max_exchange_rounds": 2}, "state": state})
+        )
+        (tmp_path / "broken.json").write_text("{not json")
+        registry = DebateRegistry(tmp_path)
+        built = []
+
+        def make_coordinator(params):
+            built.append(params)
+            coordinator = FakeCoordinator()
+            coordinator.release.set()
+            return coordinator
+
+        tasks = registry.resume_all(make_coordinator)
+        await asyncio.gather(*tasks)
+        job = registry.get("abc")
+        assert built == [{"max_exchange_rounds": 2}]
+        assert job.status == DONE
+        assert job.coordinator.resumed_from == state
+        assert job.to_dict()["state"]["phase"] == "done"
+        assert not (tmp_path / "abc.json").exists()
+
+
+class TestTranscriptPage:
+    def _record(self, n, status="running"):
+        messages = [{"author_id": "gandhi", "content": f"m{i}"} for i in range(n)]
+        return {"debate_id": "d1", "status": status, "state": {"messages": messages}}
+
+    def test_pages_with_cursor(self):
+        page = transcript_page(self._record(5), since=0, limit=2)
+        assert [m["content"] for m in page["messages"]] == ["m0", "m1"]
+        assert page["cursor"] == 2 and page["total"] == 5 and page["has_more"]
+        page = transcript_page(self._record(5), since=page["cursor"], limit=10)
+        assert [m["content"] for m in page["messages"]] == ["m2", "m3", "m4"]
+        assert page["cursor"] == 5 and not page["has_more"]
+
+    def test_since_past_end_is_empty(self):
+        page = transcript_page(self._record(2), since=7)
+        assert page["messages"] == [] and page["cursor"] == 2
+
+    def test_no_state_yet(self):
+        page = transcript_page({"debate_id": "d1", "status": "running", "state": None})
+        assert page["messages"] == [] and page["total"] == 0
+
+    def test_etag_changes_on_new_messages_or_status(self):
+        etag = transcript_page(self._record(3), since=3)["etag"]
+        assert transcript_page(self._record(3), since=3)["etag"] == etag
+        assert transcript_page(self._record(4), since=3)["etag"] != etag
+        assert transcript_page(self._record(3, status="done"), since=3)["etag"] != etag
+
+    def test_pages_over_spilled_messages(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(segment_module, "_spill_dir", tmp_path)
+        messages = self._record(5)["state"]["messages"]
+        MessageSegment.open("s").append(messages[:3])
+        record = {"debate_id": "d1", "status": "running",
+                  "state": {"segment": {"id": "s", "count": 3}, "messages": messages[3:]}}
+        page = transcript_page(record, since=1, limit=3)
+        assert [m["content"] for m in page["messages"]] == ["m1", "m2", "m3"]
+        assert page["cursor"] == 4 and page["total"] == 5 and page["has_more"]
+        assert transcript_page(record, since=4)["messages"] == messages[4:]
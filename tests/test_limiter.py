@@ -0,0 +1,177 @@
+"""Tests for backend.agent.limiter (adaptive concurrency and circuit breaker)."""
+import asyncio
+import pytest
+
+from backend.agent.limiter import AdaptiveLimiter, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestAimd:
+    def test_success_increases_limit_additively(self, clock):
+        limiter = AdaptiveLimiter(initial_limit=2, max_limit=4, clock=clock)
+        for _ in range(4):
+            limiter.record_success(1.0)
+        assert limiter.limit == 3
+        for _ in range(20):
+            limiter.record_success(1.0)
+        assert limiter.limit == 4  # capped
+
+    def test_rate_limit_halves_limit_once_per_window(self, clock):
+        limiter = AdaptiveLimiter(initial_limit=8, clock=clock)
+        limiter.record_rate_limited(2.0)
+        limiter.record_rate_limited(2.0)  # same burst: no second decrease
+        assert limiter.limit == 4
+        clock.now += 5
+        limiter.record_rate_limited(2.0)
+        assert limiter.limit == 2
+
+    def test_latency_spike_counts_as_congestion(self, clock):
+        limiter = AdaptiveLimiter(initial_limit=8, clock=clock)
+        limiter.record_success(1.0)
+        limiter.record_success(10.0)
+        assert limiter.limit == 4
+
+    def test_rate_limit_sets_shared_retry_after(self, clock):
+        limiter = AdaptiveLimiter(clock=clock)
+        limiter.record_rate_limited(7.0)
+        assert limiter.retry_after() == pytest.approx(7.0)
+        clock.now += 7
+        assert limiter.retry_after() == 0
+
+
+class TestCircuit:
+    async def test_opens_after_sustained_exhaustion_and_fails_fast(self, clock):
+        limiter = AdaptiveLimiter(failure_threshold=3, open_seconds=30, clock=clock)
+        for _ in range(3):
+            limiter.record_rate_limited(1.0)
+        assert limiter.state == "open"
+        with pytest.raises(CircuitOpenError) as exc:
+            await limiter.acquire()
+        assert exc.value.retry_after == pytest.approx(30.0)
+        assert limiter.stats["rejected"] == 1
+
+    async def test_half_open_probe_closes_on_success(self, clock):
+        limiter = AdaptiveLimiter(failure_threshold=1, open_seconds=30, clock=clock)
+        limiter.record_rate_limited(1.0)
+        clock.now += 31
+        assert limiter.state == "half_open"
+        assert limiter.limit == 1
+        async with limiter.slot():
+            limiter.record_success(1.0)
+        assert limiter.state == "closed"
+
+    async def test_half_open_probe_reopens_on_rate_limit(self, clock):
+        limiter = AdaptiveLimiter(failure_threshold=1, open_seconds=30, clock=clock)
+        limiter.record_rate_limited(1.0)
+        clock.now += 31
+        async with limiter.slot():
+            limiter.record_rate_limited(1.0)
+        assert limiter.state == "open"
+
+    async def test_call_from_before_the_trip_does_not_end_the_probe(self, clock):
+        limiter = AdaptiveLimiter(initial_limit=2, failure_threshold=1, open_seconds=30, clock=clock)
+        assert await limiter.acquire() is False  # closed: an ordinary call, still in flight
+        limiter.record_rate_limited(1.0)
+        clock.now += 31
+        assert limiter.state == "half_open"
+        first, second = asyncio.create_task(limiter.acquire()), asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release(False)  # the old call finishes during half-open
+        assert await first is True
+        limiter.release(False)  # any release but the probe's leaves the probe running
+        await asyncio.sleep(0)
+        assert not second.done()
+        limiter.release(True)
+        assert await second is True
+        limiter.release(True)
+        assert limiter.in_flight == 0
+
+
+class TestSlots:
+    async def test_in_flight_never_exceeds_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=2, max_limit=2)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        assert peak == 2
+        assert limiter.in_flight == 0
+
+
+class TestWeightedFairQueue:
+    def test_shares_dispatches_by_weight(self):
+        from backend.agent.scheduler import WeightedFairQueue
+
+        queue = WeightedFairQueue({"interactive": 3.0, "batch": 1.0})
+        for i in range(8):
+            queue.push("batch", f"b{i}")
+            queue.push("interactive", f"i{i}")
+        first_eight = [queue.pop()[0] for _ in range(8)]
+        assert first_eight.count("interactive") == 6
+        assert first_eight.count("batch") == 2
+
+    def test_unknown_priority_rejected(self):
+        from backend.agent.scheduler import WeightedFairQueue
+
+        with pytest.raises(ValueError):
+            WeightedFairQueue().push("urgent", object())
+
+
+class TestPriorityDispatch:
+    async def test_interactive_waiters_dispatched_before_batch(self):
+        limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+        order = []
+
+        async def turn(priority, name):
+            async with limiter.slot(priority):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await limiter.acquire("batch")  # hold the only slot so the others queue
+        tasks = [asyncio.create_task(turn("batch", f"b{i}")) for i in range(3)]
+        tasks += [asyncio.create_task(turn("interactive", f"i{i}")) for i in range(2)]
+        await asyncio.sleep(0)
+        assert limiter.queue_wait()["batch"]["waiting"] == 3
+        limiter.release()
+        await asyncio.gather(*tasks)
+        assert order[:2] == ["i0", "i1"]
+        assert sorted(order[2:]) == ["b0", "b1", "b2"]
+        waits = limiter.snapshot()["queues"]
+        assert waits["interactive"]["dispatched"] == 2
+        assert waits["batch"]["dispatched"] == 4
+
+    async def test_open_circuit_rejects_queued_waiters(self, clock):
+        limiter = AdaptiveLimiter(initial_limit=1, max_limit=1, failure_threshold=1, clock=clock)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire("batch"))
+        await asyncio.sleep(0)
+        limiter.record_rate_limited(1.0)
+        with pytest.raises(CircuitOpenError):
+            await waiter
+
+    async def test_cancelled_waiter_does_not_leak_a_slot(self):
+        limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        limiter.release()
+        await asyncio.sleep(0)
+        assert limiter.in_flight == 0
@@ -0,0 +1,28 @@
+"""Smoke tests for backend.mcp_server (the import test needs fastmcp)."""
+import ast
+from pathlib import Path
+
+import pytest
+
+from backend.tools import debate_tools
+
+MCP_SERVER = Path(__file__).resolve().parents[1] / "src" / "backend" / "mcp_server.py"
+
+
+def test_every_imported_tool_exists():
+    tree = ast.parse(MCP_SERVER.read_text())
+    imported = [
+        alias.name
+        for node in tree.body
+        if isinstance(node, ast.ImportFrom) and node.module == "backend.tools.debate_tools"
+        for alias in node.names
+    ]
+    assert imported
+    assert [name for name in imported if not hasattr(debate_tools, name)] == []
+
+
+def test_module_imports():
+    pytest.importorskip("fastmcp")
+    from backend import mcp_server
+
+    assert mcp_server.MAX_PROFILE_REPEAT == 1000
@@ -0,0 +1,52 @@
+"""Tests for backend.profiling (per-request sampling profiler)."""
+import asyncio
+import time
+
+from backend.profiling import SamplingProfiler, profiled
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestSamplingProfiler:
+    def test_samples_the_calling_thread(self, tmp_path):
+        with profiled(tmp_path, "sync run", interval=0.001) as profiler:
+            busy_loop(0.1)
+        assert profiler.path == tmp_path / "sync_run.folded"
+        lines = profiler.path.read_text().splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert any("busy_loop (tests/test_profiling.py:" in line for line in lines)
+        # Outermost frame first
+        assert stack.index("test_samples_the_calling_thread") < stack.index("busy_loop")
+
+    async def test_samples_a_task_while_it_awaits(self):
+        async def wait_for_model():
+            await asyncio.sleep(0.1)
+
+        async def debate():
+            await wait_for_model()
+
+        task = asyncio.create_task(debate())
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start(task)
+        await task
+        profiler.stop()
+        stacks = list(profiler.samples)
+        assert stacks
+        assert any(
+            stack[0].startswith("debate ") and stack[1].startswith("wait_for_model ") and stack[-1].startswith("<await")
+            for stack in stacks
+        )
+        # Only the profiled task's own frames: nothing from this test's coroutine
+        assert not any("test_samples_a_task_while_it_awaits" in frame for stack in stacks for frame in stack)
+
+    def test_no_samples_when_stopped_immediately(self):
+        profiler = SamplingProfiler(interval=1.0)
+        profiler.start()
+        profiler.stop()
+        assert profiler.folded() == ""
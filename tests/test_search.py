@@ -0,0 +1,141 @@
+"""Tests for backend.app.search (FTS5 transcript index)."""
+import json
+
+import pytest
+
+from backend.app import search as search_module
+from backend.app.jobs import DebateRegistry
+from backend.app.search import SearchIndex, parse_time
+from backend.core import MessageSegment
+from backend.core import segment as segment_module
+
+
+def _message(author_id, content, phase="exchange", round_index=1):
+    return {
+        "author_id": author_id,
+        "author_name": author_id.title(),
+        "content": content,
+        "round_index": round_index,
+        "phase": phase,
+    }
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex(":memory:")
+    index.add(
+        "d1",
+        [
+            _message("gandhi", "I conceded that violence was sometimes unavoidable.", round_index=2),
+            _message("napoleon", "Violence built the empire.", phase="opening", round_index=0),
+            _message("alexander", "Glory needs no excuse."),
+        ],
+        created_at=parse_time("2026-01-01"),
+    )
+    index.add("d2", [_message("gandhi", "Violence only breeds violence.")], created_at=parse_time("2026-03-01"))
+    return index
+
+
+class TestSearchIndex:
+    def test_stemmed_match_with_snippet(self, index):
+        result = index.search("concede violence")
+        assert [(r["debate_id"], r["index"]) for r in result["results"]] == [("d1", 0)]
+        assert "<mark>conceded</mark>" in result["results"][0]["snippet"]
+
+    def test_filters(self, index):
+        assert {r["author_id"] for r in index.search("violence", persona="gandhi")["results"]} == {"gandhi"}
+        assert [r["author_id"] for r in index.search("violence", phase="opening")["results"]] == ["napoleon"]
+        assert [r["round_index"] for r in index.search("violence", round_index=2)["results"]] == [2]
+        since = index.search("violence", since=parse_time("2026-02-01"))["results"]
+        assert [r["debate_id"] for r in since] == ["d2"]
+        until = index.search("violence", until=parse_time("2026-02-01"))["results"]
+        assert {r["debate_id"] for r in until} == {"d1"}
+
+    def test_persona_name_is_not_content(self, index):
+        assert index.search("gandhi")["results"] == []
+
+    def test_pagination(self, index):
+        first = index.search("violence", limit=2)
+        assert len(first["results"]) == 2 and first["next_offset"] == 2
+        rest = index.search("violence", limit=2, offset=first["next_offset"])
+        assert len(rest["results"]) == 1 and rest["next_offset"] is None
+        assert not first["truncated"] and not rest["truncated"]
+
+    def test_matches_beyond_the_rank_window_are_flagged(self, index, monkeypatch):
+        monkeypatch.setattr(search_module, "RANK_WINDOW", 2)
+        result = index.search("violence")
+        assert sorted((r["debate_id"], r["index"]) for r in result["results"]) == [("d1", 1), ("d2", 0)]
+        assert result["truncated"]
+        assert index.search("violence", offset=5) == {
+            "results": [], "offset": 5, "limit": 20, "next_offset": None, "truncated": True
+        }
+        assert not index.search("violence", persona="gandhi")["truncated"]
+        assert not index.search("glory", offset=5)["truncated"]
+
+    def test_reindexing_is_idempotent(self, index):
+        assert index.add("d2", [_message("gandhi", "Violence only breeds violence.")]) == 0
+        assert index.count() == 4
+
+    def test_invalid_queries(self, index):
+        for kwargs in ({"query": '"open'}, {"query": " "}, {"query": "x", "persona": "caesar"}):
+            with pytest.raises(ValueError):
+                index.search(**kwargs)
+
+    def test_parse_time(self):
+        assert parse_time("1970-01-02") == 86400.0
+        assert parse_time("60") == 60.0
+        assert parse_time(None) is None
+
+
+class TestRegistryIndexing:
+    async def test_published_messages_are_indexed_once(self, tmp_path):
+        index = SearchIndex(":memory:")
+        registry = DebateRegistry(tmp_path, search=index)
+
+        class Coordinator:
+            state = {"phase": "opening", "messages": [_message("gandhi", "Peace first.")]}
+
+        async with registry.track({}, Coordinator()) as job:
+            Coordinator.state["messages"].append(_message("napoleon", "Order first."))
+            registry.sync()
+            job.result = Coordinator.state
+        assert index.count() == 2
+        assert index.search("order")["results"][0]["debate_id"] == job.id
+
+    async def test_spilled_messages_are_indexed(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(segment_module, "_spill_dir", tmp_path / "spill")
+        index = SearchIndex(":memory:")
+        registry = DebateRegistry(tmp_path, search=index)
+        MessageSegment.open("s").append([_message("gandhi", "Peace first."), _message("napoleon", "Order first.")])
+
+        class Coordinator:
+            state = {"phase": "exchange", "segment": {"id": "s", "count": 2},
+                     "messages": [_message("alexander", "Glory first.")]}
+
+        async with registry.track({}, Coordinator()) as job:
+            job.result = Coordinator.state
+        assert index.count() == 3
+        assert sorted(r["index"] for r in index.search("order OR glory")["results"]) == [1, 2]
+
+    async def test_messages_carry_the_debate_start_across_a_resume(self, tmp_path):
+        index = SearchIndex(":memory:")
+        (tmp_path / "abc.json").write_text(
+            json.dumps({
+                "debate_id": "abc",
+                "params": {},
+                "created_at": parse_time("2026-01-01"),
+                "state": {"phase": "opening", "messages": []},
+            })
+        )
+
+        class Coordinator:
+            state = None
+
+            async def run_debate(self, on_event=None, state=None):
+                return {"phase": "done", "messages": [_message("gandhi", "Peace first.")]}
+
+        for task in DebateRegistry(tmp_path, search=index).resume_all(lambda p: Coordinator()):
+            await task
+        [hit] = index.search("peace", until=parse_time("2026-01-02"))["results"]
+        assert hit["debate_id"] == "abc"
+        assert hit["created_at"].startswith("2026-01-01")
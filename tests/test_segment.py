@@ -0,0 +1,157 @@
+"""Tests for backend.core.segment and spilled debate states (tools and coordinator)."""
+import pytest
+
+from backend.agent import coordinator as coordinator_module
+from backend.agent.coordinator import DebateCoordinator
+from backend.columnar import Corpus
+from backend.core import DebateState, MessageSegment, RoundPhase
+from backend.core import segment as segment_module
+from backend.tools import (
+    advance_phase,
+    build_prompt_parts,
+    create_initial_state,
+    iter_messages,
+    read_messages,
+    record_exchange_message,
+    record_opening,
+    spill_transcript,
+)
+from backend.tools import debate_tools
+
+
+@pytest.fixture
+def spill_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(segment_module, "_spill_dir", tmp_path / "spill")
+    return tmp_path / "spill"
+
+
+def _row(i, phase="exchange", round_index=1):
+    return {"author_id": "napoleon", "author_name": "Napoleon", "content": f"message {i} — ré",
+            "round_index": round_index, "phase": phase}
+
+
+class TestMessageSegment:
+    def test_append_and_random_access(self, tmp_path):
+        segment = MessageSegment(tmp_path / "d" / "s.jsonl")
+        assert len(segment) == 0 and segment.read() == []
+        assert segment.append(_row(i) for i in range(5)) == 5
+        assert segment.append([_row(5)]) == 6
+        assert segment[0] == _row(0)
+        assert segment[-1] == _row(5)
+        assert segment[2:4] == [_row(2), _row(3)]
+        assert list(segment.rows(1, 4, reverse=True)) == [_row(3), _row(2), _row(1)]
+        with pytest.raises(IndexError):
+            segment[6]
+
+    def test_append_at_drops_rows_written_past_it(self, tmp_path):
+        segment = MessageSegment(tmp_path / "s.jsonl")
+        segment.append(_row(i) for i in range(4))
+        assert segment.append([_row(9)], at=2) == 3
+        assert list(segment) == [_row(0), _row(1), _row(9)]
+
+    def test_torn_index_entry_is_dropped(self, tmp_path):
+        segment = MessageSegment(tmp_path / "s.jsonl")
+        segment.append(_row(i) for i in range(2))
+        with segment.index_path.open("ab") as f:
+            f.write(b"\x01\x02")
+        assert len(segment) == 2
+        segment.append([_row(2)], at=2)
+        assert list(segment) == [_row(0), _row(1), _row(2)]
+        segment.remove()
+        assert not segment.path.exists() and not segment.index_path.exists()
+
+
+def _long_debate(spill=False, rounds=40):
+    """Openings plus `rounds` exchange rounds of the default panel, through the tools, spilling after each turn."""
+    state = create_initial_state(max_exchange_rounds=rounds, spill=spill)
+    panel = state["debaters"]
+    for p in panel:
+        state = spill_transcript(record_opening(p, f"{p} opens", state))
+    state = advance_phase(state, "defence")
+    state = advance_phase(state, "exchange")
+    for r in range(1, rounds + 1):
+        for p in panel:
+            state = spill_transcript(record_exchange_message(p, f"{p} argues in round {r}", state, r))
+    return state
+
+
+class TestSpilledState:
+    def test_older_messages_move_to_the_segment(self, spill_dir):
+        full = _long_debate(rounds=80)
+        spilled = _long_debate(spill=True, rounds=80)
+        count = len(full["messages"])
+        assert count == 243
+        assert spilled["segment"]["count"] + len(spilled["messages"]) == count
+        assert len(spilled["messages"]) < debate_tools.HOT_MESSAGES + debate_tools.SPILL_BATCH
+        assert spilled["segment"]["count"] > 0
+        assert list(iter_messages(spilled)) == full["messages"]
+        assert read_messages(spilled, 2, 5) == full["messages"][2:5]
+        assert read_messages(spilled, -3) == full["messages"][-3:]
+        assert (spill_dir / f"{spilled['segment']['id']}.jsonl").exists()
+
+    def test_serializing_does_not_spill(self, spill_dir):
+        state = create_initial_state(spill=True)
+        for i in range(debate_tools.HOT_MESSAGES + debate_tools.SPILL_BATCH):
+            state = record_opening("napoleon", f"opening {i}", state)
+        assert state["segment"]["count"] == 0
+        assert not spill_dir.exists()
+        assert len(spill_transcript(state)["messages"]) == debate_tools.HOT_MESSAGES
+
+    def test_segment_ids_cannot_name_other_files(self, spill_dir):
+        state = _long_debate(rounds=70)
+        for bad in ["../../etc/passwd", "/etc/passwd", "a.b", "", "x" * 65]:
+            with pytest.raises(ValueError, match="segment|id"):
+                read_messages({**state, "segment": {"id": bad, "count": 1}})
+            with pytest.raises(ValueError, match="segment|id"):
+                spill_transcript({**state, "segment": {"id": bad, "count": 0}})
+        assert list(spill_dir.parent.iterdir()) == []
+
+    def test_spilling_needs_a_spill_dir(self, monkeypatch):
+        monkeypatch.setattr(segment_module, "_spill_dir", None)
+        with pytest.raises(ValueError, match="SIMULACRA_SPILL_DIR"):
+            create_initial_state(spill=True)
+
+    def test_prompts_match_the_unspilled_debate(self, spill_dir, monkeypatch):
+        monkeypatch.setattr(debate_tools, "HOT_MESSAGES", 10)
+        monkeypatch.setattr(debate_tools, "SPILL_BATCH", 5)
+        full = _long_debate(rounds=12)
+        spilled = _long_debate(spill=True, rounds=12)
+        assert len(spilled["messages"]) < 15
+        for phase, r in [("exchange", 12), ("exchange", 2), ("reflection", 0), ("arbitration", 0)]:
+            assert build_prompt_parts(phase, "gandhi", spilled, r) == build_prompt_parts(phase, "gandhi", full, r)
+
+    def test_phase_start_walks_back_into_the_segment(self, spill_dir):
+        state = DebateState(segment={"id": "s"})
+        for r in (1, 2, 3):
+            for _ in range(4):
+                state.add_message("napoleon", "Napoleon", f"round {r}", RoundPhase.EXCHANGE, r)
+        expected = [state.phase_start(RoundPhase.EXCHANGE, r) for r in (1, 2, 3, 4)]
+        expected.append(state.phase_start(RoundPhase.REFLECTION))
+        state.spill(keep=6)
+        assert state.spilled == 6
+        assert [state.phase_start(RoundPhase.EXCHANGE, r) for r in (1, 2, 3, 4)] + [
+            state.phase_start(RoundPhase.REFLECTION)
+        ] == expected == [0, 4, 8, 12, 12]
+        assert state.phase_start(RoundPhase.EXCHANGE) == 0
+        assert state.transcript_for_context(3) == "\n".join(["[Napoleon] (exchange): round 3"] * 3)
+
+
+async def test_coordinator_spills_a_long_debate(spill_dir, monkeypatch):
+    monkeypatch.setattr(coordinator_module, "TURN_DELAY", 0)
+    monkeypatch.setattr(coordinator_module, "PHASE_DELAY", 0)
+    monkeypatch.setattr(debate_tools, "HOT_MESSAGES", 20)
+    monkeypatch.setattr(debate_tools, "SPILL_BATCH", 10)
+
+    async def transport(model, prompt, on_delta):
+        return f"Reply to {len(prompt)} chars.", {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+
+    full = await DebateCoordinator(max_exchange_rounds=12, transport=transport).run_debate()
+    spilled = await DebateCoordinator(max_exchange_rounds=12, transport=transport, spill=True).run_debate()
+    assert spilled["segment"]["count"] > 0
+    assert len(spilled["messages"]) < 30
+    assert list(iter_messages(spilled)) == full["messages"]
+    assert spilled["arbitration"] == full["arbitration"]
+    exports = [Corpus(), Corpus()]
+    exports[0].add_debate("d", full)
+    exports[1].add_debate("d", spilled)
+    assert exports[0].text == exports[1].text and exports[0].columns == exports[1].columns
@@ -0,0 +1,38 @@
+"""Tests for backend.simulate (virtual-clock capacity simulator)."""
+import asyncio
+
+from backend.simulate import VirtualClockLoop, simulate
+
+
+class TestVirtualClockLoop:
+    def test_sleeps_advance_virtual_time_only(self):
+        loop = VirtualClockLoop()
+
+        async def main():
+            await asyncio.gather(asyncio.sleep(3600), asyncio.sleep(60))
+            return loop.time()
+
+        try:
+            assert loop.run_until_complete(main()) == 3600
+        finally:
+            loop.close()
+
+
+class TestSimulate:
+    def test_single_debate_follows_coordinator_schedule(self):
+        report = simulate(1, rounds=1, rpm=1000, latency=1.0)
+        # 13 calls of 1s + 12 turn delays of 1s + 4 phase delays of 2s
+        assert report["duration_s"]["max"] == 33.0
+        assert report["calls"] == 13
+        assert report["wall_s"] < 5
+
+    def test_quota_bound_load_predicts_429s_and_longer_debates(self):
+        light = simulate(1, rounds=2, rpm=15, latency=2.0)
+        heavy = simulate(4, rounds=2, rpm=15, latency=2.0)
+        assert heavy["rate_limited"] > light["rate_limited"]
+        assert heavy["duration_s"]["max"] > light["duration_s"]["max"]
+
+    def test_client_pacing_avoids_failures(self):
+        paced = simulate(4, rounds=2, rpm=15, latency=2.0, pace_rpm=14)
+        assert paced["failed"] == 0
+        assert paced["completed"] == 4
@@ -0,0 +1,17 @@
+"""Cold start: the app must import without loading ADK (see benchmarks/import_time.py)."""
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def test_app_import_does_not_load_adk():
+    code = (
+        "import sys, backend.app.main; "
+        "print(sorted(m for m in sys.modules if m.startswith(('google.adk', 'google.genai'))))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, cwd=SRC, check=True
+    )
+    assert proc.stdout.strip() == "[]"
@@ -0,0 +1,232 @@
+"""Tests for backend.agent.store and the store-backed quota bucket."""
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from backend.agent.limiter import AdaptiveLimiter, QuotaBucket
+from backend.agent.store import MemoryStore, SQLiteStore, open_store
+from backend.app.jobs import DebateRegistry
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store_and_clock(request, tmp_path):
+    clock = FakeClock()
+    if request.param == "memory":
+        return MemoryStore(clock=clock), clock
+    return SQLiteStore(tmp_path / "state.db", clock=clock), clock
+
+
+class TestStore:
+    def test_get_set_expire_delete(self, store_and_clock):
+        store, clock = store_and_clock
+        store.set("a", "1")
+        store.set("b", "2", ex=10)
+        assert store.get("a") == "1"
+        clock.now += 11
+        assert store.get("b") is None
+        assert store.delete("a", "missing") == 1
+        assert store.get("a") is None
+
+    def test_keys_glob_and_incrby(self, store_and_clock):
+        store, _ = store_and_clock
+        store.set("debate:1", "{}")
+        store.set("debate:2", "{}")
+        store.set("quota:m", "{}")
+        assert store.keys("debate:*") == ["debate:1", "debate:2"]
+        assert store.incrby("n") == 1
+        assert store.incrby("n", 5) == 6
+
+    def test_update_read_modify_write(self, store_and_clock):
+        store, _ = store_and_clock
+        append = lambda raw: json.dumps(json.loads(raw or "[]") + [1])
+        store.update("list", append)
+        assert store.update("list", append) == "[1, 1]"
+        store.update("list", lambda raw: None)
+        assert store.get("list") is None
+
+    def test_purge_expired_deletes_expired_keys(self, store_and_clock):
+        store, clock = store_and_clock
+        store.set("debate:old", "{}", ex=10)
+        store.set("debate:new", "{}", ex=100)
+        store.set("quota:m", "{}")
+        clock.now += 11
+        assert store.purge_expired() == 1
+        assert store.purge_expired() == 0
+        assert store.keys() == ["debate:new", "quota:m"]
+        if isinstance(store, SQLiteStore):
+            assert store._conn.execute("SELECT count(*) FROM kv").fetchone()[0] == 2
+
+    def test_sqlite_shared_across_processes(self, tmp_path):
+        path = tmp_path / "state.db"
+        code = (
+            "import sys; from backend.agent.store import SQLiteStore; "
+            "s = SQLiteStore(sys.argv[1]); [s.incrby('n') for _ in range(50)]"
+        )
+        procs = [
+            subprocess.Popen([sys.executable, "-c", code, str(path)], cwd=SRC) for _ in range(4)
+        ]
+        assert [p.wait(timeout=60) for p in procs] == [0, 0, 0, 0]
+        assert SQLiteStore(path).get("n") == "200"
+
+    def test_open_store_urls(self, tmp_path):
+        assert isinstance(open_store("memory://"), MemoryStore)
+        assert isinstance(open_store(f"sqlite:///{tmp_path}/s.db"), SQLiteStore)
+        with pytest.raises(ValueError):
+            open_store("redis://localhost")
+
+
+class TestQuotaBucket:
+    def test_burst_then_paced_at_rpm(self):
+        clock = FakeClock()
+        bucket = QuotaBucket(MemoryStore(clock=clock), "quota:m", rpm=60, burst=2, clock=clock)
+        assert bucket.try_take() == 0
+        assert bucket.try_take() == 0
+        assert bucket.try_take() == pytest.approx(1.0)
+        clock.now += 1.0
+        assert bucket.try_take() == 0
+
+    def test_two_workers_share_bucket_and_retry_after(self, tmp_path):
+        clock = FakeClock()
+        worker_a = QuotaBucket(SQLiteStore(tmp_path / "s.db", clock=clock), "quota:m", 60, 1, clock)
+        worker_b = QuotaBucket(SQLiteStore(tmp_path / "s.db", clock=clock), "quota:m", 60, 1, clock)
+        assert worker_a.try_take() == 0
+        assert worker_b.try_take() == pytest.approx(1.0)
+        AdaptiveLimiter(bucket=worker_a).record_rate_limited(retry_after=30)
+        clock.now += 2
+        assert worker_b.try_take() == pytest.approx(28.0)
+
+
+class ThreadRecordingStore(MemoryStore):
+    """Records (operation, calling thread) of every get, set and update."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    @property
+    def threads(self):
+        return [thread for _, thread in self.calls]
+
+    def get(self, key):
+        self.calls.append(("get", threading.current_thread()))
+        return super().get(key)
+
+    def set(self, key, value, ex=None):
+        self.calls.append(("set", threading.current_thread()))
+        super().set(key, value, ex)
+
+    def update(self, key, fn, ex=None):
+        self.calls.append(("update", threading.current_thread()))
+        return super().update(key, fn, ex)
+
+
+class TestQuotaBucketOffLoop:
+    async def test_take_and_block_call_the_store_in_a_worker_thread(self):
+        store = ThreadRecordingStore()
+        limiter = AdaptiveLimiter(bucket=QuotaBucket(store, "quota:m", rpm=600))
+        async with limiter.slot():
+            pass
+        limiter.record_rate_limited(retry_after=30)
+        for _ in range(100):
+            if len(store.threads) == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert len(store.threads) == 2
+        assert threading.main_thread() not in store.threads
+        assert json.loads(store.get("quota:m"))["blocked_until"] > 0
+
+
+class TestStoreCallsOffLoop:
+    async def test_debate_records_are_published_in_a_worker_thread(self, tmp_path):
+        store = ThreadRecordingStore()
+        registry = DebateRegistry(tmp_path, store=store)
+
+        class Coordinator:
+            state = {"phase": "opening", "messages": []}
+
+        async with registry.track({}, Coordinator()) as job:
+            job.result = {"phase": "done", "messages": []}
+        unfinished = asyncio.create_task(asyncio.sleep(10))
+
+        async def run():
+            async with registry.track({}, Coordinator()):
+                await unfinished
+
+        task = asyncio.create_task(run())
+        await asyncio.sleep(0.05)
+        assert len(await registry.drain(grace_seconds=0)) == 1
+        await asyncio.gather(task, return_exceptions=True)
+        assert len(store.threads) == 5  # start and end of each debate, plus the checkpointed record
+        assert threading.main_thread() not in store.threads
+
+    async def test_debate_reads_the_quota_bucket_once_off_the_loop(self, monkeypatch):
+        from backend.agent import coordinator as coordinator_module
+        from backend.agent.coordinator import DebateCoordinator
+
+        monkeypatch.setattr(coordinator_module, "TURN_DELAY", 0)
+        monkeypatch.setattr(coordinator_module, "PHASE_DELAY", 0)
+
+        async def transport(model, prompt, on_delta):
+            return "Reply.", {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+
+        store = ThreadRecordingStore()
+        limiter = AdaptiveLimiter(bucket=QuotaBucket(store, "quota:m", rpm=6000, burst=100))
+        coordinator = DebateCoordinator(max_exchange_rounds=1, transport=transport, limiter=limiter)
+        await coordinator.run_debate()
+        assert list(coordinator.metrics["limiters"]) == list(coordinator.metrics["routes"])
+        assert "quota" in next(iter(coordinator.metrics["limiters"].values()))
+        ops = [op for op, _ in store.calls]
+        assert ops == ["update"] * coordinator.metrics["turns"] + ["get"] * len(coordinator.metrics["routes"])
+        assert threading.main_thread() not in store.threads
+
+
+class TestSharedRegistry:
+    async def test_debate_record_visible_to_other_worker(self, tmp_path):
+        worker_a = DebateRegistry(tmp_path / "ckpt", store=SQLiteStore(tmp_path / "s.db"))
+        worker_b = DebateRegistry(tmp_path / "ckpt", store=SQLiteStore(tmp_path / "s.db"))
+
+        class Coordinator:
+            state = {"phase": "exchange", "messages": [{"content": "hi"}]}
+
+        async with worker_a.track({"max_exchange_rounds": 2}, Coordinator()) as job:
+            running = worker_b.lookup(job.id)
+            job.result = {"phase": "done", "messages": []}
+        assert running["status"] == "running"
+        assert worker_b.get(job.id) is None
+        assert worker_b.lookup(job.id)["status"] == "done"
+        assert worker_b.lookup(job.id)["state"]["phase"] == "done"
+
+    async def test_checkpoint_resumed_by_one_worker_only(self, tmp_path):
+        ckpt = tmp_path / "ckpt"
+        ckpt.mkdir()
+        (ckpt / "abc.json").write_text(
+            json.dumps({"debate_id": "abc", "params": {}, "state": {"phase": "opening", "messages": []}})
+        )
+
+        class Coordinator:
+            state = None
+
+            async def run_debate(self, on_event=None, state=None):
+                return {"phase": "done"}
+
+        worker_a, worker_b = DebateRegistry(ckpt), DebateRegistry(ckpt)
+        tasks = worker_a.resume_all(lambda p: Coordinator()) + worker_b.resume_all(lambda p: Coordinator())
+        assert len(tasks) == 1
+        for task in tasks:
+            await task
+        assert list(ckpt.iterdir()) == []
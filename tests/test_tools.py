@@ -3,6 +3,7 @@ import pytest
 from backend.tools.debate_tools import (
     create_initial_state,
     get_debate_state,
+    validate_state,
     build_opening_prompt,
     record_opening,
     build_defence_prompt,
@@ -11,6 +12,15 @@ from backend.tools.debate_tools import (
     advance_exchange_round,
     build_arbitration_prompt,
     record_arbitration,
+    record_token_usage,
+    mark_budget_exhausted,
+    record_timings,
+    list_personas,
+    build_prompt_parts,
+    build_verdict_prompt,
+    parse_verdict,
+    build_exchange_prompt,
+    record_exchange_message,
 )
 
 
@@ -32,6 +42,47 @@ class TestCreateAndGetState:
         assert out == state
 
 
+class TestStateValidation:
+    def _with_message(self, **fields):
+        state = record_opening("napoleon", "Unity.", create_initial_state())
+        state["messages"][0].update(fields)
+        return state
+
+    def test_round_trip_keeps_messages(self):
+        state = record_opening("napoleon", "Unity.", create_initial_state())
+        assert record_opening("gandhi", "Peace.", state)["messages"][0] == state["messages"][0]
+        assert validate_state(state) == state
+
+    @pytest.mark.parametrize(
+        "fields",
+        [{"round_index": "oops"}, {"content": None}, {"author_id": "caesar"}, {"phase": "intermission"}, {"round_index": -1}],
+    )
+    def test_malformed_messages_rejected(self, fields):
+        with pytest.raises(ValueError):
+            validate_state(self._with_message(**fields))
+
+    def test_missing_field_is_a_validation_error(self):
+        state = record_opening("napoleon", "Unity.", create_initial_state())
+        del state["messages"][0]["author_name"]
+        with pytest.raises(ValueError, match="author_name"):
+            validate_state(state)
+
+    def test_malformed_route_rejected(self):
+        state = {**create_initial_state(), "routes": [{"phase": "opening", "persona_id": "napoleon"}]}
+        with pytest.raises(ValueError, match="model"):
+            validate_state(state)
+
+    def test_tools_trust_their_state(self):
+        # Only validate_state checks a transcript; the tools load it as is
+        state = self._with_message(round_index="oops")
+        assert record_opening("gandhi", "Peace.", state)["messages"][0]["round_index"] == "oops"
+
+    def test_segment_checked_on_trusted_load(self):
+        state = {**create_initial_state(), "segment": {"id": "../../etc/passwd", "count": 0}}
+        with pytest.raises(ValueError):
+            record_opening("gandhi", "Peace.", state)
+
+
 class TestOpening:
     def test_build_opening_prompt_napoleon(self):
         prompt = build_opening_prompt("napoleon")
@@ -116,3 +167,109 @@ class TestArbitration:
         assert len(state["messages"]) == 1
         assert state["messages"][0]["author_id"] == "arbitrator"
         assert "merit" in state["messages"][0]["content"]
+
+
+class TestPromptParts:
+    def _debate(self, rounds):
+        state = create_initial_state(max_exchange_rounds=rounds + 1)
+        for pid in ("napoleon", "gandhi", "alexander"):
+            state = record_opening(pid, f"{pid} opens.", state)
+        state = advance_phase(state, "defence")
+        for pid in ("napoleon", "gandhi", "alexander"):
+            state = record_defence(pid, f"{pid} defends.", state)
+        state = advance_phase(state, "exchange")
+        for r in range(1, rounds + 1):
+            for pid in ("napoleon", "gandhi", "alexander"):
+                state = record_exchange_message(pid, f"{pid} in round {r}.", state, r)
+        return state
+
+    def test_prefix_shared_within_round_and_extended_across_rounds(self):
+        state = self._debate(1)
+        round_2 = []
+        for pid in ("napoleon", "gandhi", "alexander"):
+            parts = build_prompt_parts("exchange", pid, state, 2)
+            assert parts["prefix"] + parts["suffix"] == build_exchange_prompt(pid, state, 2)
+            round_2.append(parts["prefix"])
+            state = record_exchange_message(pid, f"{pid} in round 2.", state, 2)
+        assert len(set(round_2)) == 1
+        round_1 = build_prompt_parts("exchange", "gandhi", state, 1)["prefix"]
+        round_3 = build_prompt_parts("exchange", "gandhi", state, 3)["prefix"]
+        defence = build_prompt_parts("defence", "gandhi", state)["prefix"]
+        assert round_3.startswith(round_2[0]) and round_2[0].startswith(round_1) and round_1.startswith(defence)
+        assert "gandhi in round 2." in round_3 and "gandhi in round 2." not in round_2[0]
+
+    def test_context_window_moves_in_blocks(self):
+        state = self._debate(15)  # 51 messages
+        prefix = build_prompt_parts("exchange", "napoleon", state, 16)["prefix"]
+        # 51 messages before the round, at most 40 shown: the window starts at message 20
+        assert prefix.count("\n[") == 31
+        assert prefix.startswith("Debate transcript:\n[Alexander] (exchange): alexander in round 5.")
+
+    def test_opening_has_no_prefix(self):
+        parts = build_prompt_parts("opening", "gandhi", create_initial_state())
+        assert parts == {"prefix": "", "suffix": build_opening_prompt("gandhi")}
+        with pytest.raises(ValueError):
+            build_prompt_parts("summary", "gandhi", create_initial_state())
+
+
+class TestVerdict:
+    def test_verdict_names_one_debater_or_none(self):
+        state = create_initial_state(debaters=["socrates", "marcus_aurelius"])
+        prompt = build_verdict_prompt(state)
+        assert "between Socrates and Marcus Aurelius" in prompt
+        assert parse_verdict("Marcus Aurelius.", state) == "marcus_aurelius"
+        assert parse_verdict("socrates", state) == "socrates"
+        assert parse_verdict("Socrates and Marcus Aurelius tied.", state) is None
+        assert parse_verdict("Draw", state) is None
+
+
+class TestPanel:
+    def test_initial_state_seats_given_panel(self):
+        assert create_initial_state()["debaters"] == ["napoleon", "gandhi", "alexander"]
+        state = create_initial_state(debaters=["socrates", "confucius", "mandela", "lincoln"])
+        assert state["debaters"] == ["socrates", "confucius", "mandela", "lincoln"]
+        prompt = build_arbitration_prompt(state)
+        assert "between Socrates, Confucius, Mandela, and Lincoln" in prompt
+
+    def test_invalid_panel_rejected(self):
+        with pytest.raises(ValueError):
+            create_initial_state(debaters=["socrates"])
+
+    def test_list_personas(self):
+        registry = list_personas()
+        assert registry["default_debaters"] == ["napoleon", "gandhi", "alexander"]
+        assert "arbitrator" not in registry["debaters"]
+        assert {p["id"] for p in registry["personas"]} == {*registry["debaters"], "arbitrator"}
+
+
+class TestTokenUsage:
+    def test_initial_state_has_empty_usage_and_budget(self):
+        state = create_initial_state(token_budget=5000)
+        assert state["token_usage"] == {}
+        assert state["token_total"]["total_tokens"] == 0
+        assert state["token_budget"] == 5000
+        assert state["budget_exhausted"] is False
+
+    def test_record_token_usage_sums_per_phase_and_total(self):
+        state = create_initial_state()
+        state = record_token_usage("opening", 10, 5, 15, state)
+        state = record_token_usage("opening", 20, 10, 30, state)
+        state = record_token_usage("defence", 7, 3, 10, state)
+        assert state["token_usage"]["opening"] == {
+            "prompt_tokens": 30, "completion_tokens": 15, "total_tokens": 45,
+        }
+        assert state["token_usage"]["defence"]["total_tokens"] == 10
+        assert state["token_total"]["total_tokens"] == 55
+
+    def test_mark_budget_exhausted(self):
+        state = mark_budget_exhausted(create_initial_state(token_budget=100))
+        assert state["budget_exhausted"] is True
+
+
+class TestTimings:
+    def test_record_timings_round_trips_through_later_tools(self):
+        timings = {"opening": {"model_wait_ms": 1200.0, "backoff_ms": 0.0, "pacing_ms": 1000.0, "prompt_ms": 0.2, "state_ms": 0.5}}
+        state = record_timings(timings, create_initial_state())
+        assert state["timings"] == timings
+        # Other tools keep the section
+        assert advance_phase(state, "defence")["timings"] == timings
@@ -0,0 +1,124 @@
+"""Tests for backend.tournament and backend.agent.shared_turns (fake model transport)."""
+import asyncio
+import csv
+import io
+
+import pytest
+
+from backend.agent import coordinator as coordinator_module
+from backend.agent.cassette import prompt_key
+from backend.agent.limiter import AdaptiveLimiter
+from backend.agent.shared_turns import SharedTurns
+from backend.tournament import (
+    load_matchups,
+    match_configs,
+    round_robin,
+    run_tournament,
+    tournament_runner,
+    write_standings,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_pacing(monkeypatch):
+    monkeypatch.setattr(coordinator_module, "TURN_DELAY", 0)
+    monkeypatch.setattr(coordinator_module, "PHASE_DELAY", 0)
+
+
+async def fake_model(model, prompt, on_delta):
+    """Replies depend only on the prompt; judges always pick Socrates when he is on the panel."""
+    await asyncio.sleep(0.005)
+    if "impartial judge" in prompt:
+        return ("Socrates." if "Socrates" in prompt else "A draw."), {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11}
+    return f"Reply {prompt_key(prompt)}.", {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+
+
+class TestSharedTurns:
+    async def test_identical_prompts_in_flight_are_generated_once(self):
+        started = []
+
+        async def slow(model, prompt, on_delta):
+            started.append(prompt)
+            await asyncio.sleep(0.01)
+            return "text", {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}
+
+        shared = SharedTurns()
+        first, second = shared.wrap(slow), shared.wrap(slow)
+        results = await asyncio.gather(first("m", "p", None), second("m", "p", None), first("m", "q", None))
+        assert started == ["p", "q"]
+        assert results[0] == ("text", {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5})
+        assert results[1] == ("text", {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0})
+        assert shared.snapshot() == {"calls": 3, "generated": 2, "shared": 1, "shared_ratio": 0.333, "saved_tokens": 5}
+
+    async def test_failed_call_is_retried(self):
+        attempts = []
+
+        async def flaky(model, prompt, on_delta):
+            attempts.append(prompt)
+            if len(attempts) == 1:
+                raise RuntimeError("429 RESOURCE_EXHAUSTED")
+            return "ok", {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+
+        call = SharedTurns().wrap(flaky)
+        with pytest.raises(RuntimeError):
+            await call("m", "p", None)
+        assert (await call("m", "p", None))[0] == "ok"
+        assert len(attempts) == 2
+
+
+class TestMatchups:
+    def test_round_robin_pairs_every_persona_once(self):
+        matchups = round_robin(["socrates", "confucius", "mandela", "lincoln"])
+        assert len(matchups) == 6
+        assert ["socrates", "confucius"] in matchups
+        with pytest.raises(ValueError):
+            round_robin(["socrates", "caesar"])
+
+    def test_load_matchups_and_configs(self, tmp_path):
+        path = tmp_path / "m.json"
+        path.write_text('[["socrates", "confucius"], ["socrates", "confucius"]]')
+        configs = match_configs(load_matchups(path), max_exchange_rounds=1, model="m")
+        assert [c["id"] for c in configs] == ["socrates-vs-confucius", "socrates-vs-confucius-2"]
+        path.write_text('[["socrates"]]')
+        with pytest.raises(ValueError, match="Matchup 1"):
+            load_matchups(path)
+
+
+class TestRunTournament:
+    async def test_openings_shared_and_standings_written(self, tmp_path):
+        shared = SharedTurns()
+        limiter = AdaptiveLimiter(initial_limit=9)
+        configs = match_configs(round_robin(["socrates", "confucius", "mandela"]), max_exchange_rounds=1, model="m")
+        result = await run_tournament(
+            configs,
+            tmp_path / "matches.jsonl",
+            run_debate=tournament_runner(shared, transport=fake_model, limiter=limiter),
+            shared_turns=shared,
+            progress_stream=io.StringIO(),
+        )
+        assert result["counts"] == {"done": 3, "failed": 0, "skipped": 0}
+        # 3 matches x (2 debaters x 4 turns + arbitration + verdict); each persona's opening is generated once
+        assert result["shared_turns"]["calls"] == 30
+        assert result["shared_turns"]["shared"] == 3
+        # Shared turns take no limiter slot and leave its latency baseline alone
+        assert limiter.stats["successes"] == result["shared_turns"]["generated"] == 27
+        assert limiter.limit >= 9
+        table = result["standings"]
+        assert [(r["persona"], r["won"], r["drawn"], r["lost"], r["points"]) for r in table] == [
+            ("socrates", 2, 0, 0, 6),
+            ("confucius", 0, 1, 1, 1),
+            ("mandela", 0, 1, 1, 1),
+        ]
+        write_standings(table, tmp_path / "standings.csv")
+        rows = list(csv.DictReader((tmp_path / "standings.csv").open()))
+        assert rows[0]["persona"] == "socrates" and rows[0]["rank"] == "1"
+
+        # A rerun resumes: nothing left to play, standings come from the recorded matches
+        again = await run_tournament(
+            configs,
+            tmp_path / "matches.jsonl",
+            run_debate=tournament_runner(SharedTurns(), transport=fake_model),
+            progress_stream=io.StringIO(),
+        )
+        assert again["counts"]["skipped"] == 3
+        assert again["standings"] == table